@@ -0,0 +1,19 @@
+from fastapi import Request
+
+def get_container(request: Request):
+    return request.app.state.container
+
+def get_forecast_service(request: Request):
+    return request.app.state.container.forecast_service
+
+def get_model_service(request: Request):
+    return request.app.state.container.model_service
+
+def get_s3_service(request: Request):
+    return request.app.state.container.s3_service
+
+def get_progress_hub(request: Request):
+    return request.app.state.container.progress_hub
+
+def get_online_prediction_service(request: Request):
+    return request.app.state.container.online_prediction_service
@@ -1,94 +1,213 @@
-import asyncio
 import json
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, Header
 from pydantic import BaseModel
-from app.services import ForecastService, ModelService, S3Service
-from typing import List
+from app.services import ForecastService, ModelService, S3Service, ProgressHub, ProgressError, OnlinePredictionService
+from app.services.model_service import TERMINAL_PIPELINE_STATUSES
+from app.services.progress_events import event_to_update, pipeline_key, transform_key, TERMINAL_TRANSFORM_STATUSES
+from typing import Dict, List, Optional
+from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse
+from .dependencies import get_forecast_service, get_model_service, get_s3_service, get_progress_hub, get_online_prediction_service
 
 router = APIRouter()
 
-def get_forecast_service():
-    return ForecastService()
-
-def get_model_service():
-    return ModelService()
-
-def get_s3_service():
-    return S3Service()
-
 class PredictRequest(BaseModel):
     model_arn: str
     input_s3_path: str
 
+class OnlinePredictRequest(BaseModel):
+    instances: List[Dict[str, Optional[float]]]
+    # Defaults to the latest approved model.
+    model_arn: Optional[str] = None
+
+class TrainRequest(BaseModel):
+    n_estimators: Optional[int] = None
+    max_depth: Optional[int] = None
+    learning_rate: Optional[float] = None
+    search_budget_seconds: Optional[int] = None
+    full_retrain: bool = False
+
 @router.post("/upload-raw-data")
 async def upload(files: List[UploadFile] = File(...), service: ForecastService = Depends(get_forecast_service)):
-    uploaded_urls = []
-    for file in files:
-        s3_url = await service.upload_raw_data(file.filename, await file.read())
-        uploaded_urls.append({"filename": file.filename, "s3_uri": s3_url})
-    return {"message": f"Successfully uploaded {len(uploaded_urls)} files", "data": uploaded_urls}
+    uploaded = await service.upload_raw_files(files)
+    deduplicated = [item["filename"] for item in uploaded if item["deduplicated"]]
+    return {
+        "message": f"Successfully uploaded {len(uploaded) - len(deduplicated)} files, {len(deduplicated)} unchanged files skipped",
+        "data": uploaded,
+        "deduplicated": deduplicated
+    }
 
 @router.post("/train")
-async def train(service: ForecastService = Depends(get_forecast_service)):
-    execution_arn = await service.trigger_training_pipeline()
-    return {"message": "Pipeline started", "execution_arn": execution_arn}
+async def train(
+    request: Optional[TrainRequest] = None,
+    service: ForecastService = Depends(get_forecast_service),
+    model_service: ModelService = Depends(get_model_service),
+):
+    request = request or TrainRequest()
+    hyperparameters = {
+        "NEstimators": request.n_estimators,
+        "MaxDepth": request.max_depth,
+        "LearningRate": request.learning_rate,
+        "SearchBudgetSeconds": request.search_budget_seconds,
+    }
+    # Routine refreshes continue boosting the latest approved model on new partitions;
+    # a warm start keeps the base model's parameters, so explicit ones mean a full retrain.
+    full_retrain = request.full_retrain or any(value is not None for value in hyperparameters.values())
+    base_model = None if full_retrain else await model_service.get_latest_approved_model()
+    hyperparameters["BaseModelUri"] = base_model["model_data_url"] if base_model else None
+    execution_arn = await service.trigger_training_pipeline(hyperparameters)
+    return {
+        "message": "Pipeline started",
+        "execution_arn": execution_arn,
+        "base_model_arn": base_model["arn"] if base_model else None
+    }
 
 @router.post("/predict")
 async def predict(request: PredictRequest, service: ForecastService = Depends(get_forecast_service)):
     job_info = await service.execute_batch_prediction(request.model_arn, request.input_s3_path)
     return {"message": "Prediction job created", "details": job_info}
 
+@router.post("/predict-online")
+async def predict_online(request: OnlinePredictRequest, service: OnlinePredictionService = Depends(get_online_prediction_service)):
+    return await service.predict(request.instances, request.model_arn)
+
+@router.get("/predict-online/stats")
+async def predict_online_stats(service: OnlinePredictionService = Depends(get_online_prediction_service)):
+    return service.get_stats()
+
 @router.get("/s3-inputs")
 async def list_s3_inputs(service: S3Service = Depends(get_s3_service)):
     s3_inputs = await service.list_s3_inputs()
     return {"s3_inputs": s3_inputs}
 
 @router.get("/train-progress/{execution_arn:path}")
-async def train_progress(execution_arn: str, service: ModelService = Depends(get_model_service)):
+async def train_progress(
+    execution_arn: str,
+    service: ModelService = Depends(get_model_service),
+    hub: ProgressHub = Depends(get_progress_hub)
+):
     async def event_generator():
-        while True:
-            data = await service.get_pipeline_steps_status(execution_arn)
-            yield {
-                "event": "update",
-                "data": json.dumps(data)
-            }
-
-            if data['overall_status'] in ['Succeeded', 'Failed', 'Stopped']:
-                break
-
-            await asyncio.sleep(5)
+        updates = hub.subscribe(
+            pipeline_key(execution_arn),
+            lambda: service.get_pipeline_steps_status(execution_arn),
+            lambda data: data['overall_status'] in TERMINAL_PIPELINE_STATUSES
+        )
+        async with aclosing(updates):
+            try:
+                async for data in updates:
+                    yield {
+                        "event": "update",
+                        "data": json.dumps(data)
+                    }
+            except ProgressError as e:
+                yield {
+                    "event": "error",
+                    "data": json.dumps(e.to_dict())
+                }
     
     return EventSourceResponse(event_generator())
 
+@router.post("/progress-events")
+async def push_progress_event(event: dict, hub: ProgressHub = Depends(get_progress_hub)):
+    """Receive EventBridge-style status events so watched runs need no polling."""
+    translated = event_to_update(event)
+    if translated is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported event type: {event.get('detail-type')}")
+    key, update = translated
+    delivered = await hub.push(key, update)
+    return {"key": key, "delivered": delivered}
+
 @router.get("/prediction-progress/{job_name}")
-async def prediction_progress(job_name: str, service: ForecastService = Depends(get_forecast_service)):
+async def prediction_progress(
+    job_name: str,
+    service: ForecastService = Depends(get_forecast_service),
+    hub: ProgressHub = Depends(get_progress_hub)
+):
     """Stream prediction job progress"""
     async def event_generator():
-        # Real AWS implementation would poll SageMaker transform job status
-        while True:
-            # TODO: Implement real transform job status check
-            yield {
-                "event": "update",
-                "data": json.dumps({"status": "Running", "message": "Checking job status..."})
-            }
-            await asyncio.sleep(5)
-            break
+        updates = hub.subscribe(
+            transform_key(job_name),
+            lambda: service.get_prediction_status(job_name),
+            lambda data: data['status'] in TERMINAL_TRANSFORM_STATUSES
+        )
+        async with aclosing(updates):
+            try:
+                async for data in updates:
+                    yield {
+                        "event": "update",
+                        "data": json.dumps(data)
+                    }
+            except ProgressError as e:
+                yield {
+                    "event": "error",
+                    "data": json.dumps(e.to_dict())
+                }
     
     return EventSourceResponse(event_generator())
 
 @router.get("/prediction-results/{job_name}")
-async def get_prediction_results(job_name: str, service: ForecastService = Depends(get_forecast_service)):
-    """Get prediction results for a completed job"""
-    # Real AWS implementation would read results from S3
-    raise HTTPException(status_code=501, detail="Real implementation not yet available")
+async def get_prediction_results(
+    job_name: str,
+    cursor: Optional[str] = None,
+    page_size: int = Query(500, ge=1, le=10000),
+    format: str = Query("json", pattern="^(json|csv)$"),
+    service: ForecastService = Depends(get_forecast_service)
+):
+    """Get prediction results for a completed job, as paginated JSON or a streamed CSV"""
+    if format == "csv":
+        body = await service.stream_prediction_results(job_name)
+        return StreamingResponse(
+            body,
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{job_name}.csv"'}
+        )
+    return await service.get_prediction_results(job_name, cursor, page_size)
 
 @router.get("/list-files/{bucket_type}")
-async def get_s3_files(bucket_type: str, s3_service: S3Service = Depends(get_s3_service)):
-    files = await s3_service.list_bucket_files(bucket_type)
-    return {"bucket": bucket_type, "files": files}
+async def get_s3_files(
+    bucket_type: str,
+    prefix: str = "",
+    delimiter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    page_size: int = Query(100, ge=1, le=1000),
+    sort_by: str = "name",
+    descending: bool = False,
+    refresh: bool = False,
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    listing = await s3_service.list_bucket_files(
+        bucket_type, prefix, delimiter, cursor, page_size, sort_by, descending, refresh
+    )
+    return {"bucket": bucket_type, **listing}
 
 @router.get("/file-content")
 async def get_file_content(bucket_type:str, file_key: str, s3_service: S3Service = Depends(get_s3_service)):
     content = await s3_service.get_file_content(bucket_type, file_key)
-    return {"file_key": file_key, "content": content}
\ No newline at end of file
+    return {"file_key": file_key, "content": content}
+
+@router.get("/file-download")
+async def download_file(
+    bucket_type: str,
+    file_key: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    status_code, headers, media_type, body = await s3_service.open_download(bucket_type, file_key, range_header)
+    return StreamingResponse(body, status_code=status_code, headers=headers, media_type=media_type)
+
+@router.get("/file-preview")
+async def preview_file(
+    bucket_type: str,
+    file_key: str,
+    rows: int = Query(100, ge=1, le=10000),
+    columns: Optional[str] = None,
+    row_groups: Optional[str] = None,
+    s3_service: S3Service = Depends(get_s3_service)
+):
+    selected_columns = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        selected_row_groups = [int(g) for g in row_groups.split(",") if g.strip()] if row_groups else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid row_groups: {row_groups}")
+    return await s3_service.get_file_preview(bucket_type, file_key, rows, selected_columns, selected_row_groups)
\ No newline at end of file
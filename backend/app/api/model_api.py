@@ -1,12 +1,10 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from app.services.model_service import ModelService
+from .dependencies import get_model_service
 
 router = APIRouter()
 
-def get_model_service():
-    return ModelService()
-
 class ModelRequest(BaseModel):
     model_package_arn: str
 
@@ -0,0 +1,41 @@
+from app.infrastructure.storage import (
+    BlockingExecutor,
+    ModelArtifactCache,
+    SageMakerRegistry,
+    create_storage,
+    listing_cache,
+    metrics_cache,
+)
+from app.services import ForecastService, ModelService, S3Service, ProgressHub, OnlinePredictionService
+
+class ServiceContainer:
+    """Clients, sessions, caches and services shared by every request in the process."""
+
+    def __init__(self):
+        self.executor = BlockingExecutor()
+        self.storage = create_storage(executor=self.executor)
+        self.registry = SageMakerRegistry(executor=self.executor)
+        self.listing_cache = listing_cache
+        self.metrics_cache = metrics_cache
+        self.progress_hub = ProgressHub()
+        self.model_cache = ModelArtifactCache(executor=self.executor)
+
+        self.s3_service = S3Service(storage=self.storage, listing_cache=self.listing_cache)
+        self.model_service = ModelService(
+            storage=self.storage,
+            registry=self.registry,
+            listing_cache=self.listing_cache,
+            metrics_cache=self.metrics_cache
+        )
+        self.forecast_service = ForecastService(storage=self.storage, listing_cache=self.listing_cache)
+        self.online_prediction_service = OnlinePredictionService(
+            storage=self.storage,
+            registry=self.registry,
+            model_service=self.model_service,
+            model_cache=self.model_cache
+        )
+
+    async def close(self):
+        await self.progress_hub.close()
+        await self.online_prediction_service.close()
+        self.executor.shutdown(wait=False)
@@ -1,40 +1,183 @@
 import sys
+import json
+import time
+import boto3
 import awswrangler as wr
 import pandas as pd
 from awsglue.utils import getResolvedOptions
 from pyspark.context import SparkContext
 from awsglue.context import GlueContext
-from sklearn.model_selection import train_test_split
+# Shipped next to this script with --extra-py-files.
+from sales_features import DATE_COLUMN, build_features, history_tail, time_split_cutoff
+
+def _optional_arg(name, default):
+    if f'--{name}' not in sys.argv:
+        return default
+    return getResolvedOptions(sys.argv, [name])[name]
 
 args = getResolvedOptions(sys.argv, ['JOB_NAME', 'PROCESSED_DATA_BUCKET', 'FEATURED_STORE_BUCKET'])
+# --FULL_REBUILD true recomputes the feature store from all processed data.
+FULL_REBUILD = _optional_arg('FULL_REBUILD', 'false').lower() == 'true'
+# "spark" spreads the work over the Glue workers; "pandas" runs everything on the driver.
+ENGINE = _optional_arg('ENGINE', 'spark')
 sc = SparkContext()
 glue_context = GlueContext(sc)
 spark = glue_context.spark_session
+# Keep hive partition values (ingest_date, region) as strings, as pandas reads them.
+spark.conf.set("spark.sql.sources.partitionColumnTypeInference.enabled", "false")
+s3_client = boto3.client('s3')
 
 PROCESSED_DATA_BUCKET_PATH = f"s3://{args['PROCESSED_DATA_BUCKET']}/"
 FEATURE_STORE_BUCKET_PATH = f"s3://{args['FEATURED_STORE_BUCKET']}/"
+# Hive-partitioned (ingest_date=/region=) dataset written by the ingest Lambdas.
+SALES_DATASET_PATH = f"{PROCESSED_DATA_BUCKET_PATH}sales/"
 
-def run_etl():
-    df = wr.s3.read_parquet(path=PROCESSED_DATA_BUCKET_PATH)
-
-    # Data Cleaning
+# Which processed files (path -> eTag) are already in train/ and test/, and where the current tail is.
+MANIFEST_KEY = "_state/manifest.json"
+# Recent input rows per series, so lag/rolling features of new rows see their history.
+# Each run writes a new tail directory and the manifest points at it.
+TAIL_PREFIX = f"{FEATURE_STORE_BUCKET_PATH}_state/tail/"
+# train/ and test/ are partitioned by the ingest date of the processed data.
+PARTITION_COLUMNS = ["ingest_date"]
+TEST_SIZE = 0.2
 
-    # Feature Engineering
+def load_manifest():
+    try:
+        body = s3_client.get_object(Bucket=args['FEATURED_STORE_BUCKET'], Key=MANIFEST_KEY)['Body']
+    except s3_client.exceptions.NoSuchKey:
+        return {"files": {}}
+    return json.loads(body.read())
 
-    train_df, test_df = train_test_split(df, test_size=0.2, shuffle=False)
-    wr.s3.to_parquet(
-        df=train_df,
-        path=f"{FEATURE_STORE_BUCKET_PATH}train/",
-        dataset=True,
-        mode="append",
+def save_manifest(manifest):
+    s3_client.put_object(
+        Bucket=args['FEATURED_STORE_BUCKET'],
+        Key=MANIFEST_KEY,
+        Body=json.dumps(manifest).encode("utf-8"),
+        ContentType="application/json"
     )
 
-    wr.s3.to_parquet(
-        df=test_df,
-        path=f"{FEATURE_STORE_BUCKET_PATH}test/",
-        dataset=True,
-        mode="append",
+def list_processed_files():
+    objects = wr.s3.describe_objects(path=SALES_DATASET_PATH)
+    return {path: desc["ETag"] for path, desc in objects.items() if path.endswith(".parquet")}
+
+def plan_run(processed_files, manifest, full_rebuild=False):
+    """Return (full_rebuild, files to featurize).
+
+    A file whose eTag changed after it was featurized forces a full rebuild,
+    since its earlier rows are already in the feature store.
+    """
+    featurized = manifest.get("files", {})
+    changed = [path for path, etag in processed_files.items() if path in featurized and featurized[path] != etag]
+    if full_rebuild or changed or not featurized:
+        return True, sorted(processed_files)
+    return False, sorted(path for path in processed_files if path not in featurized)
+
+def _partition_columns(columns):
+    return [column for column in PARTITION_COLUMNS if column in columns]
+
+# pandas engine
+
+def featurize(new_df, tail_df=None):
+    """Compute features for `new_df`, using `tail_df` only as lookback context.
+
+    Returns (features for the new rows, input rows to carry as the next tail).
+    """
+    frames = [new_df.assign(_is_new=True)]
+    if tail_df is not None and len(tail_df):
+        frames.insert(0, tail_df.assign(_is_new=False))
+    # Tail rows go first so clean() keeps the new row when a day appears in both.
+    combined = pd.concat(frames, ignore_index=True)
+
+    features = build_features(combined)
+    new_rows = features[features["_is_new"]].drop(columns="_is_new")
+    return new_rows, history_tail(combined.drop(columns="_is_new"))
+
+def write_features(df, mode):
+    cutoff = time_split_cutoff(df[DATE_COLUMN].value_counts(), TEST_SIZE)
+    is_test = df[DATE_COLUMN] >= cutoff if cutoff is not None else pd.Series(False, index=df.index)
+    for name, part in (("train", df[~is_test]), ("test", df[is_test])):
+        if len(part) == 0:
+            continue
+        wr.s3.to_parquet(
+            df=part,
+            path=f"{FEATURE_STORE_BUCKET_PATH}{name}/",
+            dataset=True,
+            mode=mode,
+            partition_cols=_partition_columns(part.columns) or None,
+        )
+
+def run_pandas(paths, tail_path, full_rebuild, next_tail_path):
+    new_df = wr.s3.read_parquet(path=paths, path_root=SALES_DATASET_PATH, dataset=True)
+    tail_df = None if full_rebuild or not tail_path else wr.s3.read_parquet(path=tail_path)
+    features, tail = featurize(new_df, tail_df)
+
+    write_features(features, "overwrite" if full_rebuild else "append")
+    if len(tail) == 0:
+        return None
+    wr.s3.to_parquet(df=tail, path=next_tail_path, dataset=True)
+    return next_tail_path
+
+# spark engine
+
+def featurize_spark(new_sdf, tail_sdf=None):
+    from pyspark.sql import functions as F
+    from spark_features import (
+        ORDER_COLUMNS, build_features as build_spark_features, history_tail as spark_history_tail, with_input_order
     )
 
+    combined = with_input_order(new_sdf, source=1).withColumn("_is_new", F.lit(True))
+    if tail_sdf is not None:
+        # Tail rows go first so clean() keeps the new row when a day appears in both.
+        tail_sdf = with_input_order(tail_sdf, source=0).withColumn("_is_new", F.lit(False))
+        combined = tail_sdf.unionByName(combined, allowMissingColumns=True)
+
+    features = build_spark_features(combined)
+    new_rows = features.filter(F.col("_is_new")).drop("_is_new")
+    return new_rows, spark_history_tail(combined.drop("_is_new", *ORDER_COLUMNS))
+
+def write_features_spark(sdf, mode):
+    from pyspark.sql import functions as F
+
+    sdf = sdf.cache()
+    date_counts = sdf.groupBy(DATE_COLUMN).count().toPandas().set_index(DATE_COLUMN)["count"]
+    cutoff = time_split_cutoff(date_counts, TEST_SIZE)
+    is_test = F.col(DATE_COLUMN) >= F.lit(cutoff.to_pydatetime()) if cutoff is not None else F.lit(False)
+    partition_columns = _partition_columns(sdf.columns)
+    for name, part in (("train", sdf.filter(~is_test)), ("test", sdf.filter(is_test))):
+        writer = part.write.mode(mode)
+        if partition_columns:
+            writer = writer.partitionBy(*partition_columns)
+        writer.parquet(f"{FEATURE_STORE_BUCKET_PATH}{name}/")
+    sdf.unpersist()
+
+def run_spark(paths, tail_path, full_rebuild, next_tail_path):
+    new_sdf = spark.read.option("basePath", SALES_DATASET_PATH).parquet(*paths)
+    tail_sdf = None if full_rebuild or not tail_path else spark.read.parquet(tail_path)
+    features, tail = featurize_spark(new_sdf, tail_sdf)
+
+    write_features_spark(features, "overwrite" if full_rebuild else "append")
+    tail.write.mode("overwrite").parquet(next_tail_path)
+    return next_tail_path
+
+def run_etl(full_rebuild=FULL_REBUILD, engine=ENGINE):
+    processed_files = list_processed_files()
+    manifest = load_manifest()
+    full_rebuild, paths = plan_run(processed_files, manifest, full_rebuild)
+    if not paths:
+        print("No new processed files to featurize")
+        return
+
+    print(f"Featurizing {len(paths)} processed files with {engine} ({'full rebuild' if full_rebuild else 'incremental'})")
+    run = run_spark if engine == "spark" else run_pandas
+    previous_tail = manifest.get("tail")
+    tail_path = run(paths, previous_tail, full_rebuild, f"{TAIL_PREFIX}{int(time.time())}/")
+
+    # Written last: a failed run leaves the manifest, and the tail it points at, untouched and is redone next time.
+    featurized = {} if full_rebuild else manifest.get("files", {})
+    featurized.update({path: processed_files[path] for path in paths})
+    save_manifest({"files": featurized, "tail": tail_path})
+    if previous_tail and previous_tail != tail_path:
+        wr.s3.delete_objects(previous_tail)
+
 if __name__ == "__main__":
-    run_etl() 
\ No newline at end of file
+    run_etl()
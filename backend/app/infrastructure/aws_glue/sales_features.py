@@ -0,0 +1,130 @@
+"""Per-series time-series features for the sales data.
+
+Plain pandas/NumPy with no Glue or Spark imports, so the same code runs in the
+Glue job, in notebooks and in benchmarks. Every feature is computed with grouped
+operations over the whole frame at once; nothing loops over series in Python.
+"""
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ["store_id", "category"]
+DATE_COLUMN = "date"
+TARGET_COLUMN = "sales"
+LAGS = (1, 7, 14, 28)
+ROLLING_WINDOWS = (7, 28)
+# Longest history any feature looks at, in days: the incremental ETL carries at least this much.
+MAX_LOOKBACK_DAYS = max(max(LAGS), max(ROLLING_WINDOWS) + 1)
+
+def series_keys(df):
+    return [key for key in SERIES_KEYS if key in df.columns]
+
+def clean(df):
+    """Parse dates, drop rows without a date or target, keep the last row per series and day, sort."""
+    df = df.copy()
+    df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN], errors="coerce")
+    required = [DATE_COLUMN] + ([TARGET_COLUMN] if TARGET_COLUMN in df.columns else [])
+    df = df.dropna(subset=required)
+
+    keys = series_keys(df)
+    df = df.drop_duplicates(subset=keys + [DATE_COLUMN], keep="last")
+    return df.sort_values(keys + [DATE_COLUMN], kind="stable", ignore_index=True)
+
+def _grouped(df, column):
+    keys = series_keys(df)
+    if not keys:
+        return df[column]
+    return df.groupby(keys, sort=False, observed=True, dropna=False)[column]
+
+def _rolling(df, column, window, stat):
+    keys = series_keys(df)
+    if not keys:
+        return getattr(df[column].rolling(window, min_periods=1), stat)()
+    # groupby().rolling() evaluates all groups in one pass with a group-aware indexer.
+    rolled = getattr(_grouped(df, column).rolling(window, min_periods=1), stat)()
+    return rolled.reset_index(level=list(range(len(keys))), drop=True).reindex(df.index)
+
+def add_lag_features(df, lags=LAGS, rolling_windows=ROLLING_WINDOWS):
+    """Target lags and rolling mean/std over the previous `window` observations.
+
+    Expects clean(): rows sorted by series and date, one row per day. Rolling
+    statistics start from lag 1, so a row never sees its own target.
+    """
+    if TARGET_COLUMN not in df.columns:
+        return df
+    for lag in lags:
+        df[f"{TARGET_COLUMN}_lag_{lag}"] = _grouped(df, TARGET_COLUMN).shift(lag)
+
+    lag_1 = f"{TARGET_COLUMN}_lag_1"
+    if lag_1 not in df.columns:
+        df[lag_1] = _grouped(df, TARGET_COLUMN).shift(1)
+    for window in rolling_windows:
+        df[f"{TARGET_COLUMN}_rolling_mean_{window}"] = _rolling(df, lag_1, window, "mean")
+        df[f"{TARGET_COLUMN}_rolling_std_{window}"] = _rolling(df, lag_1, window, "std")
+    return df
+
+def default_holidays(dates):
+    from pandas.tseries.holiday import USFederalHolidayCalendar
+
+    return USFederalHolidayCalendar().holidays(start=dates.min(), end=dates.max() + pd.Timedelta(days=1))
+
+def add_calendar_features(df, holidays=None):
+    """Calendar parts and holiday flags. `holidays` is any list of dates; defaults to US federal holidays."""
+    dates = df[DATE_COLUMN]
+    df["day_of_week"] = dates.dt.dayofweek.astype("int8")
+    df["day_of_month"] = dates.dt.day.astype("int8")
+    df["week_of_year"] = dates.dt.isocalendar().week.astype("int8")
+    df["month"] = dates.dt.month.astype("int8")
+    df["quarter"] = dates.dt.quarter.astype("int8")
+    df["year"] = dates.dt.year.astype("int16")
+    df["is_weekend"] = (df["day_of_week"] >= 5).astype("int8")
+    df["is_month_start"] = dates.dt.is_month_start.astype("int8")
+    df["is_month_end"] = dates.dt.is_month_end.astype("int8")
+
+    if len(df) == 0:
+        df["is_holiday"] = df["is_holiday_eve"] = pd.Series(dtype="int8")
+        return df
+    holidays = pd.DatetimeIndex(default_holidays(dates) if holidays is None else pd.to_datetime(holidays)).normalize()
+    days = dates.dt.normalize()
+    df["is_holiday"] = days.isin(holidays).astype("int8")
+    df["is_holiday_eve"] = (days + pd.Timedelta(days=1)).isin(holidays).astype("int8")
+    return df
+
+def add_price_promotion_features(df, rolling_window=max(ROLLING_WINDOWS)):
+    """Per-series price changes, price relative to its recent average, and promotion start/end flags."""
+    if "price" in df.columns:
+        previous_price = _grouped(df, "price").shift(1)
+        df["price_change"] = df["price"] - previous_price
+        df["price_pct_change"] = (df["price_change"] / previous_price.replace(0, np.nan)).astype("float64")
+        average_price = _rolling(df, "price", rolling_window, "mean")
+        df[f"price_vs_rolling_mean_{rolling_window}"] = df["price"] / average_price.replace(0, np.nan) - 1
+
+    if "promotion" in df.columns:
+        previous_promotion = _grouped(df, "promotion").shift(1)
+        df["promotion_change"] = df["promotion"] - previous_promotion
+        active, was_active = df["promotion"].fillna(0) > 0, previous_promotion.fillna(0) > 0
+        df["promotion_started"] = (active & ~was_active).astype("int8")
+        df["promotion_ended"] = (~active & was_active).astype("int8")
+    return df
+
+def history_tail(df, lookback_days=MAX_LOOKBACK_DAYS):
+    """Rows within `lookback_days` of each series' latest date."""
+    if DATE_COLUMN not in df.columns:
+        return df.iloc[0:0]
+    dates = pd.to_datetime(df[DATE_COLUMN])
+    keys = series_keys(df)
+    latest = dates.groupby([df[key] for key in keys]).transform("max") if keys else dates.max()
+    return df[dates > latest - pd.Timedelta(days=lookback_days)]
+
+def time_split_cutoff(date_counts, test_size=0.2):
+    """First test date, given row counts per date: the last `test_size` of rows by time, whole days only."""
+    counts = pd.Series(date_counts).sort_index()
+    n_train = int(counts.sum()) - int(np.ceil(test_size * counts.sum()))
+    after = counts.index[counts.cumsum().to_numpy() > n_train]
+    return after[0] if len(after) else None
+
+def build_features(df, holidays=None):
+    """clean() followed by every feature group."""
+    df = clean(df)
+    df = add_lag_features(df)
+    df = add_calendar_features(df, holidays)
+    return add_price_promotion_features(df)
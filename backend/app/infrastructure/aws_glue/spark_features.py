@@ -0,0 +1,154 @@
+"""Spark implementation of sales_features.build_features.
+
+Same columns, types and values as the pandas version, computed with window
+functions partitioned by series so the work is spread across executors.
+Runs on Glue or on a local session (`SparkSession.builder.master("local[*]")`);
+benchmarks/check_spark_parity.py checks the parity on edge-case fixtures.
+"""
+import pandas as pd
+from pyspark.sql import Window, functions as F
+
+from sales_features import (
+    DATE_COLUMN, LAGS, MAX_LOOKBACK_DAYS, ROLLING_WINDOWS, SERIES_KEYS, TARGET_COLUMN, default_holidays
+)
+
+# Input order of a row: which read it came from, then its file in path order and its position there.
+ORDER_COLUMNS = ["_source", "_file", "_block", "_row"]
+
+def series_keys(sdf):
+    return [key for key in SERIES_KEYS if key in sdf.columns]
+
+def _series_window(sdf):
+    # Without series keys every row lands in one partition, as in the pandas version's single group.
+    return Window.partitionBy(*series_keys(sdf)).orderBy(DATE_COLUMN)
+
+def _trailing(sdf, window):
+    return _series_window(sdf).rowsBetween(-(window - 1), Window.currentRow)
+
+def with_input_order(sdf, source=0):
+    """Tag each row of a parquet read with its input order; call it before any union or shuffle.
+
+    Spark packs file splits by size, not path, so the order rows arrive in is
+    not the order pandas concatenates the same files in. Within one block of a
+    file all rows sit in one partition, where monotonically_increasing_id follows
+    row order. Rows of later `source`s come after earlier ones.
+    """
+    return (
+        sdf.withColumn("_source", F.lit(source))
+        .withColumn("_file", F.input_file_name())
+        .withColumn("_block", F.input_file_block_start())
+        .withColumn("_row", F.monotonically_increasing_id())
+    )
+
+def clean(sdf):
+    """Parse dates, drop rows without a date or target, keep the last row per series and day.
+
+    "Last" is input order, as in pandas: see with_input_order. A frame that
+    was not tagged is taken as a single read.
+    """
+    if not set(ORDER_COLUMNS).issubset(sdf.columns):
+        sdf = with_input_order(sdf)
+    sdf = sdf.withColumn(DATE_COLUMN, F.to_timestamp(F.col(DATE_COLUMN)))
+    required = [DATE_COLUMN] + ([TARGET_COLUMN] if TARGET_COLUMN in sdf.columns else [])
+    sdf = sdf.dropna(subset=required)
+
+    latest_first = Window.partitionBy(*series_keys(sdf), DATE_COLUMN).orderBy(
+        *(F.desc(column) for column in ORDER_COLUMNS)
+    )
+    return (
+        sdf.withColumn("_rank", F.row_number().over(latest_first))
+        .filter(F.col("_rank") == 1)
+        .drop("_rank", *ORDER_COLUMNS)
+    )
+
+def add_lag_features(sdf, lags=LAGS, rolling_windows=ROLLING_WINDOWS):
+    if TARGET_COLUMN not in sdf.columns:
+        return sdf
+    window = _series_window(sdf)
+    for lag in lags:
+        sdf = sdf.withColumn(f"{TARGET_COLUMN}_lag_{lag}", F.lag(TARGET_COLUMN, lag).over(window))
+
+    lag_1 = f"{TARGET_COLUMN}_lag_1"
+    if lag_1 not in sdf.columns:
+        sdf = sdf.withColumn(lag_1, F.lag(TARGET_COLUMN, 1).over(window))
+    for size in rolling_windows:
+        trailing = _trailing(sdf, size)
+        sdf = sdf.withColumn(f"{TARGET_COLUMN}_rolling_mean_{size}", F.avg(lag_1).over(trailing))
+        sdf = sdf.withColumn(f"{TARGET_COLUMN}_rolling_std_{size}", F.stddev_samp(lag_1).over(trailing))
+    return sdf
+
+def add_calendar_features(sdf, holidays=None):
+    date = F.col(DATE_COLUMN)
+    day = F.to_date(date)
+    sdf = (
+        sdf
+        # Spark counts days of week from Sunday = 1; pandas from Monday = 0.
+        .withColumn("day_of_week", ((F.dayofweek(date) + 5) % 7).cast("tinyint"))
+        .withColumn("day_of_month", F.dayofmonth(date).cast("tinyint"))
+        .withColumn("week_of_year", F.weekofyear(date).cast("tinyint"))
+        .withColumn("month", F.month(date).cast("tinyint"))
+        .withColumn("quarter", F.quarter(date).cast("tinyint"))
+        .withColumn("year", F.year(date).cast("smallint"))
+        .withColumn("is_weekend", (F.col("day_of_week") >= 5).cast("tinyint"))
+        .withColumn("is_month_start", (F.dayofmonth(date) == 1).cast("tinyint"))
+        .withColumn("is_month_end", (day == F.last_day(date)).cast("tinyint"))
+    )
+
+    if holidays is None:
+        bounds = sdf.agg(F.min(DATE_COLUMN).alias("start"), F.max(DATE_COLUMN).alias("end")).first()
+        if bounds["start"] is None:
+            holidays = []
+        else:
+            holidays = default_holidays(pd.Series(pd.to_datetime([bounds["start"], bounds["end"]])))
+    holiday_dates = [timestamp.date() for timestamp in pd.DatetimeIndex(pd.to_datetime(holidays)).normalize()]
+    return (
+        sdf
+        .withColumn("is_holiday", day.isin(holiday_dates).cast("tinyint"))
+        .withColumn("is_holiday_eve", F.date_add(day, 1).isin(holiday_dates).cast("tinyint"))
+    )
+
+def add_price_promotion_features(sdf, rolling_window=max(ROLLING_WINDOWS)):
+    window = _series_window(sdf)
+    if "price" in sdf.columns:
+        previous_price = F.lag("price", 1).over(window)
+        average_price = F.avg("price").over(_trailing(sdf, rolling_window))
+        sdf = (
+            sdf
+            .withColumn("price_change", F.col("price") - previous_price)
+            .withColumn("price_pct_change", F.when(previous_price != 0, F.col("price_change") / previous_price))
+            .withColumn(
+                f"price_vs_rolling_mean_{rolling_window}",
+                F.when(average_price != 0, F.col("price") / average_price - 1)
+            )
+        )
+
+    if "promotion" in sdf.columns:
+        previous_promotion = F.lag("promotion", 1).over(window)
+        active = F.coalesce(F.col("promotion"), F.lit(0)) > 0
+        was_active = F.coalesce(previous_promotion, F.lit(0)) > 0
+        sdf = (
+            sdf
+            .withColumn("promotion_change", F.col("promotion") - previous_promotion)
+            .withColumn("promotion_started", (active & ~was_active).cast("tinyint"))
+            .withColumn("promotion_ended", (~active & was_active).cast("tinyint"))
+        )
+    return sdf
+
+def history_tail(sdf, lookback_days=MAX_LOOKBACK_DAYS):
+    """Rows within `lookback_days` of each series' latest date."""
+    if DATE_COLUMN not in sdf.columns:
+        return sdf.limit(0)
+    dates = F.to_timestamp(F.col(DATE_COLUMN))
+    # Spark rejects window functions inside filter(), so the series' latest date is a column first.
+    latest = F.max(dates).over(Window.partitionBy(*series_keys(sdf)))
+    return (
+        sdf.withColumn("_latest", latest)
+        .filter(dates > F.col("_latest") - F.expr(f"INTERVAL {int(lookback_days)} DAYS"))
+        .drop("_latest")
+    )
+
+def build_features(sdf, holidays=None):
+    sdf = clean(sdf)
+    sdf = add_lag_features(sdf)
+    sdf = add_calendar_features(sdf, holidays)
+    return add_price_promotion_features(sdf)
@@ -1,5 +1,16 @@
-from .s3_ingest_handler import handler as s3_ingest_handler
-from .textract_collector_handler import handler as textract_collector_handler
-from .glue_trigger_handler import handler as glue_trigger_handler
+import importlib
 
-__all__ = ["s3_ingest_handler", "textract_collector_handler", "glue_trigger_handler"]
\ No newline at end of file
+# Handlers are resolved on first access so importing one handler (or the package)
+# does not pay for the heavy dependencies of the others.
+_HANDLER_MODULES = {
+    "s3_ingest_handler": ".s3_ingest_handler",
+    "textract_collector_handler": ".textract_collector_handler",
+    "glue_trigger_handler": ".glue_trigger_handler",
+}
+
+def __getattr__(name):
+    if name not in _HANDLER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(_HANDLER_MODULES[name], __name__).handler
+
+__all__ = ["s3_ingest_handler", "textract_collector_handler", "glue_trigger_handler"]
@@ -1,15 +1,22 @@
 import boto3
 import json
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _client(service_name):
+    # Created on first use and reused by warm invocations.
+    return boto3.client(service_name)
 
 def handler(event, context):
-    glue = boto3.client('glue')
-    sagemaker = boto3.client('sagemaker')
+    glue = _client('glue')
 
     job_name = event.get('glue_job_name', 'feature-engineering-job')
     callback_token = event.get('callback_token')
+    # The feature job is incremental by default; full_rebuild recomputes it from all processed data.
+    arguments = {'--FULL_REBUILD': 'true'} if event.get('full_rebuild') else {}
 
     try:
-        response = glue.start_job_run(JobName=job_name)
+        response = glue.start_job_run(JobName=job_name, Arguments=arguments)
         job_run_id = response['JobRunId']
 
         return {
@@ -0,0 +1,291 @@
+import os
+import re
+from datetime import datetime, timezone
+from itertools import islice
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+ROW_GROUP_ROWS = int(os.environ.get('PARQUET_ROW_GROUP_ROWS', '131072'))
+CSV_BLOCK_BYTES = int(os.environ.get('INGEST_CSV_BLOCK_BYTES', str(8 * 1024 * 1024)))
+SCHEMA_SAMPLE_ROWS = int(os.environ.get('INGEST_SCHEMA_SAMPLE_ROWS', '10000'))
+COMPRESSION = os.environ.get('PARQUET_COMPRESSION', 'zstd')
+
+# Processed data lives at s3://<processed>/<PROCESSED_PREFIX>/ingest_date=YYYY-MM-DD/<PARTITION_COLUMN>=<value>/
+PROCESSED_PREFIX = os.environ.get('PROCESSED_DATASET_PREFIX', 'sales')
+PARTITION_COLUMN = os.environ.get('PROCESSED_PARTITION_COLUMN', 'region')
+UNKNOWN_PARTITION = "unknown"
+
+# Canonical types for the sales columns downstream jobs rely on, so every file agrees.
+SALES_COLUMN_TYPES = {
+    "date": pa.date32(),
+    "store_id": pa.string(),
+    "region": pa.string(),
+    "category": pa.string(),
+    "price": pa.float64(),
+    "promotion": pa.float64(),
+    "sales": pa.float64(),
+}
+
+def normalize_column_name(name):
+    normalized = re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+    return normalized or "column"
+
+def _canonical_type(name, inferred):
+    canonical = SALES_COLUMN_TYPES.get(name)
+    if canonical is None or pa.types.is_null(inferred):
+        return canonical or inferred
+    if pa.types.is_string(canonical):
+        return canonical
+    if pa.types.is_floating(canonical) and (pa.types.is_integer(inferred) or pa.types.is_floating(inferred)):
+        return canonical
+    if pa.types.is_date(canonical) and pa.types.is_temporal(inferred):
+        return canonical
+    # e.g. dates in a non-ISO format: keep the text rather than fail the cast.
+    return inferred
+
+def lock_schema(schema):
+    """Fix a schema inferred from a sample for the whole file.
+
+    Names are normalized to snake_case, known sales columns get their canonical
+    types where the sampled values allow it, and all-null sample columns become strings.
+    """
+    fields, seen = [], set()
+    for field in schema:
+        name = normalize_column_name(field.name)
+        suffix = 1
+        while name in seen:
+            name, suffix = f"{normalize_column_name(field.name)}_{suffix}", suffix + 1
+        seen.add(name)
+
+        field_type = _canonical_type(name, field.type)
+        fields.append(pa.field(name, pa.string() if pa.types.is_null(field_type) else field_type))
+    return pa.schema(fields)
+
+def _read_schema(schema):
+    return pa.schema([
+        pa.field(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+        for field in schema
+    ])
+
+def _conform(table, schema):
+    return table.rename_columns(schema.names).cast(schema, safe=False)
+
+def conform_table(table):
+    """Return (schema, table) with the table's own schema locked and applied."""
+    schema = lock_schema(table.schema)
+    return schema, _conform(table, schema)
+
+class RowGroupWriter:
+    """Buffers record batches and writes them to parquet in row groups of `row_group_rows`.
+
+    Peak memory is roughly one row group plus the batch being added, whatever the file size.
+    """
+
+    def __init__(self, sink, schema, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+        self.schema = schema
+        self.row_group_rows = row_group_rows
+        self.rows_written = 0
+        self.row_groups = 0
+        self._writer = pq.ParquetWriter(sink, schema, compression=compression, use_dictionary=True)
+        self._pending = []
+        self._pending_rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._writer.close()
+
+    def write_batch(self, batch):
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        while self._pending_rows >= self.row_group_rows:
+            self._flush(self.row_group_rows)
+
+    def write_table(self, table):
+        for batch in table.to_batches():
+            self.write_batch(batch)
+
+    def close(self):
+        if self._pending_rows:
+            self._flush()
+        self._writer.close()
+
+    def _flush(self, limit=None):
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        head = table.slice(0, limit) if limit else table
+        self._writer.write_table(head, row_group_size=head.num_rows)
+        self.rows_written += head.num_rows
+        self.row_groups += 1
+
+        rest = table.slice(head.num_rows)
+        self._pending = rest.to_batches()
+        self._pending_rows = rest.num_rows
+
+def _iter_csv_blocks(source, block_size):
+    """Yield (header, rows) byte blocks cut at line boundaries, holding one block at a time.
+
+    pyarrow's streaming CSV reader reads ahead without a memory bound, so blocks
+    are cut here instead. Like pyarrow's parallel parser, this assumes quoted
+    values contain no newlines.
+    """
+    header, remainder = None, b""
+    while data := source.read(block_size):
+        data = remainder + data
+        if header is None:
+            newline = data.find(b"\n")
+            if newline < 0:
+                remainder = data
+                continue
+            header, data = data[:newline + 1], data[newline + 1:]
+        cut = data.rfind(b"\n") + 1
+        remainder = data[cut:]
+        if cut:
+            yield header, data[:cut]
+    if header is not None and remainder.strip():
+        yield header, remainder
+
+def csv_tables(source, block_size=CSV_BLOCK_BYTES):
+    """Return (schema, tables) for a CSV input stream, parsed one block at a time.
+
+    The schema is inferred from the first block, locked, and enforced for the rest of the file.
+    """
+    blocks = _iter_csv_blocks(source, block_size)
+    first = next(blocks, None)
+    if first is None:
+        raise ValueError("CSV file has no data rows")
+
+    header, block = first
+    first_table = pa_csv.read_csv(pa.BufferReader(header + block))
+    schema = lock_schema(first_table.schema)
+    convert_options = pa_csv.ConvertOptions(column_types=_read_schema(first_table.schema))
+
+    def _tables():
+        yield _conform(first_table, schema)
+        for header, block in blocks:
+            yield _conform(pa_csv.read_csv(pa.BufferReader(header + block), convert_options=convert_options), schema)
+
+    return schema, _tables()
+
+def _column_array(values, field=None):
+    if field is not None:
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        try:
+            return pa.array(values, type=field.type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Column '{field.name}' does not match its sampled type {field.type}: {e}") from e
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type sample column: keep it as text.
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+def _rows_to_table(header, rows, schema=None):
+    width = len(header)
+    columns = list(zip(*[tuple(row[:width]) + (None,) * (width - len(row)) for row in rows])) or [()] * width
+    if schema is None:
+        arrays = [_column_array(list(values)) for values in columns]
+        return pa.Table.from_arrays(arrays, names=header)
+    arrays = [_column_array(list(values), field) for values, field in zip(columns, schema)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def excel_tables(path, sample_rows=SCHEMA_SAMPLE_ROWS, chunk_rows=ROW_GROUP_ROWS):
+    """Return (schema, tables) for the active sheet of a local XLSX file, read in openpyxl read-only mode."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [
+            str(name) if name is not None else f"column_{i}"
+            for i, name in enumerate(next(rows, ()))
+        ]
+        sample = list(islice(rows, sample_rows))
+        sample_table = _rows_to_table(header, sample)
+        schema = lock_schema(sample_table.schema)
+    except Exception:
+        workbook.close()
+        raise
+
+    def _tables():
+        try:
+            yield _conform(sample_table, schema)
+            while chunk := list(islice(rows, chunk_rows)):
+                yield _rows_to_table(schema.names, chunk, schema)
+        finally:
+            workbook.close()
+
+    return schema, _tables()
+
+def write_parquet(schema, tables, sink, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    with RowGroupWriter(sink, schema, row_group_rows, compression) as writer:
+        for table in tables:
+            writer.write_table(table)
+    return {"rows": writer.rows_written, "row_groups": writer.row_groups}
+
+def csv_to_parquet(source, sink, block_size=CSV_BLOCK_BYTES, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    schema, tables = csv_tables(source, block_size)
+    return write_parquet(schema, tables, sink, row_group_rows, compression)
+
+def excel_to_parquet(path, sink, sample_rows=SCHEMA_SAMPLE_ROWS, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    schema, tables = excel_tables(path, sample_rows, row_group_rows)
+    return write_parquet(schema, tables, sink, row_group_rows, compression)
+
+def _with_partition_columns(table, ingest_date, partition_column):
+    if partition_column in table.column_names:
+        values = table[partition_column].cast(pa.string())
+        values = pc.if_else(pc.equal(values, ""), UNKNOWN_PARTITION, pc.fill_null(values, UNKNOWN_PARTITION))
+        table = table.drop_columns([partition_column])
+    else:
+        values = pa.array([UNKNOWN_PARTITION] * table.num_rows, type=pa.string())
+    table = table.append_column(pa.field(partition_column, pa.string()), values)
+    return table.append_column(
+        pa.field("ingest_date", pa.string()),
+        pa.array([ingest_date] * table.num_rows, type=pa.string())
+    )
+
+def write_partitioned(schema, tables, base_dir, source_id, filesystem=None, ingest_date=None,
+                      partition_column=PARTITION_COLUMN, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+    """Write tables as a hive-partitioned dataset under `base_dir` (ingest_date, then `partition_column`).
+
+    Files are named after `source_id`, so different sources never overwrite each
+    other and re-processing the same source replaces its own files. Callers pass
+    the source's own `ingest_date` (the S3 event time) so that holds for replays
+    on a later day too; it only defaults to today for ad-hoc use.
+    """
+    ingest_date = ingest_date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    dataset_schema = _with_partition_columns(schema.empty_table(), ingest_date, partition_column).schema
+    partitioning = ds.partitioning(
+        pa.schema([("ingest_date", pa.string()), (partition_column, pa.string())]),
+        flavor="hive"
+    )
+
+    stats = {"rows": 0, "files": []}
+
+    def _batches():
+        for table in tables:
+            stats["rows"] += table.num_rows
+            yield from _with_partition_columns(table, ingest_date, partition_column).to_batches()
+
+    ds.write_dataset(
+        _batches(),
+        base_dir,
+        schema=dataset_schema,
+        format="parquet",
+        partitioning=partitioning,
+        filesystem=filesystem,
+        basename_template=f"{source_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        min_rows_per_group=row_group_rows,
+        max_rows_per_group=row_group_rows,
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression, use_dictionary=True),
+        file_visitor=lambda written_file: stats["files"].append(written_file.path),
+    )
+    return stats
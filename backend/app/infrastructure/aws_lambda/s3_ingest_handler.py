@@ -1,40 +1,118 @@
-import awswrangler as wr
 import boto3
+import hashlib
 import os
+import json
 import logging
+import tempfile
+import threading
 import urllib.parse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-textract_client = boto3.client('textract')
-s3_client = boto3.client('s3')
+# awswrangler, pandas and pyarrow are imported inside the code paths that need
+# them so that PDF events and cold starts do not pay for them.
 
-def handler(event, context):
-    processed_bucket = os.environ.get('S3_PROCESSED_DATA_BUCKET')
+MAX_WORKERS = int(os.environ.get('INGEST_MAX_WORKERS', '4'))
+# "streaming" keeps peak memory independent of file size; "in-memory" loads the whole file.
+CONVERSION_MODE = os.environ.get('INGEST_CONVERSION_MODE', 'streaming')
+# Upload dedup index entries live in the raw bucket but are not data.
+CONTENT_INDEX_PREFIX = os.environ.get('CONTENT_INDEX_PREFIX', '_index/')
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _client(service_name):
+    # Client creation on the default boto3 session is not thread-safe.
+    with _clients_lock:
+        if service_name not in _clients:
+            _clients[service_name] = boto3.client(service_name)
+        return _clients[service_name]
+
+def _collect_records(event):
+    """Return ([(sqs message id or None, s3 record)], unparseable message ids).
+
+    Handles S3 notifications delivered directly and wrapped in SQS messages.
+    """
+    records, failed_message_ids = [], []
+    for record in event.get('Records', []):
+        if record.get('eventSource') != 'aws:sqs':
+            records.append((None, record))
+            continue
+        try:
+            body = json.loads(record['body'])
+        except (KeyError, ValueError) as e:
+            logger.error(f"Unreadable SQS message {record.get('messageId')}: {str(e)}")
+            failed_message_ids.append(record['messageId'])
+            continue
+        # s3:TestEvent messages carry no Records and are simply acknowledged.
+        records.extend((record['messageId'], s3_record) for s3_record in body.get('Records', []))
+    return records, failed_message_ids
 
+def _ingest_date(s3_record):
+    # The upload's eventTime, not the processing time, so a replayed record
+    # lands in (and overwrites) the partition of its first delivery.
+    event_time = s3_record.get('eventTime')
+    if not event_time:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return datetime.fromisoformat(event_time.replace("Z", "+00:00")).astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+def process_record(s3_record, processed_bucket):
+    bucket_raw = s3_record['s3']['bucket']['name']
+    key = urllib.parse.unquote_plus(s3_record['s3']['object']['key'])
+    path = f"s3://{bucket_raw}/{key}"
+    file_extension = os.path.splitext(key)[1].lower()
+
+    if key.startswith(CONTENT_INDEX_PREFIX):
+        return {"status": "SKIPPED"}
+
+    if file_extension == '.pdf':
+        return trigger_textract(bucket_raw, key, _ingest_date(s3_record))
+    
+    elif file_extension in ['.csv', '.xlsx']:
+        return process_structured_data(
+            path, processed_bucket, key, file_extension, _source_id(s3_record, key), _ingest_date(s3_record)
+        )
+    
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+def _safe_process(message_id, s3_record, processed_bucket):
     try:
-        bucket_raw = event['Records'][0]['s3']['bucket']['name']
-        key = urllib.parse.unquote_plus(event['Records'][0]['s3']['object']['key'])
-        path = f"s3://{bucket_raw}/{key}"
-        file_extension = os.path.splitext(key)[1].lower()
-
-        if file_extension == '.pdf':
-            return trigger_textract(bucket_raw, key)
-        
-        elif file_extension in ['.csv', '.xlsx']:
-            return process_structured_data(path, processed_bucket, key, file_extension)
-        
-        else:
-            raise ValueError(f"Unsupported file type: {file_extension}")
+        result = process_record(s3_record, processed_bucket)
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
-        return {"status": "FAILED", "error": str(e)}
+        result = {"status": "FAILED", "error": str(e)}
+    key = s3_record.get('s3', {}).get('object', {}).get('key')
+    return {**result, "file": key, "messageId": message_id}
+
+def handler(event, context):
+    processed_bucket = os.environ.get('S3_PROCESSED_DATA_BUCKET')
+    records, failed_message_ids = _collect_records(event)
+
+    results = []
+    if records:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(records))) as pool:
+            results = list(pool.map(lambda r: _safe_process(r[0], r[1], processed_bucket), records))
+
+    for result in results:
+        if result["status"] == "FAILED" and result["messageId"] and result["messageId"] not in failed_message_ids:
+            failed_message_ids.append(result["messageId"])
+
+    failed = any(result["status"] == "FAILED" for result in results) or failed_message_ids
+    return {
+        "status": "PARTIAL_FAILURE" if failed else "SUCCEEDED",
+        "results": results,
+        # SQS partial batch response: only these messages are retried.
+        "batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed_message_ids]
+    }
     
-def trigger_textract(bucket, key):
+def trigger_textract(bucket, key, ingest_date):
     logger.info(f"Triggering Textract for file: s3://{bucket}/{key}")
 
-    response = textract_client.start_document_analysis(
+    response = _client('textract').start_document_analysis(
         DocumentLocation={
             'S3Object': {
                 'Bucket': bucket,
@@ -42,6 +120,8 @@ def trigger_textract(bucket, key):
             }
         },
         FeatureTypes=['TABLES', 'FORMS'],
+        # Echoed back in the completion notification so the collector writes to the upload's partition.
+        JobTag=ingest_date,
         NotificationChannel={
             'RoleArn': os.environ.get('TEXTRACT_SNS_ROLE_ARN'),
             'SNSTopicArn': os.environ.get('SNS_TOPIC_ARN')
@@ -55,26 +135,87 @@ def trigger_textract(bucket, key):
         "file" : key
     }
 
-def process_structured_data(s3_path, processed_bucket, original_key, file_extension):
+def _s3_filesystem():
+    from pyarrow import fs
+
+    return fs.S3FileSystem(region=os.environ.get('AWS_REGION'))
+
+def _source_id(s3_record, key):
+    # The eTag makes re-uploads of the same name land in new files while
+    # replays of the same object overwrite their own output.
+    stem = os.path.splitext(os.path.basename(key))[0]
+    etag = (s3_record['s3']['object'].get('eTag') or hashlib.sha1(key.encode()).hexdigest()).strip('"')
+    return f"{stem}-{etag[:12]}"
+
+def _stream_csv_to_parquet(s3_path, dataset_path, source_id, ingest_date):
+    from .parquet_conversion import csv_tables, write_partitioned
+
+    s3 = _s3_filesystem()
+    with s3.open_input_stream(s3_path.replace("s3://", "")) as source:
+        schema, tables = csv_tables(source)
+        return write_partitioned(
+            schema, tables, dataset_path.replace("s3://", ""), source_id, filesystem=s3, ingest_date=ingest_date
+        )
+
+def _stream_excel_to_parquet(s3_path, dataset_path, source_id, ingest_date):
+    from .parquet_conversion import excel_tables, write_partitioned
+
+    # XLSX is a zip archive and needs random access, so it is spooled to /tmp rather than held in memory.
+    bucket, key = s3_path.replace("s3://", "").split("/", 1)
+    with tempfile.NamedTemporaryFile(suffix=".xlsx") as local_file:
+        _client('s3').download_file(bucket, key, local_file.name)
+        schema, tables = excel_tables(local_file.name)
+        return write_partitioned(
+            schema, tables, dataset_path.replace("s3://", ""), source_id, filesystem=_s3_filesystem(),
+            ingest_date=ingest_date
+        )
+
+def _write_table(table, dataset_path, source_id, s3, ingest_date):
+    from .parquet_conversion import conform_table, write_partitioned
+
+    schema, table = conform_table(table)
+    return write_partitioned(
+        schema, [table], dataset_path.replace("s3://", ""), source_id, filesystem=s3, ingest_date=ingest_date
+    )
+
+def _csv_to_parquet(s3_path, dataset_path, source_id, ingest_date):
+    # Lean path for the common case: pyarrow only, no pandas/awswrangler import.
+    from pyarrow import csv as pa_csv
+
+    s3 = _s3_filesystem()
+    with s3.open_input_stream(s3_path.replace("s3://", "")) as source:
+        table = pa_csv.read_csv(source)
+    return _write_table(table, dataset_path, source_id, s3, ingest_date)
+
+def _excel_to_parquet(s3_path, dataset_path, source_id, ingest_date):
+    import awswrangler as wr
+    import pyarrow as pa
+
+    df = wr.s3.read_excel(s3_path)
+    return _write_table(
+        pa.Table.from_pandas(df, preserve_index=False), dataset_path, source_id, _s3_filesystem(), ingest_date
+    )
+
+def process_structured_data(s3_path, processed_bucket, original_key, file_extension, source_id, ingest_date):
+    from .parquet_conversion import PROCESSED_PREFIX
+
     logger.info(f"Processing structured data file: {s3_path}")
+    dataset_path = f"s3://{processed_bucket}/{PROCESSED_PREFIX}"
+
+    streaming = CONVERSION_MODE == 'streaming'
     if file_extension == '.csv':
-        df = wr.s3.read_csv(s3_path)
+        convert = _stream_csv_to_parquet if streaming else _csv_to_parquet
     elif file_extension == '.xlsx':
-        df = wr.s3.read_excel(s3_path)
+        convert = _stream_excel_to_parquet if streaming else _excel_to_parquet
     else:
         raise ValueError(f"Unsupported structured data file type: {file_extension}")
-    
-    filename = os.path.basename(original_key).replace(file_extension, '.parquet')
-    target_path = f"s3://{processed_bucket}/{filename}"
+    stats = convert(s3_path, dataset_path, source_id, ingest_date)
 
-    wr.s3.to_parquet(
-        df=df,
-        path=target_path,
-        index=False
-    )
-
-    logger.info(f"File converted and saved to: {target_path}")
+    files = [f"s3://{path}" for path in stats["files"]]
+    logger.info(f"File converted: {stats['rows']} rows written to {len(files)} partition files under {dataset_path}")
     return {
         "status": "PROCESSED",
-        "processed_file": target_path
-    }
\ No newline at end of file
+        "processed_path": dataset_path,
+        "processed_files": files,
+        "rows": stats["rows"]
+    }
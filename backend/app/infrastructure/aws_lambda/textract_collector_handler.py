@@ -1,13 +1,40 @@
-import boto3
 import os
 import logging
-import pandas as pd
-import awswrangler as wr
 import json
+from datetime import datetime, timezone
+from functools import lru_cache
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+def _ingest_date(message):
+    # s3_ingest_handler tags the job with the upload's ingest date; older jobs
+    # fall back to when Textract was started.
+    if message.get('JobTag'):
+        return message['JobTag']
+    timestamp = message.get('Timestamp')
+    started = datetime.fromtimestamp(timestamp / 1000, timezone.utc) if timestamp else datetime.now(timezone.utc)
+    return started.strftime("%Y-%m-%d")
+
+@lru_cache(maxsize=None)
+def _client(service_name):
+    import boto3
+
+    return boto3.client(service_name)
+
+def collect_tables(textract_client, job_id, target_path, filesystem=None, ingest_date=None):
+    """Page through a finished analysis job and write its sales tables under `target_path`.
+
+    Returns write_partitioned stats. Any client with get_document_analysis works,
+    including the offline fixture client used by the benchmarks.
+    """
+    # Deferred so failed-job notifications and cold starts skip pyarrow.
+    from .parquet_conversion import write_partitioned
+    from .textract_tables import SALES_SCHEMA, iter_analysis_responses, iter_tables, sales_tables
+
+    tables = sales_tables(iter_tables(iter_analysis_responses(textract_client, job_id)))
+    return write_partitioned(SALES_SCHEMA, tables, target_path, job_id, filesystem=filesystem, ingest_date=ingest_date)
+
 def handler(event, context):
     processed_bucket = os.environ.get("S3_PROCESSED_DATA_BUCKET")
 
@@ -19,23 +46,27 @@ def handler(event, context):
         if status != 'SUCCEEDED':
             logger.error(f"Textract job {job_id} failed with status: {status}")
             return
-        
-        df_list = wr.textract.get_document_analysis(job_id=job_id)
 
-        if not df_list:
-            logger.warning(f"No tables found in Textract job {job_id}")
-            return
-        
-        final_df = pd.concat(df_list, ignore_index=True)
-        target_path = f"s3://{processed_bucket}/{job_id}.parquet"
-
-        wr.s3.to_parquet(
-            df=final_df,
-            path=target_path,
-            index=False
+        from pyarrow import fs
+        from .parquet_conversion import PROCESSED_PREFIX
+
+        target_path = f"s3://{processed_bucket}/{PROCESSED_PREFIX}"
+        stats = collect_tables(
+            _client('textract'), job_id, target_path.replace("s3://", ""),
+            filesystem=fs.S3FileSystem(region=os.environ.get('AWS_REGION')),
+            ingest_date=_ingest_date(message)
         )
 
-        return {"status": "SUCCEEDED", "path": target_path}
+        if not stats["rows"]:
+            logger.warning(f"No sales tables found in Textract job {job_id}")
+            return
+
+        return {
+            "status": "SUCCEEDED",
+            "path": target_path,
+            "rows": stats["rows"],
+            "files": [f"s3://{path}" for path in stats["files"]]
+        }
     except Exception as e:
         logger.error(f"Error processing Textract job: {str(e)}")
-        return {"status": "FAILED", "error": str(e)}
\ No newline at end of file
+        return {"status": "FAILED", "error": str(e)}
@@ -0,0 +1,213 @@
+"""Stream sales tables out of Textract document-analysis results.
+
+GetDocumentAnalysis results are paged by NextToken and arrive in document page
+order, so tables are assembled one document page at a time: once a block from a
+later page arrives, the earlier pages' tables are complete, are turned into
+Arrow tables in the sales schema and their blocks are dropped. Memory is bounded
+by a page of blocks rather than by the document.
+"""
+import re
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .parquet_conversion import SALES_COLUMN_TYPES, normalize_column_name
+
+SALES_SCHEMA = pa.schema(list(SALES_COLUMN_TYPES.items()))
+
+# Normalized header text -> sales column. Unknown headers are dropped.
+HEADER_SYNONYMS = {
+    "date": ["date", "day", "sale_date", "sales_date", "order_date", "invoice_date", "transaction_date"],
+    "store_id": ["store_id", "store", "store_no", "store_number", "store_code", "shop", "shop_id", "branch"],
+    "region": ["region", "area", "zone", "territory"],
+    "category": ["category", "product_category", "cat", "department", "product_group"],
+    "price": ["price", "unit_price", "price_per_unit", "unit_cost", "rate"],
+    "promotion": ["promotion", "promo", "discount", "on_promotion", "promo_flag"],
+    "sales": ["sales", "units_sold", "qty", "quantity", "sold", "sales_qty", "volume"],
+}
+HEADER_ALIASES = {alias: column for column, aliases in HEADER_SYNONYMS.items() for alias in aliases}
+# A row is taken as a header when it names at least this many sales columns.
+MIN_HEADER_MATCHES = 2
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y"]
+
+def iter_analysis_responses(client, job_id, max_results=1000):
+    """GetDocumentAnalysis responses for `job_id`, one NextToken page at a time."""
+    kwargs = {"JobId": job_id, "MaxResults": max_results}
+    while True:
+        response = client.get_document_analysis(**kwargs)
+        yield response
+        if not response.get("NextToken"):
+            return
+        kwargs["NextToken"] = response["NextToken"]
+
+def _child_ids(block, relationship="CHILD"):
+    return [
+        block_id
+        for rel in block.get("Relationships", [])
+        if rel["Type"] == relationship
+        for block_id in rel["Ids"]
+    ]
+
+def _arrived(blocks, table_id):
+    """Ids of the table's blocks received so far."""
+    ids = {table_id}
+    for cell_id in _child_ids(blocks[table_id]):
+        if cell_id in blocks:
+            ids.add(cell_id)
+            ids.update(word_id for word_id in _child_ids(blocks[cell_id]) if word_id in blocks)
+    return ids
+
+def _descendants(blocks, table_id):
+    """Ids of the table, its cells and their words; None while any of them has not arrived yet."""
+    ids = [table_id]
+    for cell_id in _child_ids(blocks[table_id]):
+        cell = blocks.get(cell_id)
+        if cell is None:
+            return None
+        ids.append(cell_id)
+        for word_id in _child_ids(cell):
+            if word_id not in blocks:
+                return None
+            ids.append(word_id)
+    return ids
+
+def _cell_text(blocks, cell):
+    parts = []
+    for word_id in _child_ids(cell):
+        word = blocks[word_id]
+        if word["BlockType"] == "WORD":
+            parts.append(word["Text"])
+        elif word["BlockType"] == "SELECTION_ELEMENT" and word.get("SelectionStatus") == "SELECTED":
+            parts.append("X")
+    return " ".join(parts)
+
+def _table_rows(blocks, table_id):
+    cells = [blocks[cell_id] for cell_id in _child_ids(blocks[table_id])]
+    cells = [cell for cell in cells if cell["BlockType"] == "CELL"]
+    if not cells:
+        return []
+    n_rows = max(cell["RowIndex"] for cell in cells)
+    n_columns = max(cell["ColumnIndex"] for cell in cells)
+    rows = [[""] * n_columns for _ in range(n_rows)]
+    for cell in cells:
+        rows[cell["RowIndex"] - 1][cell["ColumnIndex"] - 1] = _cell_text(blocks, cell)
+    return rows
+
+def iter_tables(responses):
+    """Yield each table as a list of rows of cell text, in document order."""
+    blocks, pending, current_page = {}, [], None
+
+    def _flush(before_page):
+        done = set()
+        for table_id in list(pending):
+            if before_page is not None and blocks[table_id].get("Page", 1) >= before_page:
+                continue
+            ids = _descendants(blocks, table_id)
+            if ids is None and before_page is not None:
+                continue
+            pending.remove(table_id)
+            if ids is not None:
+                yield _table_rows(blocks, table_id)
+                done.update(ids)
+
+        keep = set().union(*(_arrived(blocks, table_id) for table_id in pending))
+        for block_id in [
+            block_id for block_id, block in blocks.items()
+            if block_id in done or (
+                block_id not in keep and (before_page is None or block.get("Page", 1) < before_page)
+            )
+        ]:
+            del blocks[block_id]
+
+    for response in responses:
+        for block in response.get("Blocks", []):
+            page = block.get("Page", 1)
+            if current_page is not None and page > current_page:
+                yield from _flush(page)
+            current_page = page if current_page is None else max(current_page, page)
+
+            blocks[block["Id"]] = block
+            if block["BlockType"] == "TABLE":
+                pending.append(block["Id"])
+    yield from _flush(None)
+
+def match_header(row):
+    """Sales column for each header cell, or None for cells that are not sales columns."""
+    mapping, seen = [], set()
+    for text in row:
+        column = HEADER_ALIASES.get(normalize_column_name(text))
+        mapping.append(column if column not in seen else None)
+        seen.add(column)
+    return mapping
+
+def _clean_text(array):
+    array = pc.utf8_trim_whitespace(array)
+    return pc.if_else(pc.equal(array, ""), pa.scalar(None, pa.string()), array)
+
+def _parse_numbers(array):
+    digits = _clean_text(pc.replace_substring_regex(array, r"[^0-9.\-]", ""))
+    try:
+        return pc.cast(digits, pa.float64())
+    except pa.ArrowInvalid:
+        # Stray separators in a few cells: parse what can be parsed, null the rest.
+        def _to_float(text):
+            try:
+                return float(text)
+            except (TypeError, ValueError):
+                return None
+        return pa.array([_to_float(text) for text in digits.to_pylist()], type=pa.float64())
+
+def _parse_dates(array):
+    """Parse a date column with the first of DATE_FORMATS that reads every non-empty cell.
+
+    One format per column, so 03/04/2024 is not read day-first while 12/25/2024
+    in the same column is read month-first. A column no single format fits is
+    nulled rather than guessed.
+    """
+    array = _clean_text(array)
+    present = len(array) - array.null_count
+    for fmt in DATE_FORMATS:
+        parsed = pc.strptime(array, format=fmt, unit="s", error_is_null=True)
+        if len(parsed) - parsed.null_count == present:
+            return pc.cast(parsed, pa.date32())
+    return pa.nulls(len(array), type=pa.date32())
+
+def _parse_column(array, field_type):
+    if pa.types.is_floating(field_type):
+        return _parse_numbers(array)
+    if pa.types.is_date(field_type):
+        return _parse_dates(array)
+    return _clean_text(array)
+
+def rows_to_table(rows, header, schema=SALES_SCHEMA):
+    """Build a `schema` table from text rows; `header` maps each column position to a sales column."""
+    positions = {column: i for i, column in enumerate(header) if column is not None}
+    arrays = []
+    for field in schema:
+        if field.name in positions:
+            i = positions[field.name]
+            texts = pa.array([row[i] if i < len(row) else None for row in rows], type=pa.string())
+            arrays.append(_parse_column(texts, field.type))
+        else:
+            arrays.append(pa.nulls(len(rows), type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def sales_tables(tables, schema=SALES_SCHEMA):
+    """Arrow tables in the sales schema for every table whose header names sales columns.
+
+    A table without such a header and with as many columns as the last sales
+    table is read as its continuation onto a new page; other tables are skipped.
+    """
+    header = None
+    for rows in tables:
+        if not rows:
+            continue
+        mapping = match_header(rows[0])
+        if sum(column is not None for column in mapping) >= MIN_HEADER_MATCHES:
+            header, body = mapping, rows[1:]
+        elif header is not None and len(rows[0]) == len(header):
+            body = rows
+        else:
+            continue
+        body = [row for row in body if any(re.search(r"\S", text) for text in row)]
+        if body:
+            yield rows_to_table(body, header, schema)
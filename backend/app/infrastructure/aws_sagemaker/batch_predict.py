@@ -60,8 +60,11 @@ class BatchPredictor:
             "OutputS3": output_s3_uri
         }
     
+    def describe_job(self, job_name):
+        return self.sm_client.describe_transform_job(TransformJobName=job_name)
+
     def check_status(self, job_name):
-        response = self.sm_client.describe_transform_job(TransformJobName=job_name)
+        response = self.describe_job(job_name)
         status = response['TransformJobStatus']
         logger.info(f"Transform job {job_name} status: {status}")
         return status
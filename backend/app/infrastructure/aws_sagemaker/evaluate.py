@@ -2,44 +2,320 @@ import joblib
 import tarfile
 import os
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-import awswrangler as wr
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import xgboost as xgb
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import numpy as np
 
-def handler():
-    model_path = "opt/ml/processing/model/model.tar.gz"
-    with tarfile.open(model_path) as tar:
-        tar.extractall(path=".")
+TARGET_COLUMN = "sales"
+DATE_COLUMN = "date"
+SERIES_KEYS = ["store_id", "category"]
+
+# Rolling-origin backtest: BACKTEST_FOLDS consecutive windows of BACKTEST_HORIZON_DAYS at the end of
+# the history, each scored by a model trained only on data before it.
+BACKTEST_FOLDS = int(os.environ.get("BACKTEST_FOLDS", "4"))
+BACKTEST_HORIZON_DAYS = int(os.environ.get("BACKTEST_HORIZON_DAYS", "28"))
+BACKTEST_WORKERS = int(os.environ.get("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+# Days of history before each fold that its model trains on; 0 trains on everything before the fold.
+BACKTEST_LOOKBACK_DAYS = int(os.environ.get("BACKTEST_LOOKBACK_DAYS", "730"))
+# Only the worst series by MAE are listed individually; the rest are summarized.
+BACKTEST_SERIES_REPORT = int(os.environ.get("BACKTEST_SERIES_REPORT", "50"))
+
+# Test rows predicted and scored per batch; memory is bounded by this, not by the test set.
+EVAL_BATCH_ROWS = int(os.environ.get("EVAL_BATCH_ROWS", "262144"))
+# Segments reported per key; store x category pairs are listed worst-first up to this many.
+SEGMENT_KEYS = [["store_id"], ["category"], SERIES_KEYS]
+SEGMENT_REPORT = int(os.environ.get("SEGMENT_REPORT", "50"))
+
+# Shipped to the processing container as a single file, so these are copies of the names in model_artifacts.py.
+NATIVE_MODEL_FILE = "model.ubj"
+SKLEARN_PARAMS_ATTR = "sklearn_params"
+
+def _metrics(y, predictions):
+    y, predictions = np.asarray(y, dtype="float64"), np.asarray(predictions, dtype="float64")
+    nonzero = y != 0
+    return {
+        "mse": float(mean_squared_error(y, predictions)),
+        "mae": float(mean_absolute_error(y, predictions)),
+        "r2": float(r2_score(y, predictions)) if len(y) > 1 else None,
+        # Days with zero sales have no percentage error; they are left out of MAPE.
+        "mape": float(np.mean(np.abs((y[nonzero] - predictions[nonzero]) / y[nonzero])) * 100) if nonzero.any() else None,
+    }
+
+def fold_windows(dates, folds=BACKTEST_FOLDS, horizon_days=BACKTEST_HORIZON_DAYS):
+    """[(start, end)] of each test window, oldest first; each fold trains on dates before its start."""
+    last = pd.Timestamp(dates.max()).normalize()
+    horizon = pd.Timedelta(days=horizon_days)
+    windows = []
+    for fold in range(folds, 0, -1):
+        end = last - (fold - 1) * horizon + pd.Timedelta(days=1)
+        windows.append((end - horizon, end))
+    return windows
+
+def _history_dataset(paths):
+    return ds.dataset([ds.dataset(path, format="parquet", partitioning="hive") for path in paths])
+
+def _date_bound(value, field_type):
+    """Timestamp `value` as a scalar comparable with a date column of `field_type`."""
+    if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+        return pa.scalar(value.strftime("%Y-%m-%d"), field_type)
+    return pa.scalar(value.to_pydatetime()).cast(field_type)
+
+def _last_date(dataset):
+    return pd.Timestamp(pc.max(dataset.to_table(columns=[DATE_COLUMN])[DATE_COLUMN]).as_py())
 
-    model = joblib.load("model.joblib")
+def read_history(paths, columns, start, end):
+    """`columns` of the rows dated in [start, end), reading only the row groups that can hold them."""
+    dataset = _history_dataset(paths)
+    field_type = dataset.schema.field(DATE_COLUMN).type
+    condition = ds.field(DATE_COLUMN) < _date_bound(end, field_type)
+    if start is not None:
+        condition = condition & (ds.field(DATE_COLUMN) >= _date_bound(start, field_type))
+    frame = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    frame[DATE_COLUMN] = pd.to_datetime(frame[DATE_COLUMN])
+    return frame
 
-    test_path = "opt/ml/processing/test/"
-    df_test = wr.s3.read_parquet(path=test_path)
+def _series_errors(frame, predictions, keys):
+    errors = frame[keys].copy()
+    actual = frame[TARGET_COLUMN].to_numpy(dtype="float64")
+    error = actual - predictions
+    nonzero = actual != 0
+    errors["n"] = 1
+    errors["abs_error"] = np.abs(error)
+    errors["sq_error"] = error ** 2
+    errors["ape"] = np.where(nonzero, np.abs(error) / np.where(nonzero, actual, 1), 0.0)
+    errors["n_nonzero"] = nonzero.astype("int64")
+    return errors.groupby(keys, dropna=False, observed=True).sum().reset_index()
 
-    X_test = df_test.drop(columns=['sales'])
-    y_test = df_test['sales']
+def run_fold(window, paths, columns, feature_names, params, n_threads):
+    start, end = window
+    lookback = pd.Timedelta(days=BACKTEST_LOOKBACK_DAYS) if BACKTEST_LOOKBACK_DAYS > 0 else None
+    history = read_history(paths, columns, start - lookback if lookback is not None else None, end)
+    dates = history[DATE_COLUMN]
+    train, test = history[dates < start], history[dates >= start]
+    result = {"start": str(start.date()), "end": str((end - pd.Timedelta(days=1)).date()),
+              "train_rows": int(len(train)), "test_rows": int(len(test))}
+    if len(train) == 0 or len(test) == 0:
+        return result, None
+
+    model = xgb.XGBRegressor(**{**params, "n_jobs": n_threads})
+    model.fit(train[feature_names], train[TARGET_COLUMN])
+    predictions = model.predict(test[feature_names])
+
+    result.update(_metrics(test[TARGET_COLUMN], predictions))
+    keys = [key for key in SERIES_KEYS if key in test.columns]
+    return result, _series_errors(test, predictions, keys) if keys else None
+
+def _summarize_series(series_errors):
+    keys = [column for column in series_errors.columns if column in SERIES_KEYS]
+    totals = series_errors.groupby(keys, dropna=False, observed=True).sum().reset_index()
+    totals["mae"] = totals["abs_error"] / totals["n"]
+    totals["rmse"] = np.sqrt(totals["sq_error"] / totals["n"])
+    totals["mape"] = (totals["ape"] / totals["n_nonzero"].replace(0, np.nan)) * 100
+    totals = totals.sort_values("mae", ascending=False)
+
+    worst = totals.head(BACKTEST_SERIES_REPORT)[keys + ["n", "mae", "rmse", "mape"]]
+    return {
+        "series": int(len(totals)),
+        "mae_median": float(totals["mae"].median()),
+        "mae_p90": float(totals["mae"].quantile(0.9)),
+        "worst": json.loads(worst.astype({key: str for key in keys}).to_json(orient="records")),
+    }
+
+def backtest(paths, model):
+    """Train and score every fold on a process pool, then aggregate per fold and per series.
+
+    `paths` are the hive-partitioned parquet directories that together hold the
+    history. Each worker reads only its fold's dates and the columns it uses.
+    """
+    dataset = _history_dataset(paths)
+    feature_names = _schema_feature_columns(dataset.schema, model)
+    keys = [key for key in SERIES_KEYS if key in dataset.schema.names]
+    columns = list(dict.fromkeys(feature_names + [TARGET_COLUMN, DATE_COLUMN] + keys))
+    params = model.get_params()
+    windows = fold_windows(pd.Series([_last_date(dataset)]))
+    workers = max(1, min(BACKTEST_WORKERS, len(windows)))
+    n_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # forkserver, not fork: the parent has already run multithreaded XGBoost,
+    # and a forked child can deadlock on libgomp's thread pool state.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        results = list(pool.map(
+            run_fold, windows, [paths] * len(windows), [columns] * len(windows),
+            [feature_names] * len(windows), [params] * len(windows), [n_threads] * len(windows)
+        ))
+
+    folds = [fold for fold, _ in results]
+    summary = {}
+    for metric in ("mse", "mae", "r2", "mape"):
+        values = [fold[metric] for fold in folds if fold.get(metric) is not None]
+        summary[metric] = {
+            "mean": float(np.mean(values)) if values else None,
+            "std": float(np.std(values)) if values else None,
+        }
+    series_errors = [errors for _, errors in results if errors is not None]
+    return {
+        "folds": folds,
+        "summary": summary,
+        "per_series": _summarize_series(pd.concat(series_errors, ignore_index=True)) if series_errors else None,
+    }
 
-    predictions = model.predict(X_test)
-    mse = mean_squared_error(y_test, predictions)
-    mae = mean_absolute_error(y_test, predictions)
-    r2 = r2_score(y_test, predictions)
-    mape = np.mean(np.abs((y_test - predictions) / y_test)) * 100
+class RegressionAccumulator:
+    """MSE/MAE/R²/MAPE built up one batch at a time, overall or per group of `keys`.
+
+    Holds one row of running sums per group. The target's mean and sum of
+    squared deviations (for R²) are combined across batches with Chan's
+    pairwise update, so no batch needs to be kept.
+    """
+
+    SUMS = ["n", "sse", "sae", "sape", "n_nonzero"]
+
+    def __init__(self, keys=()):
+        self.keys = list(keys)
+        self.stats = None
+
+    def _batch_stats(self, actual, predictions, frame):
+        error = actual - predictions
+        nonzero = actual != 0
+        errors = pd.DataFrame({
+            "y": actual,
+            "sse": error ** 2,
+            "sae": np.abs(error),
+            # Days with zero sales have no percentage error; they are left out of MAPE.
+            "sape": np.where(nonzero, np.abs(error) / np.where(nonzero, actual, 1), 0.0),
+            "n_nonzero": nonzero.astype("int64"),
+        })
+        if self.keys:
+            for key in self.keys:
+                errors[key] = frame[key].to_numpy()
+            grouped = errors.groupby(self.keys, dropna=False, observed=True)
+        else:
+            grouped = errors.groupby(np.zeros(len(errors), dtype="int8"))
+        stats = grouped[["sse", "sae", "sape", "n_nonzero"]].sum()
+        stats["n"] = grouped["y"].size()
+        stats["mean"] = grouped["y"].mean()
+        stats["m2"] = grouped["y"].var(ddof=0) * stats["n"]
+        return stats
+
+    def update(self, actual, predictions, frame=None):
+        actual = np.asarray(actual, dtype="float64")
+        predictions = np.asarray(predictions, dtype="float64")
+        if len(actual) == 0:
+            return
+        batch = self._batch_stats(actual, predictions, frame)
+        if self.stats is None:
+            self.stats = batch
+            return
+
+        current, batch = self.stats.align(batch, join="outer", fill_value=0)
+        n = current["n"] + batch["n"]
+        delta = batch["mean"] - current["mean"]
+        merged = current[self.SUMS] + batch[self.SUMS]
+        merged["mean"] = current["mean"] + delta * batch["n"] / n
+        merged["m2"] = current["m2"] + batch["m2"] + delta ** 2 * current["n"] * batch["n"] / n
+        self.stats = merged
+
+    def frame(self):
+        """One row of mse/mae/r2/mape and row count per group."""
+        stats = self.stats
+        if stats is None:
+            return pd.DataFrame(columns=self.keys + ["n", "mse", "mae", "r2", "mape"])
+        result = pd.DataFrame({
+            "n": stats["n"].astype("int64"),
+            "mse": stats["sse"] / stats["n"],
+            "mae": stats["sae"] / stats["n"],
+            "r2": 1 - stats["sse"] / stats["m2"].where((stats["n"] > 1) & (stats["m2"] > 0)),
+            "mape": stats["sape"] / stats["n_nonzero"].where(stats["n_nonzero"] > 0) * 100,
+        })
+        return result.reset_index(drop=not self.keys)
+
+    def metrics(self):
+        row = self.frame().iloc[0] if self.stats is not None else {}
+        return {metric: None if pd.isna(row.get(metric)) else float(row[metric]) for metric in ("mse", "mae", "r2", "mape")}
+
+def _records(frame, keys):
+    frame = frame.astype({key: str for key in keys})
+    return json.loads(frame.to_json(orient="records"))
+
+def _schema_feature_columns(schema, model):
+    names = model.get_booster().feature_names
+    if names:
+        return list(names)
+    numeric = lambda t: pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_boolean(t)
+    return [field.name for field in schema if field.name != TARGET_COLUMN and numeric(field.type)]
+
+def evaluate_stream(dataset, model, batch_rows=EVAL_BATCH_ROWS):
+    """Predict the test set batch by batch, scoring it overall and per segment in the same pass."""
+    features = _schema_feature_columns(dataset.schema, model)
+    segment_keys = [keys for keys in SEGMENT_KEYS if all(key in dataset.schema.names for key in keys)]
+    key_columns = sorted({key for keys in segment_keys for key in keys} - set(features))
+    overall = RegressionAccumulator()
+    segments = [RegressionAccumulator(keys) for keys in segment_keys]
+
+    for batch in dataset.to_batches(columns=features + [TARGET_COLUMN] + key_columns, batch_size=batch_rows):
+        if not batch.num_rows:
+            continue
+        frame = batch.to_pandas()
+        predictions = model.predict(frame[features])
+        actual = frame[TARGET_COLUMN].to_numpy(dtype="float64")
+        overall.update(actual, predictions)
+        for accumulator in segments:
+            accumulator.update(actual, predictions, frame)
+
+    segment_metrics = {}
+    for accumulator in segments:
+        table = accumulator.frame().sort_values("mae", ascending=False)
+        name = "_".join(accumulator.keys)
+        if len(accumulator.keys) > 1:
+            segment_metrics[name] = {
+                "segments": int(len(table)),
+                "mae_median": float(table["mae"].median()) if len(table) else None,
+                "worst": _records(table.head(SEGMENT_REPORT), accumulator.keys),
+            }
+        else:
+            segment_metrics[name] = _records(table, accumulator.keys)
+    return overall.metrics(), segment_metrics
+
+def load_model(directory):
+    """The model from train.py's native UBJSON file, or from model.joblib for models that predate it."""
+    native_path = os.path.join(directory, NATIVE_MODEL_FILE)
+    if not os.path.exists(native_path):
+        return joblib.load(os.path.join(directory, "model.joblib"))
+    model = xgb.XGBRegressor()
+    model.load_model(native_path)
+    model.set_params(**json.loads(model.get_booster().attr(SKLEARN_PARAMS_ATTR) or "{}"))
+    return model
+
+def handler():
+    model_path = "/opt/ml/processing/model/model.tar.gz"
+    with tarfile.open(model_path) as tar:
+        tar.extractall(path=".", filter="data")
+
+    model = load_model(".")
+
+    test_path = "/opt/ml/processing/test/"
+    test_set = ds.dataset(test_path, format="parquet", partitioning="hive")
+    metrics, segment_metrics = evaluate_stream(test_set, model)
 
     report_dict = {
-        "regression_metrics": {
-            "mse": {"value": mse},
-            "mae": {"value": mae},
-            "r2": {"value": r2},
-            "mape": {"value": mape}
-        },
+        "regression_metrics": {name: {"value": value} for name, value in metrics.items()},
+        "segment_metrics": segment_metrics,
         "feature_importance": model.get_booster().get_score(importance_type='weight')
     }
 
-    output_dir = "opt/ml/processing/evaluation/"
+    train_path = "/opt/ml/processing/train/"
+    if BACKTEST_FOLDS > 0 and os.path.isdir(train_path) and DATE_COLUMN in test_set.schema.names:
+        report_dict["backtest"] = backtest([train_path, test_path], model)
+
+    output_dir = "/opt/ml/processing/evaluation/"
     os.makedirs(output_dir, exist_ok=True)
     with open(os.path.join(output_dir, "evaluation.json"), "w") as f:
         f.write(json.dumps(report_dict))
 
 if __name__ == "__main__":
-    handler()
\ No newline at end of file
+    handler()
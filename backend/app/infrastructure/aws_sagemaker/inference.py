@@ -0,0 +1,37 @@
+"""Serving entry point for registered models in the SageMaker XGBoost container.
+
+model.tar.gz holds model.ubj, model.joblib and train.py's training manifest,
+which the stock handler would try to load as models; this picks the model
+file itself. model_artifacts.py is shipped beside it in source_dir.
+"""
+import io
+import pandas as pd
+
+from model_artifacts import load_model_dir
+
+def model_fn(model_dir):
+    return load_model_dir(model_dir)
+
+def input_fn(request_body, content_type):
+    """A parquet file (as batch transform sends the feature store's files) or header-less CSV rows."""
+    if content_type == "application/x-parquet":
+        return pd.read_parquet(io.BytesIO(request_body))
+    if content_type == "text/csv":
+        if isinstance(request_body, bytes):
+            request_body = request_body.decode("utf-8")
+        return pd.read_csv(io.StringIO(request_body), header=None)
+    raise ValueError(f"Unsupported content type: {content_type}")
+
+def predict_fn(input_data, model):
+    features = list(model.get_booster().feature_names or [])
+    if features and set(features).issubset(input_data.columns):
+        # Identifiers, dates and the target in a parquet file are not model inputs.
+        input_data = input_data[features]
+    elif features:
+        input_data = input_data.set_axis(features, axis=1)
+    return model.predict(input_data)
+
+def output_fn(prediction, accept):
+    if accept not in ("text/csv", "*/*", None):
+        raise ValueError(f"Unsupported accept type: {accept}")
+    return "\n".join(str(float(value)) for value in prediction), "text/csv"
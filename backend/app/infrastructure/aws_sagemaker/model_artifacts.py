@@ -0,0 +1,26 @@
+"""Layout of the model.tar.gz that train.py writes, and how to load the model from it.
+
+train.py and inference.py import it from their source_dir; the API imports it
+as part of this package. evaluate.py is shipped to its processing container as
+a single file and keeps its own copy of the names, which must stay in sync.
+"""
+import os
+import json
+import joblib
+import xgboost as xgb
+
+# XGBoost's native UBJSON format; loads faster than model.joblib and without unpickling.
+NATIVE_MODEL_FILE = "model.ubj"
+JOBLIB_MODEL_FILE = "model.joblib"
+# Booster attribute holding the XGBRegressor's scalar get_params(), which the native format does not keep.
+SKLEARN_PARAMS_ATTR = "sklearn_params"
+
+def load_model_dir(directory):
+    """The XGBRegressor in an unpacked model.tar.gz, from the native UBJSON file when train.py wrote one."""
+    native_path = os.path.join(directory, NATIVE_MODEL_FILE)
+    if not os.path.exists(native_path):
+        return joblib.load(os.path.join(directory, JOBLIB_MODEL_FILE))
+    model = xgb.XGBRegressor()
+    model.load_model(native_path)
+    model.set_params(**json.loads(model.get_booster().attr(SKLEARN_PARAMS_ATTR) or "{}"))
+    return model
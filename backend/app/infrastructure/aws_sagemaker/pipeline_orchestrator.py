@@ -1,6 +1,23 @@
 import os
+import json
+import hashlib
 import boto3
 
+DEFAULT_HYPERPARAMETERS = {
+    "NEstimators": 100,
+    "MaxDepth": 6,
+    "LearningRate": 0.3,
+    # 0 trains the fixed configuration above; a positive budget runs the search in train.py.
+    "SearchBudgetSeconds": 0,
+    # model.tar.gz to warm-start from; empty trains from scratch.
+    "BaseModelUri": "",
+}
+
+def pipeline_definition_hash(definition):
+    """SHA-256 of a pipeline definition JSON string, insensitive to key order and whitespace."""
+    canonical = json.dumps(json.loads(definition), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
 def _import_sagemaker():
     try:
         from sagemaker.workflow.pipeline_context import PipelineSession
@@ -15,6 +32,8 @@ def _import_sagemaker():
         from sagemaker.model import Model
         from sagemaker.processing import ScriptProcessor, ProcessingInput, ProcessingOutput
         from sagemaker.model_metrics import MetricsSource, ModelMetrics
+        from sagemaker.workflow.parameters import ParameterString, ParameterInteger, ParameterFloat
+        from sagemaker.workflow.functions import Join
     except Exception as exc:
         raise RuntimeError(
             "SageMaker SDK is required for pipeline operations. Install it with 'pip install sagemaker'."
@@ -39,6 +58,10 @@ def _import_sagemaker():
         LambdaOutput,
         LambdaOutputTypeEnum,
         Lambda,
+        ParameterString,
+        ParameterInteger,
+        ParameterFloat,
+        Join,
     )
 
 class PipelineOrchestrator:
@@ -48,8 +71,14 @@ class PipelineOrchestrator:
         self.bucket = os.environ.get('S3_ARTIFACTS_BUCKET')
         (PipelineSession, *_rest) = _import_sagemaker()
         self.pipeline_session = PipelineSession()
+        self.sm_client = boto3.client('sagemaker', region_name=region)
+        # pipeline_name -> (Pipeline, definition hash) built in this process
+        self._pipelines = {}
+        # pipeline_name -> definition hash known to match the deployed pipeline
+        self._deployed_hashes = {}
 
     def create_pipeline(self, pipeline_name, s3_feature_store_uri):
+        """Build the pipeline graph locally; run-specific inputs are pipeline parameters."""
         (
             _PipelineSession,
             ModelStep,
@@ -69,8 +98,21 @@ class PipelineOrchestrator:
             LambdaOutput,
             LambdaOutputTypeEnum,
             Lambda,
+            ParameterString,
+            ParameterInteger,
+            ParameterFloat,
+            Join,
         ) = _import_sagemaker()
 
+        feature_store_uri = ParameterString(name="FeatureStoreUri", default_value=s3_feature_store_uri)
+        n_estimators = ParameterInteger(name="NEstimators", default_value=DEFAULT_HYPERPARAMETERS["NEstimators"])
+        max_depth = ParameterInteger(name="MaxDepth", default_value=DEFAULT_HYPERPARAMETERS["MaxDepth"])
+        learning_rate = ParameterFloat(name="LearningRate", default_value=DEFAULT_HYPERPARAMETERS["LearningRate"])
+        search_budget = ParameterInteger(
+            name="SearchBudgetSeconds", default_value=DEFAULT_HYPERPARAMETERS["SearchBudgetSeconds"]
+        )
+        base_model_uri = ParameterString(name="BaseModelUri", default_value=DEFAULT_HYPERPARAMETERS["BaseModelUri"])
+
         func_glue_trigger = Lambda(
             function_arn=os.environ.get('GLUE_TRIGGER_LAMBDA_ARN'),
         )
@@ -95,9 +137,16 @@ class PipelineOrchestrator:
             role=self.role,
             instance_count=1,
             instance_type="ml.m5.xlarge",
-            framework_version="1.5-1",
+            framework_version="1.7-1",
             output_path=f"s3://{self.bucket}/models/",
             sagemaker_session=self.pipeline_session,
+            hyperparameters={
+                "n-estimators": n_estimators,
+                "max-depth": max_depth,
+                "learning-rate": learning_rate,
+                "search-budget-seconds": search_budget,
+                "base-model-uri": base_model_uri,
+            },
         )
 
         step_train = TrainingStep(
@@ -105,7 +154,7 @@ class PipelineOrchestrator:
             estimator=xgb_train,
             inputs={
                 "train": TrainingInput(
-                    s3_data=f"{s3_feature_store_uri}/train/",
+                    s3_data=Join(on="/", values=[feature_store_uri, "train/"]),
                     content_type="application/x-parquet"
                 )
             },
@@ -137,8 +186,13 @@ class PipelineOrchestrator:
                     destination="/opt/ml/processing/model/"
                 ),
                 ProcessingInput(
-                    source=f"{s3_feature_store_uri}/test/",
+                    source=Join(on="/", values=[feature_store_uri, "test/"]),
                     destination="/opt/ml/processing/test/"
+                ),
+                # History for the rolling-origin backtest folds.
+                ProcessingInput(
+                    source=Join(on="/", values=[feature_store_uri, "train/"]),
+                    destination="/opt/ml/processing/train/"
                 )
             ],
             outputs=[
@@ -158,9 +212,13 @@ class PipelineOrchestrator:
             )
         )
 
+        # inference.py loads model.ubj itself; the stock handler would also try the
+        # other files in model.tar.gz (model.joblib, the training manifest) as models.
         model = Model(
             image_uri=xgb_train.image_uri,
             model_data=step_train.properties.ModelArtifacts.S3ModelArtifacts,
+            entry_point="inference.py",
+            source_dir="backend/app/infrastructure/aws_sagemaker",
             role=self.role,
             sagemaker_session=self.pipeline_session,
         )
@@ -168,7 +226,7 @@ class PipelineOrchestrator:
         step_register = ModelStep(
             name="RegisterSaleModel",
             step_args=model.register(
-                content_types=["text/csv"],
+                content_types=["application/x-parquet", "text/csv"],
                 response_types=["text/csv"],
                 inference_instances=["ml.m5.xlarge"],
                 transform_instances=["ml.m5.xlarge"],
@@ -180,21 +238,44 @@ class PipelineOrchestrator:
 
         pipeline = Pipeline(
             name=pipeline_name,
+            parameters=[feature_store_uri, n_estimators, max_depth, learning_rate, search_budget, base_model_uri],
             steps=[step_glue, step_train, step_eval, step_register],
             sagemaker_session=self.pipeline_session,
         )
+        return pipeline
+
+    def _deployed_definition_hash(self, pipeline_name):
+        try:
+            response = self.sm_client.describe_pipeline(PipelineName=pipeline_name)
+        except self.sm_client.exceptions.ResourceNotFound:
+            return None
+        return pipeline_definition_hash(response['PipelineDefinition'])
 
-        pipeline.upsert(role_arn=self.role)
+    def ensure_pipeline(self, pipeline_name, s3_feature_store_uri):
+        """Build the definition once per process and upsert it only when its hash changes."""
+        if pipeline_name not in self._pipelines:
+            pipeline = self.create_pipeline(pipeline_name, s3_feature_store_uri)
+            self._pipelines[pipeline_name] = (pipeline, pipeline_definition_hash(pipeline.definition()))
+
+        pipeline, definition_hash = self._pipelines[pipeline_name]
+        if self._deployed_hashes.get(pipeline_name) != definition_hash:
+            if self._deployed_definition_hash(pipeline_name) != definition_hash:
+                pipeline.upsert(role_arn=self.role)
+            self._deployed_hashes[pipeline_name] = definition_hash
         return pipeline
     
-    def start_pipeline(self, pipeline_name):
-        sm_client = boto3.client('sagemaker')
-        response = sm_client.start_pipeline_execution(
-            PipelineName=pipeline_name
-        )
+    def start_pipeline(self, pipeline_name, parameters=None):
+        kwargs = {"PipelineName": pipeline_name}
+        if parameters:
+            kwargs["PipelineParameters"] = [
+                {"Name": name, "Value": str(value)}
+                for name, value in parameters.items()
+                if value is not None
+            ]
+        response = self.sm_client.start_pipeline_execution(**kwargs)
         return response["PipelineExecutionArn"]
 
 def create_ml_pipeline(pipeline_name, s3_feature_store_uri, region=None):
     resolved_region = region or os.environ.get("AWS_REGION") or "ap-southeast-1"
     orchestrator = PipelineOrchestrator(resolved_region)
-    return orchestrator.create_pipeline(pipeline_name, s3_feature_store_uri)
\ No newline at end of file
+    return orchestrator.ensure_pipeline(pipeline_name, s3_feature_store_uri)
\ No newline at end of file
@@ -1,28 +1,360 @@
-import pandas as pd
-import awswrangler as wr
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import xgboost as xgb
 import argparse
+import datetime
+import json
 import os
+import tarfile
+import tempfile
+import time
 import joblib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .model_artifacts import JOBLIB_MODEL_FILE, NATIVE_MODEL_FILE, SKLEARN_PARAMS_ATTR, load_model_dir
+except ImportError:
+    # Run as the entry point, with model_artifacts.py beside it in source_dir.
+    from model_artifacts import JOBLIB_MODEL_FILE, NATIVE_MODEL_FILE, SKLEARN_PARAMS_ATTR, load_model_dir
+
+TARGET_COLUMN = "sales"
+DATE_COLUMN = "date"
+# Partition values are not model inputs even when they parse as numbers.
+INGEST_COLUMN = "ingest_date"
+NON_FEATURE_COLUMNS = {TARGET_COLUMN, INGEST_COLUMN}
+BATCH_ROWS = int(os.environ.get("TRAIN_BATCH_ROWS", 262144))
+MAX_BIN = int(os.environ.get("TRAIN_MAX_BIN", 256))
+SEARCH_TRACE_FILE = "search_trace.json"
+# Train channel files the model has seen, read back when it is the base of a warm start.
+TRAINING_MANIFEST_FILE = "training_manifest.json"
+
+# Candidate values for the hyperparameter search, in XGBRegressor names.
+SEARCH_SPACE = {
+    "max_depth": [4, 6, 8, 10],
+    "learning_rate": [0.03, 0.05, 0.1, 0.2, 0.3],
+    "min_child_weight": [1, 5, 10, 20],
+    "subsample": [0.7, 0.85, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "reg_lambda": [1.0, 5.0, 10.0],
+}
+
+def _is_numeric(data_type):
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_boolean(data_type)
+
+def feature_columns(schema):
+    """Numeric columns of the train channel; identifiers, dates and partition values are not model inputs."""
+    return [
+        field.name for field in schema
+        if field.name not in NON_FEATURE_COLUMNS and _is_numeric(field.type)
+    ]
+
+class ParquetBatches(xgb.DataIter):
+    """Feeds the dataset to XGBoost one record batch at a time, reading only the feature and target columns."""
+
+    def __init__(self, dataset, features, row_filter=None, batch_rows=BATCH_ROWS):
+        self._dataset = dataset
+        self._features = features
+        self._filter = row_filter
+        self._batch_rows = batch_rows
+        self._batches = None
+        super().__init__()
+
+    def reset(self):
+        self._batches = self._dataset.to_batches(
+            columns=self._features + [TARGET_COLUMN], filter=self._filter, batch_size=self._batch_rows
+        )
+
+    def next(self, input_data):
+        if self._batches is None:
+            self.reset()
+        for batch in self._batches:
+            if batch.num_rows:
+                frame = batch.to_pandas()
+                input_data(data=frame[self._features], label=frame[TARGET_COLUMN])
+                return 1
+        return 0
+
+def load_matrix(dataset, features, data_mode, nthread, row_filter=None, ref=None):
+    """QuantileDMatrix over the rows matching `row_filter`; `ref` shares the training matrix's bin edges.
+
+    In streaming mode only one record batch plus the quantized matrix (one byte
+    per value at 256 bins) is resident, instead of the full float frame.
+    """
+    if data_mode == "streaming":
+        data = ParquetBatches(dataset, features, row_filter)
+        return xgb.QuantileDMatrix(data, max_bin=MAX_BIN, nthread=nthread, ref=ref)
+    df = dataset.to_table(columns=features + [TARGET_COLUMN], filter=row_filter).to_pandas()
+    return xgb.QuantileDMatrix(df[features], label=df[TARGET_COLUMN], max_bin=MAX_BIN, nthread=nthread, ref=ref)
+
+def booster_params(params, nthread):
+    return {
+        **params,
+        "objective": "reg:squarederror",
+        "eval_metric": "rmse",
+        "tree_method": "hist",
+        "max_bin": MAX_BIN,
+        "nthread": nthread,
+    }
+
+def validation_cutoff(dataset, validation_days):
+    """First date of the validation window: the last `validation_days` days of the channel."""
+    if DATE_COLUMN not in dataset.schema.names:
+        raise ValueError(f"Hyperparameter search needs a '{DATE_COLUMN}' column for the validation window")
+    date_type = dataset.schema.field(DATE_COLUMN).type
+    last = pc.max(dataset.to_table(columns=[DATE_COLUMN])[DATE_COLUMN]).as_py()
+    if last is None:
+        raise ValueError("The train channel has no dated rows")
+    return pa.scalar(last - datetime.timedelta(days=validation_days - 1), type=date_type)
+
+class _Deadline(xgb.callback.TrainingCallback):
+    """Stops boosting once the search's wall-clock budget is spent."""
+
+    def __init__(self, deadline):
+        super().__init__()
+        self.deadline = deadline
+        self.reached = False
+
+    def after_iteration(self, model, epoch, evals_log):
+        self.reached = time.monotonic() >= self.deadline
+        return self.reached
+
+def sample_candidates(base, n_candidates, seed):
+    """`base` followed by distinct random draws from SEARCH_SPACE."""
+    rng = np.random.default_rng(seed)
+    candidates, seen = [base], {tuple(sorted(base.items()))}
+    for _ in range(n_candidates * 20):
+        if len(candidates) >= n_candidates:
+            break
+        candidate = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        candidate = {name: value.item() if hasattr(value, "item") else value for name, value in candidate.items()}
+        key = tuple(sorted(candidate.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(candidate)
+    return candidates
+
+def run_trial(candidate, dtrain, dvalid, rounds, early_stopping_rounds, deadline, nthread):
+    started = time.monotonic()
+    history, stop = {}, _Deadline(deadline)
+    xgb.train(
+        booster_params(candidate, nthread), dtrain, num_boost_round=rounds,
+        evals=[(dvalid, "validation")], early_stopping_rounds=early_stopping_rounds,
+        evals_result=history, verbose_eval=False, callbacks=[stop],
+    )
+    scores = history["validation"]["rmse"]
+    best_iteration = int(np.argmin(scores))
+    return {
+        "params": candidate,
+        "rounds": rounds,
+        "best_iteration": best_iteration,
+        "rmse": float(scores[best_iteration]),
+        "iterations": len(scores),
+        "stopped_by_budget": stop.reached,
+        "seconds": time.monotonic() - started,
+    }
+
+def successive_halving(candidates, dtrain, dvalid, max_rounds, early_stopping_rounds, budget_seconds, workers, eta=3):
+    """Early-stopped trials in rungs of growing round budgets; each rung keeps the best 1/`eta`.
+
+    Trials of a rung run concurrently on threads sharing the quantized
+    matrices. No new rung starts once the budget is spent, and running trials
+    stop at the deadline with the best score they reached.
+    """
+    deadline = time.monotonic() + budget_seconds
+    n_rungs = 1
+    while eta ** n_rungs <= len(candidates):
+        n_rungs += 1
+    trace, survivors = [], candidates
+    for rung in range(n_rungs):
+        rounds = max(early_stopping_rounds, max_rounds // eta ** (n_rungs - 1 - rung))
+        n_workers = max(1, min(workers, len(survivors)))
+        nthread = max(1, (os.cpu_count() or 1) // n_workers)
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(
+                lambda candidate: run_trial(
+                    candidate, dtrain, dvalid, rounds, early_stopping_rounds, deadline, nthread
+                ),
+                survivors,
+            ))
+        for result in results:
+            result["rung"] = rung
+        trace.extend(results)
+        if time.monotonic() >= deadline:
+            break
+        results.sort(key=lambda result: result["rmse"])
+        survivors = [result["params"] for result in results[:max(1, len(results) // eta)]]
+    return trace
+
+def channel_files(dataset, root):
+    """{path relative to the channel: size in bytes} of every file in the dataset.
+
+    The feature store writers give every file a unique name and a full rebuild
+    replaces them all, so a path names fixed contents; the size catches a file
+    rewritten in place anyway.
+    """
+    return {os.path.relpath(path, root): os.path.getsize(path) for path in dataset.files}
+
+def load_base_model(uri, workdir):
+    """The XGBRegressor and training manifest packed in a model.tar.gz on S3 or on local disk."""
+    archive = uri
+    if uri.startswith("s3://"):
+        import boto3
+
+        bucket, key = uri[len("s3://"):].split("/", 1)
+        archive = os.path.join(workdir, "base-model.tar.gz")
+        boto3.client("s3").download_file(bucket, key, archive)
+    with tarfile.open(archive) as tar:
+        tar.extractall(path=workdir, filter="data")
+
+    manifest_path = os.path.join(workdir, TRAINING_MANIFEST_FILE)
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    return load_model_dir(workdir), manifest
+
+def warm_start_plan(base_manifest, base_model, features, files):
+    """Channel files to continue boosting on, or None with the reason a full retrain is needed.
+
+    New data is found by file rather than by ingest_date, so rows added to a
+    partition the base model already saw (a second ETL run on the same day)
+    are trained on too. Any file the base model saw that is gone or has
+    changed, as after a feature store rebuild, forces a full retrain.
+    """
+    if base_manifest is None:
+        return None, "the base model has no training manifest"
+    if "files" not in base_manifest:
+        return None, "the base model's manifest does not list its train files"
+    if list(base_model.get_booster().feature_names or []) != features:
+        return None, "the feature columns changed since the base model"
+    trained = base_manifest["files"]
+    changed = [path for path, size in trained.items() if files.get(path) != size]
+    if changed:
+        return None, f"{len(changed)} files the base model trained on were rewritten or removed"
+    return sorted(path for path in files if path not in trained), None
+
+def train_full(args, dataset, features, nthread):
+    params = {"max_depth": args.max_depth, "learning_rate": args.learning_rate}
+    rounds = args.n_estimators
+
+    if args.search_budget_seconds > 0:
+        cutoff = validation_cutoff(dataset, args.validation_days)
+        dates = ds.field(DATE_COLUMN)
+        dtrain = load_matrix(dataset, features, args.data_mode, nthread, row_filter=dates < cutoff)
+        dvalid = load_matrix(dataset, features, args.data_mode, nthread, row_filter=dates >= cutoff, ref=dtrain)
+        trace = successive_halving(
+            sample_candidates(params, args.search_candidates, args.seed), dtrain, dvalid,
+            args.n_estimators, args.early_stopping_rounds, args.search_budget_seconds, args.search_workers,
+        )
+        best = min(trace, key=lambda result: result["rmse"])
+        params, rounds = best["params"], best["best_iteration"] + 1
+        del dtrain, dvalid
+
+        # Diagnostics only: goes to output.tar.gz so model.tar.gz holds just what serving and warm starts read.
+        os.makedirs(args.output_data_dir, exist_ok=True)
+        with open(os.path.join(args.output_data_dir, SEARCH_TRACE_FILE), "w") as f:
+            json.dump({
+                "validation_start": str(cutoff.as_py()),
+                "budget_seconds": args.search_budget_seconds,
+                "best": best,
+                "trials": trace,
+            }, f, indent=2)
+        print(f"Search ran {len(trace)} trials; best rmse {best['rmse']:.4f} with {params}, {rounds} rounds")
+
+    # The final model is refit on the whole channel, validation window included.
+    dtrain = load_matrix(dataset, features, args.data_mode, nthread)
+    return xgb.train(booster_params(params, nthread), dtrain, num_boost_round=rounds), params
+
+def train_incremental(args, dataset, features, nthread, base_model, new_files):
+    """Continue boosting the base model on the rows of `new_files` with its own tree parameters."""
+    base_params = base_model.get_params()
+    params = {name: base_params[name] for name in SEARCH_SPACE if base_params.get(name) is not None}
+    if not new_files:
+        return base_model.get_booster(), params
+    new_data = ds.dataset(
+        [os.path.join(args.train, path) for path in new_files], schema=dataset.schema,
+        format="parquet", partitioning="hive", partition_base_dir=args.train,
+    )
+    dnew = load_matrix(new_data, features, args.data_mode, nthread)
+    booster = xgb.train(
+        booster_params(params, nthread), dnew,
+        num_boost_round=args.incremental_rounds, xgb_model=base_model.get_booster(),
+    )
+    return booster, params
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--model-dir', type=str, default=os.environ.get('SM_MODEL_DIR')) # S3 path to save the model
-    parser.add_argument('--train', type=str, default=os.environ.get('SM_CHANNEL_TRAIN')) # S3 path to training data
+    parser.add_argument('--train', type=str, default=os.environ.get('SM_CHANNEL_TRAIN')) # Local copy of the train channel
+    parser.add_argument('--output-data-dir', type=str, default=os.environ.get('SM_OUTPUT_DATA_DIR', '/opt/ml/output/data'))
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--learning-rate', type=float, default=0.3)
+    parser.add_argument('--data-mode', type=str, choices=["streaming", "in-memory"], default="streaming")
+    # A positive budget switches to the hyperparameter search; n-estimators then caps the rounds.
+    parser.add_argument('--search-budget-seconds', type=int, default=0)
+    parser.add_argument('--search-candidates', type=int, default=27)
+    parser.add_argument('--search-workers', type=int, default=4)
+    parser.add_argument('--validation-days', type=int, default=28)
+    parser.add_argument('--early-stopping-rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    # model.tar.gz of an approved model to continue boosting on new train files; empty retrains fully.
+    parser.add_argument('--base-model-uri', type=str, default="")
+    parser.add_argument('--incremental-rounds', type=int, default=20)
     args = parser.parse_args()
 
-    df = wr.s3.read_parquet(path=args.train)
+    nthread = os.cpu_count() or 1
+    dataset = ds.dataset(args.train, format="parquet", partitioning="hive")
+    features = feature_columns(dataset.schema)
+    files = channel_files(dataset, args.train)
+
+    new_files = None
+    if args.base_model_uri:
+        base_model, base_manifest = load_base_model(args.base_model_uri, tempfile.mkdtemp())
+        new_files, reason = warm_start_plan(base_manifest, base_model, features, files)
+        if new_files is None:
+            print(f"Retraining from scratch: {reason}")
+
+    if new_files is None:
+        booster, params = train_full(args, dataset, features, nthread)
+        mode = "full"
+    else:
+        booster, params = train_incremental(args, dataset, features, nthread, base_model, new_files)
+        mode = "incremental"
+        print(f"Continued boosting on {len(new_files)} new train files")
+    rounds = booster.num_boosted_rounds()
 
-    X=df.drop(columns=['sales'])
-    y=df['sales']
+    # Wrapped so evaluation and batch prediction keep loading an XGBRegressor.
+    model = xgb.XGBRegressor(
+        objective='reg:squarederror',
+        n_estimators=rounds,
+        tree_method="hist",
+        max_bin=MAX_BIN,
+        n_jobs=nthread,
+        **params
+    )
+    model.load_model(bytearray(booster.save_raw(raw_format="json")))
 
-    model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100)
-    model.fit(X, y)
+    with open(os.path.join(args.model_dir, TRAINING_MANIFEST_FILE), "w") as f:
+        json.dump({
+            "mode": mode,
+            "base_model": args.base_model_uri or None,
+            "files": files,
+            "new_files": sorted(files) if new_files is None else new_files,
+            "features": features,
+            "rounds": rounds,
+        }, f, indent=2)
 
+    print(f"Trained {rounds} rounds on {len(features)} features with {nthread} threads ({mode}, {args.data_mode})")
+    model_params = {name: value for name, value in model.get_params().items() if isinstance(value, (bool, int, float, str))}
+    model.get_booster().set_attr(**{SKLEARN_PARAMS_ATTR: json.dumps(model_params)})
     model_path = os.path.join(args.model_dir, "model.tar.gz")
-    joblib.dump(model, os.path.join(args.model_dir, "model.joblib"))
+    model.save_model(os.path.join(args.model_dir, NATIVE_MODEL_FILE))
+    joblib.dump(model, os.path.join(args.model_dir, JOBLIB_MODEL_FILE))
     print(f"Model saved to {model_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
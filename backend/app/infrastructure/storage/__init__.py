@@ -0,0 +1,23 @@
+from .executor import BlockingExecutor
+from .base import StorageBackend, split_s3_uri
+from .s3_storage import S3Storage
+from .local_storage import LocalStorage
+from .registry import SageMakerRegistry
+from .factory import create_storage
+from .cache import ListingCache, LRUCache, listing_cache, metrics_cache
+from .model_cache import ModelArtifactCache
+
+__all__ = [
+    "BlockingExecutor",
+    "StorageBackend",
+    "split_s3_uri",
+    "S3Storage",
+    "LocalStorage",
+    "SageMakerRegistry",
+    "create_storage",
+    "ListingCache",
+    "LRUCache",
+    "listing_cache",
+    "metrics_cache",
+    "ModelArtifactCache",
+]
@@ -0,0 +1,80 @@
+import os
+from abc import ABC, abstractmethod
+
+# S3 requires every part except the last to be at least 5 MiB.
+DEFAULT_PART_SIZE = int(os.getenv('UPLOAD_PART_SIZE_MB', '8')) * 1024 * 1024
+DEFAULT_PART_CONCURRENCY = int(os.getenv('UPLOAD_PART_CONCURRENCY', '4'))
+DEFAULT_STREAM_CHUNK_SIZE = 1024 * 1024
+
+def split_s3_uri(uri):
+    path_parts = uri.replace("s3://", "").split("/", 1)
+    bucket = path_parts[0]
+    key = path_parts[1] if len(path_parts) > 1 else ""
+    return bucket, key
+
+class StorageBackend(ABC):
+    """Async object storage interface shared by the S3 and local filesystem backends."""
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    @abstractmethod
+    async def put_object(self, bucket, key, body):
+        """Store `body` (bytes) under `bucket/key` and return its URI."""
+
+    @abstractmethod
+    async def upload_stream(self, bucket, key, read, part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_PART_CONCURRENCY):
+        """Upload from the async `read(n)` callable in `part_size` chunks.
+
+        At most `max_concurrency` chunks are held in memory at once. Returns
+        {"uri", "size", "parts"}.
+        """
+
+    @abstractmethod
+    async def get_object(self, bucket, key):
+        """Return the full object body as bytes."""
+
+    @abstractmethod
+    async def head_object(self, bucket, key):
+        """Return {"size", "last_modified", "content_type"} without reading the body."""
+
+    @abstractmethod
+    async def exists(self, bucket, key):
+        """Return whether `bucket/key` exists."""
+
+    @abstractmethod
+    def stream_object(self, bucket, key, start=None, end=None, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        """Async generator over the body, optionally limited to the inclusive byte range [start, end]."""
+
+    @abstractmethod
+    def open_seekable(self, bucket, key):
+        """Return a blocking, seekable binary file object; call it from the executor.
+
+        Readers such as pyarrow only fetch the byte ranges they seek to.
+        """
+
+    @abstractmethod
+    async def list_page(self, bucket, prefix="", delimiter=None, continuation_token=None, max_keys=1000):
+        """Return one listing page in key order.
+
+        The result is {"objects": [{"key", "size", "last_modified"}], "prefixes": [...],
+        "next_token"}. With a delimiter, keys below it are rolled up into `prefixes`.
+        """
+
+    async def list_all(self, bucket, prefix="", delimiter=None):
+        objects, prefixes, token = [], [], None
+        while True:
+            page = await self.list_page(bucket, prefix, delimiter, token)
+            objects.extend(page["objects"])
+            prefixes.extend(page["prefixes"])
+            token = page["next_token"]
+            if not token:
+                return {"objects": objects, "prefixes": prefixes}
+
+    async def list_objects(self, bucket, prefix=""):
+        listing = await self.list_all(bucket, prefix)
+        return listing["objects"]
+
+    @abstractmethod
+    def uri(self, bucket, key=""):
+        """Return the addressable URI for `bucket/key`."""
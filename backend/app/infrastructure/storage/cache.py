@@ -0,0 +1,65 @@
+import os
+import time
+from collections import OrderedDict
+
+DEFAULT_LISTING_TTL = float(os.getenv('LISTING_CACHE_TTL_SECONDS', '60'))
+
+class ListingCache:
+    """TTL cache of bucket listings keyed by (bucket, prefix, delimiter).
+
+    Writers call `invalidate` so uploads show up immediately; writes made outside
+    the API (Lambda, Glue, pipelines) become visible once the TTL expires.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_LISTING_TTL, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, bucket, prefix="", delimiter=None):
+        cache_key = (bucket, prefix, delimiter)
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, listing = entry
+        if expires_at < time.monotonic():
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return listing
+
+    def set(self, bucket, prefix, delimiter, listing):
+        self._entries[(bucket, prefix, delimiter)] = (time.monotonic() + self.ttl_seconds, listing)
+        self._entries.move_to_end((bucket, prefix, delimiter))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, bucket, key=None):
+        """Drop cached listings of `bucket`, or only those whose prefix covers `key`."""
+        for cache_key in list(self._entries):
+            cached_bucket, prefix, _delimiter = cache_key
+            if cached_bucket == bucket and (key is None or key.startswith(prefix)):
+                del self._entries[cache_key]
+
+listing_cache = ListingCache()
+
+class LRUCache:
+    """Size-bounded LRU for values that never go stale, such as written evaluation reports."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+metrics_cache = LRUCache(max_entries=int(os.getenv('METRICS_CACHE_SIZE', '512')))
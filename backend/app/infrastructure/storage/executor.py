@@ -0,0 +1,20 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = int(os.getenv('STORAGE_MAX_WORKERS', '16'))
+
+class BlockingExecutor:
+    """Bounded thread pool used to keep blocking SDK and file I/O off the event loop."""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking-io")
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,11 @@
+import os
+from .s3_storage import S3Storage
+from .local_storage import LocalStorage
+
+def create_storage(executor=None):
+    backend = os.getenv('STORAGE_BACKEND', 's3').lower()
+    if backend == 'local':
+        return LocalStorage(os.getenv('LOCAL_STORAGE_ROOT', '.local-storage'), executor=executor)
+    if backend == 's3':
+        return S3Storage(executor=executor)
+    raise ValueError(f"Unsupported STORAGE_BACKEND: {backend}")
@@ -0,0 +1,127 @@
+import os
+import mimetypes
+from datetime import datetime, timezone
+from .base import StorageBackend, DEFAULT_PART_SIZE, DEFAULT_PART_CONCURRENCY, DEFAULT_STREAM_CHUNK_SIZE
+from .executor import BlockingExecutor
+
+class LocalStorage(StorageBackend):
+    """Filesystem stand-in for S3: each bucket is a directory under `root`."""
+
+    def __init__(self, root, executor=None):
+        super().__init__(executor or BlockingExecutor())
+        self.root = os.path.abspath(root)
+
+    def uri(self, bucket, key=""):
+        return f"file://{self._path(bucket, key)}"
+
+    def _path(self, bucket, key=""):
+        bucket_dir = os.path.join(self.root, bucket)
+        path = os.path.abspath(os.path.join(bucket_dir, key))
+        if os.path.commonpath([path, bucket_dir]) != bucket_dir:
+            raise ValueError(f"Key escapes bucket directory: {key}")
+        return path
+
+    async def put_object(self, bucket, key, body):
+        def _write():
+            path = self._path(bucket, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+
+        await self.executor.run(_write)
+        return self.uri(bucket, key)
+
+    async def upload_stream(self, bucket, key, read, part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_PART_CONCURRENCY):
+        path = self._path(bucket, key)
+        await self.executor.run(os.makedirs, os.path.dirname(path), exist_ok=True)
+        f = await self.executor.run(open, path, "wb")
+        size, parts = 0, 0
+        try:
+            while chunk := await read(part_size):
+                await self.executor.run(f.write, chunk)
+                size += len(chunk)
+                parts += 1
+        finally:
+            await self.executor.run(f.close)
+        return {"uri": self.uri(bucket, key), "size": size, "parts": max(parts, 1)}
+
+    async def get_object(self, bucket, key):
+        def _read():
+            with open(self._path(bucket, key), "rb") as f:
+                return f.read()
+
+        return await self.executor.run(_read)
+
+    async def head_object(self, bucket, key):
+        path = self._path(bucket, key)
+        stat = await self.executor.run(os.stat, path)
+        return {
+            "size": stat.st_size,
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "content_type": mimetypes.guess_type(key)[0] or "application/octet-stream",
+        }
+
+    async def exists(self, bucket, key):
+        return await self.executor.run(os.path.isfile, self._path(bucket, key))
+
+    async def stream_object(self, bucket, key, start=None, end=None, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        f = await self.executor.run(open, self._path(bucket, key), "rb")
+        try:
+            if start is not None:
+                await self.executor.run(f.seek, start)
+            remaining = None if end is None else end - (start or 0) + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await self.executor.run(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await self.executor.run(f.close)
+
+    def open_seekable(self, bucket, key):
+        return open(self._path(bucket, key), "rb")
+
+    def _scan(self, bucket, prefix):
+        bucket_dir = self._path(bucket)
+        objects = []
+        for dirpath, _dirnames, filenames in os.walk(bucket_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                stat = os.stat(path)
+                objects.append({
+                    "key": key,
+                    "size": stat.st_size,
+                    "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                })
+        return sorted(objects, key=lambda o: o["key"])
+
+    async def list_page(self, bucket, prefix="", delimiter=None, continuation_token=None, max_keys=1000):
+        def _list():
+            # (name, object) pairs in key order; rolled-up prefixes carry no object.
+            entries, seen_prefixes = [], set()
+            for obj in self._scan(bucket, prefix):
+                rest = obj["key"][len(prefix):]
+                if delimiter and delimiter in rest:
+                    common = prefix + rest.split(delimiter, 1)[0] + delimiter
+                    if common not in seen_prefixes:
+                        seen_prefixes.add(common)
+                        entries.append((common, None))
+                    continue
+                entries.append((obj["key"], obj))
+
+            if continuation_token:
+                entries = [e for e in entries if e[0] > continuation_token]
+            page = entries[:max_keys]
+            return {
+                "objects": [obj for _name, obj in page if obj is not None],
+                "prefixes": [name for name, obj in page if obj is None],
+                "next_token": page[-1][0] if len(entries) > max_keys else None,
+            }
+
+        return await self.executor.run(_list)
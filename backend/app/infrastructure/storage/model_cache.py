@@ -0,0 +1,147 @@
+import io
+import os
+import uuid
+import shutil
+import asyncio
+import hashlib
+import tarfile
+import tempfile
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from .executor import BlockingExecutor
+
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'forecast-model-cache'))
+MODEL_CACHE_MAX_BYTES = int(os.getenv('MODEL_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+_PARTIAL = ".partial-"
+
+def _tree_size(path):
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _subdirs, names in os.walk(path)
+        for name in names
+    )
+
+class ModelArtifactCache:
+    """Unpacked model.tar.gz artifacts on local disk, keyed by model package ARN.
+
+    Entries are evicted least recently used first once their total size passes
+    `max_bytes`; the most recent entry and entries open in `open()` are kept.
+    Concurrent misses for the same ARN share one download. Entries left by an
+    earlier process are reused.
+    """
+
+    def __init__(self, root=MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_BYTES, executor=None):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.executor = executor or BlockingExecutor()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._pins = Counter()
+        self.downloads = 0
+        self._scan()
+
+    def _scan(self):
+        os.makedirs(self.root, exist_ok=True)
+        found = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if _PARTIAL in name:
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.isdir(path):
+                found.append((os.path.getmtime(path), name, _tree_size(path)))
+        for _mtime, name, size in sorted(found):
+            self._entries[name] = size
+
+    def _key(self, model_arn):
+        return hashlib.sha256(model_arn.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, model_arn):
+        return os.path.join(self.root, self._key(model_arn))
+
+    @property
+    def size(self):
+        return sum(self._entries.values())
+
+    @asynccontextmanager
+    async def open(self, model_arn, fetch):
+        """Directory holding the unpacked artifact of `model_arn`, kept on disk until the block exits.
+
+        `fetch()` returns the archive bytes on a miss.
+        """
+        key = self._key(model_arn)
+        # Pinned before the lookup so a download finishing elsewhere cannot evict it in between.
+        self._pins[key] += 1
+        try:
+            yield await self._get(key, fetch)
+        finally:
+            self._pins[key] -= 1
+            if not self._pins[key]:
+                del self._pins[key]
+
+    async def _get(self, key, fetch):
+        path = os.path.join(self.root, key)
+        if key in self._entries and os.path.isdir(path):
+            self._entries.move_to_end(key)
+            # The mtime carries the LRU order over to the next process.
+            os.utime(path)
+            return path
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._download(key, fetch))
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        # Shielded so a cancelled caller does not abort the download for the others.
+        return await asyncio.shield(task)
+
+    async def _download(self, key, fetch):
+        content = await fetch()
+        self.downloads += 1
+        size = await self.executor.run(self._unpack, key, content)
+        self._entries[key] = size
+        self._entries.move_to_end(key)
+        await self.executor.run(self._remove, self._evict())
+        return os.path.join(self.root, key)
+
+    def _unpack(self, key, content):
+        partial = os.path.join(self.root, f"{key}{_PARTIAL}{uuid.uuid4().hex}")
+        try:
+            with tarfile.open(fileobj=io.BytesIO(content)) as tar:
+                tar.extractall(path=partial, filter="data")
+            final = os.path.join(self.root, key)
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(partial, final)
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+        return _tree_size(final)
+
+    def _evict(self):
+        """Drop entries over budget from the index and return their directories for `_remove`.
+
+        Runs on the event loop, the only thread that touches `_entries`. Each
+        victim is renamed to a partial name first, so a download of the same ARN
+        that starts before it is deleted unpacks into a fresh directory.
+        """
+        size = self.size
+        victims = []
+        for key in list(self._entries)[:-1]:
+            if size <= self.max_bytes:
+                break
+            if key in self._pins:
+                continue
+            size -= self._entries.pop(key)
+            trash = os.path.join(self.root, f"{key}{_PARTIAL}{uuid.uuid4().hex}")
+            try:
+                os.replace(os.path.join(self.root, key), trash)
+            except FileNotFoundError:
+                continue
+            victims.append(trash)
+        return victims
+
+    def _remove(self, paths):
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def clear(self):
+        for key in list(self._entries):
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+        self._entries.clear()
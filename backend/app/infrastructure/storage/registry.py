@@ -0,0 +1,45 @@
+import os
+import boto3
+from botocore.config import Config
+from .executor import BlockingExecutor
+
+class SageMakerRegistry:
+    """Async facade over the SageMaker model registry and pipeline execution APIs."""
+
+    def __init__(self, region_name=None, executor=None, client=None):
+        self.executor = executor or BlockingExecutor()
+        self.client = client or boto3.client(
+            'sagemaker',
+            region_name=region_name or os.getenv('AWS_REGION', 'us-east-1'),
+            config=Config(max_pool_connections=self.executor.max_workers),
+        )
+
+    async def list_model_packages(self, group_name, approval_status):
+        return await self.executor.run(
+            self.client.list_model_packages,
+            ModelPackageGroupName=group_name,
+            ModelApprovalStatus=approval_status,
+            SortBy='CreationTime',
+            SortOrder='Descending'
+        )
+
+    async def describe_model_package(self, model_package_arn):
+        return await self.executor.run(self.client.describe_model_package, ModelPackageName=model_package_arn)
+
+    async def update_model_package(self, model_package_arn, status, comment):
+        return await self.executor.run(
+            self.client.update_model_package,
+            ModelPackageArn=model_package_arn,
+            ModelApprovalStatus=status,
+            ApprovalDescription=comment
+        )
+
+    async def list_pipeline_execution_steps(self, execution_arn):
+        return await self.executor.run(
+            self.client.list_pipeline_execution_steps,
+            PipelineExecutionArn=execution_arn,
+            SortOrder='Ascending'
+        )
+
+    async def describe_pipeline_execution(self, execution_arn):
+        return await self.executor.run(self.client.describe_pipeline_execution, PipelineExecutionArn=execution_arn)
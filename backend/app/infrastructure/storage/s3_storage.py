@@ -0,0 +1,183 @@
+import io
+import os
+import asyncio
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from .base import StorageBackend, DEFAULT_PART_SIZE, DEFAULT_PART_CONCURRENCY, DEFAULT_STREAM_CHUNK_SIZE
+from .executor import BlockingExecutor
+
+class S3RangeReader(io.RawIOBase):
+    """Seekable read-only view of an S3 object that fetches each read with a ranged GET."""
+
+    def __init__(self, client, bucket, key, size):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self._size:
+            return 0
+        end = min(self._pos + len(buffer), self._size) - 1
+        response = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={self._pos}-{end}")
+        data = response['Body'].read()
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+class S3Storage(StorageBackend):
+    def __init__(self, region_name=None, executor=None, client=None):
+        super().__init__(executor or BlockingExecutor())
+        # One pooled client shared by every worker thread; boto3 clients are thread-safe.
+        self.client = client or boto3.client(
+            's3',
+            region_name=region_name or os.getenv('AWS_REGION', 'us-east-1'),
+            config=Config(max_pool_connections=self.executor.max_workers),
+        )
+
+    def uri(self, bucket, key=""):
+        return f"s3://{bucket}/{key}"
+
+    async def put_object(self, bucket, key, body):
+        await self.executor.run(self.client.put_object, Bucket=bucket, Key=key, Body=body)
+        return self.uri(bucket, key)
+
+    async def upload_stream(self, bucket, key, read, part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_PART_CONCURRENCY):
+        chunk = await read(part_size)
+        if len(chunk) < part_size:
+            await self.put_object(bucket, key, chunk)
+            return {"uri": self.uri(bucket, key), "size": len(chunk), "parts": 1}
+
+        upload = await self.executor.run(self.client.create_multipart_upload, Bucket=bucket, Key=key)
+        upload_id = upload['UploadId']
+        slots = asyncio.Semaphore(max_concurrency)
+        tasks = []
+
+        async def _upload_part(part_number, body):
+            try:
+                response = await self.executor.run(
+                    self.client.upload_part,
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                return {"PartNumber": part_number, "ETag": response['ETag']}
+            finally:
+                slots.release()
+
+        size = 0
+        try:
+            while chunk:
+                # Blocks until a part slot frees up, which bounds buffered memory.
+                await slots.acquire()
+                failed = next((t for t in tasks if t.done() and t.exception()), None)
+                if failed:
+                    slots.release()
+                    raise failed.exception()
+
+                size += len(chunk)
+                tasks.append(asyncio.create_task(_upload_part(len(tasks) + 1, chunk)))
+                chunk = await read(part_size)
+
+            parts = await asyncio.gather(*tasks)
+            await self.executor.run(
+                self.client.complete_multipart_upload,
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.executor.run(self.client.abort_multipart_upload, Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
+        return {"uri": self.uri(bucket, key), "size": size, "parts": len(tasks)}
+
+    async def get_object(self, bucket, key):
+        def _read():
+            response = self.client.get_object(Bucket=bucket, Key=key)
+            return response['Body'].read()
+
+        return await self.executor.run(_read)
+
+    async def head_object(self, bucket, key):
+        response = await self.executor.run(self.client.head_object, Bucket=bucket, Key=key)
+        return {
+            "size": response['ContentLength'],
+            "last_modified": response['LastModified'],
+            "content_type": response.get('ContentType') or "application/octet-stream",
+        }
+
+    async def exists(self, bucket, key):
+        try:
+            await self.executor.run(self.client.head_object, Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    async def stream_object(self, bucket, key, start=None, end=None, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+        kwargs = {"Bucket": bucket, "Key": key}
+        if start is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        response = await self.executor.run(self.client.get_object, **kwargs)
+        body = response['Body']
+        try:
+            while chunk := await self.executor.run(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def open_seekable(self, bucket, key):
+        size = self.client.head_object(Bucket=bucket, Key=key)['ContentLength']
+        return io.BufferedReader(S3RangeReader(self.client, bucket, key, size), buffer_size=DEFAULT_STREAM_CHUNK_SIZE)
+
+    async def list_page(self, bucket, prefix="", delimiter=None, continuation_token=None, max_keys=1000):
+        kwargs = {"Bucket": bucket, "Prefix": prefix, "MaxKeys": max_keys}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        if continuation_token:
+            kwargs["ContinuationToken"] = continuation_token
+
+        response = await self.executor.run(self.client.list_objects_v2, **kwargs)
+        return {
+            "objects": [
+                {
+                    "key": obj['Key'],
+                    "size": obj['Size'],
+                    "last_modified": obj['LastModified'],
+                }
+                for obj in response.get('Contents', [])
+            ],
+            "prefixes": [p['Prefix'] for p in response.get('CommonPrefixes', [])],
+            "next_token": response.get('NextContinuationToken') if response.get('IsTruncated') else None,
+        }
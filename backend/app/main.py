@@ -1,10 +1,20 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api import ml_router, model_router
+from app.container import ServiceContainer
 from dotenv import load_dotenv
 
 load_dotenv() 
 
-app = FastAPI(title="Sales Forecast Enterprise System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.container = ServiceContainer()
+    try:
+        yield
+    finally:
+        await app.state.container.close()
+
+app = FastAPI(title="Sales Forecast Enterprise System", lifespan=lifespan)
 
 app.include_router(ml_router, prefix="/api/v1/forecast", tags=["Forecast"])
 app.include_router(model_router, prefix="/api/v1/model", tags=["Model Management"])
@@ -1,5 +1,7 @@
 from .forecast_service import ForecastService
 from .model_service import ModelService
 from .s3_service import S3Service
+from .progress_hub import ProgressHub, ProgressError
+from .online_prediction import OnlinePredictionService
 
-__all__ = ["ForecastService", "ModelService", "S3Service"]
\ No newline at end of file
+__all__ = ["ForecastService", "ModelService", "S3Service", "ProgressHub", "ProgressError", "OnlinePredictionService"]
\ No newline at end of file
@@ -1,37 +1,198 @@
 import os
-import boto3
+import json
+import time
+import asyncio
+import hashlib
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from app.infrastructure.storage import create_storage, split_s3_uri, listing_cache as default_listing_cache
 from app.infrastructure.aws_sagemaker.pipeline_orchestrator import PipelineOrchestrator
 from app.infrastructure.aws_sagemaker.batch_predict import BatchPredictor
+from .prediction_results import PredictionResultsReader
+from .progress_events import transform_progress
 
-class ForecastService:
+UPLOAD_FILE_CONCURRENCY = int(os.getenv('UPLOAD_FILE_CONCURRENCY', '3'))
+# Raw uploads are stored once per content hash: uploads/<sha256>/<filename>, with
+# <CONTENT_INDEX_PREFIX>sha256/<sha256>.json recording the stored copy.
+CONTENT_INDEX_PREFIX = os.getenv('CONTENT_INDEX_PREFIX', '_index/')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class _ContentLock:
     def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+class ForecastService:
+    def __init__(self, storage=None, listing_cache=None):
         self.raw_data_bucket = os.getenv('S3_RAW_DATA_BUCKET')
         self.artifact_bucket = os.getenv('S3_ARTIFACTS_BUCKET')
         self.feature_store_bucket = os.getenv('S3_FEATURE_STORE_DATA_BUCKET')
-        
-        self.s3_client = boto3.client('s3', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-        self.pipeline_orchestrator = PipelineOrchestrator()
-        self.batch_predictor = BatchPredictor()
-
-    async def upload_raw_data(self, file_name, file_content):
-        file_key = f'uploads/{file_name}'
-        self.s3_client.put_object(Bucket=self.raw_data_bucket, Key=file_key, Body=file_content)
-        return f"s3://{self.raw_data_bucket}/{file_key}"
+
+        self.region = os.getenv('AWS_REGION', 'us-east-1')
+        self.storage = storage or create_storage()
+        self.executor = self.storage.executor
+        self.listing_cache = listing_cache or default_listing_cache
+        # Built on first use, so routes that never reach SageMaker work without its SDK or credentials.
+        self._pipeline_orchestrator = None
+        self._batch_predictor = None
+        self._content_locks = {}
+
+    async def _content_hash(self, file):
+        digest = hashlib.sha256()
+        while chunk := await file.read(HASH_CHUNK_SIZE):
+            await self.executor.run(digest.update, chunk)
+        await file.seek(0)
+        return digest.hexdigest()
+
+    async def _content_index_entry(self, index_key):
+        if not await self.storage.exists(self.raw_data_bucket, index_key):
+            return None
+        return json.loads(await self.storage.get_object(self.raw_data_bucket, index_key))
+
+    async def upload_raw_data(self, file):
+        """Upload `file` (an UploadFile) unless identical content is already stored.
+
+        A repeat upload returns the stored copy with "deduplicated": True and writes
+        nothing, so no new ingest, conversion or Textract work is started.
+        """
+        started = time.perf_counter()
+        sha256 = await self._content_hash(file)
+        index_key = f'{CONTENT_INDEX_PREFIX}sha256/{sha256}.json'
+
+        # Serializes concurrent uploads of the same content within this process.
+        # The entry counts every coroutine holding or waiting for the lock and is
+        # dropped by the last one, so a woken waiter never races a fresh lock.
+        content_lock = self._content_locks.get(sha256)
+        if content_lock is None:
+            content_lock = self._content_locks[sha256] = _ContentLock()
+        content_lock.users += 1
+        try:
+            async with content_lock.lock:
+                entry = await self._content_index_entry(index_key)
+                if entry is not None:
+                    return {
+                        "filename": file.filename,
+                        "s3_uri": entry["uri"],
+                        "sha256": sha256,
+                        "deduplicated": True,
+                        "original_filename": entry["filename"],
+                        "size_bytes": entry["size"],
+                        "parts": 0,
+                        "seconds": round(time.perf_counter() - started, 3),
+                        "throughput_mbps": None
+                    }
+
+                file_key = f'uploads/{sha256}/{file.filename}'
+                result = await self.storage.upload_stream(self.raw_data_bucket, file_key, file.read)
+                entry = {"sha256": sha256, "key": file_key, "uri": result["uri"], "size": result["size"],
+                         "filename": file.filename, "uploaded_at": int(time.time())}
+                # Written after the object, so an interrupted upload is simply retried next time.
+                await self.storage.put_object(self.raw_data_bucket, index_key, json.dumps(entry).encode("utf-8"))
+        finally:
+            content_lock.users -= 1
+            if content_lock.users == 0:
+                self._content_locks.pop(sha256, None)
+
+        elapsed = time.perf_counter() - started
+        self.listing_cache.invalidate(self.raw_data_bucket, file_key)
+        return {
+            "filename": file.filename,
+            "s3_uri": result["uri"],
+            "sha256": sha256,
+            "deduplicated": False,
+            "size_bytes": result["size"],
+            "parts": result["parts"],
+            "seconds": round(elapsed, 3),
+            "throughput_mbps": round(result["size"] / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None
+        }
+
+    async def upload_raw_files(self, files):
+        slots = asyncio.Semaphore(UPLOAD_FILE_CONCURRENCY)
+
+        async def _upload(file):
+            async with slots:
+                return await self.upload_raw_data(file)
+
+        return await asyncio.gather(*(_upload(file) for file in files))
     
-    async def trigger_training_pipeline(self):
+    async def _orchestrator(self):
+        if self._pipeline_orchestrator is None:
+            self._pipeline_orchestrator = await self.executor.run(PipelineOrchestrator, self.region)
+        return self._pipeline_orchestrator
+
+    async def _predictor(self):
+        if self._batch_predictor is None:
+            self._batch_predictor = await self.executor.run(BatchPredictor, self.region)
+        return self._batch_predictor
+
+    async def trigger_training_pipeline(self, hyperparameters=None):
         pipeline_name = "Sale-Forecast-ML-Pipeline"
         s3_fs_uri = f's3://{self.feature_store_bucket}'
 
-        self.pipeline_orchestrator.create_pipeline(pipeline_name, s3_fs_uri)
-        execution_arn = self.pipeline_orchestrator.start_pipeline(pipeline_name)
+        orchestrator = await self._orchestrator()
+        # No-op after the first call unless the pipeline definition itself changed.
+        await self.executor.run(orchestrator.ensure_pipeline, pipeline_name, s3_fs_uri)
+        parameters = {"FeatureStoreUri": s3_fs_uri, **(hyperparameters or {})}
+        execution_arn = await self.executor.run(orchestrator.start_pipeline, pipeline_name, parameters)
         return execution_arn
     
     async def execute_batch_prediction(self, model_arn, input_path):
-        import time
         output_path = f's3://{self.artifact_bucket}/predictions/{int(time.time())}/'
-        job_info = self.batch_predictor.run_transform_job(
+        predictor = await self._predictor()
+        job_info = await self.executor.run(
+            predictor.run_transform_job,
             model_package_arn=model_arn,
             input_s3_uri=input_path,
             output_s3_uri=output_path
         )
-        return job_info
\ No newline at end of file
+        return job_info
+
+
+    async def _describe_transform_job(self, job_name):
+        predictor = await self._predictor()
+        try:
+            return await self.executor.run(predictor.describe_job, job_name)
+        except ClientError as e:
+            # SageMaker reports an unknown job name as a ValidationException; anything else may be transient.
+            if e.response.get('Error', {}).get('Code') == 'ValidationException':
+                raise HTTPException(status_code=404, detail=f"Transform job {job_name} not found")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def get_prediction_status(self, job_name):
+        job = await self._describe_transform_job(job_name)
+        status = job['TransformJobStatus']
+        if status in ('Failed', 'Stopped'):
+            return transform_progress(status, failure_reason=job.get('FailureReason'))
+        output_bucket, output_prefix = split_s3_uri(job['TransformOutput']['S3OutputPath'])
+
+        if status == 'InProgress':
+            input_bucket, input_prefix = split_s3_uri(job['TransformInput']['DataSource']['S3DataSource']['S3Uri'])
+            inputs, outputs = await asyncio.gather(
+                self.storage.list_objects(input_bucket, input_prefix),
+                self.storage.list_objects(output_bucket, output_prefix)
+            )
+            done = sum(1 for obj in outputs if obj['key'].endswith('.out'))
+            return transform_progress(status, done, len(inputs))
+
+        if status == 'Completed':
+            self.listing_cache.invalidate(output_bucket, output_prefix)
+        return transform_progress(status, failure_reason=job.get('FailureReason'))
+
+    async def _results_reader(self, job_name):
+        job = await self._describe_transform_job(job_name)
+        if job['TransformJobStatus'] != 'Completed':
+            raise HTTPException(status_code=409, detail=f"Transform job {job_name} is {job['TransformJobStatus']}")
+        bucket, prefix = split_s3_uri(job['TransformOutput']['S3OutputPath'])
+        return PredictionResultsReader(self.storage, bucket, prefix)
+
+    async def get_prediction_results(self, job_name, cursor=None, page_size=500):
+        reader = await self._results_reader(job_name)
+        try:
+            page = await reader.read_page(cursor, page_size)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+        return {"job_name": job_name, **page}
+
+    async def stream_prediction_results(self, job_name):
+        reader = await self._results_reader(job_name)
+        return reader.stream_csv()
\ No newline at end of file
@@ -1,46 +1,58 @@
-import boto3
 import os
+import asyncio
 from fastapi import HTTPException
 import json
+from app.infrastructure.storage import (
+    SageMakerRegistry,
+    create_storage,
+    split_s3_uri,
+    listing_cache as default_listing_cache,
+    metrics_cache as default_metrics_cache,
+)
+
+PIPELINE_OUTPUT_BUCKET_ENVS = ("S3_PROCESSED_DATA_BUCKET", "S3_FEATURE_STORE_DATA_BUCKET", "S3_ARTIFACTS_BUCKET")
+TERMINAL_PIPELINE_STATUSES = ("Succeeded", "Failed", "Stopped")
+METRICS_FANOUT_CONCURRENCY = int(os.getenv('METRICS_FANOUT_CONCURRENCY', '8'))
 
 class ModelService:
-    def __init__(self):
+    def __init__(self, storage=None, registry=None, listing_cache=None, metrics_cache=None):
         self.group_name = "SalesForecastGroup"
-        self.sm_client = boto3.client('sagemaker', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+        self.storage = storage or create_storage()
+        self.registry = registry or SageMakerRegistry(executor=self.storage.executor)
+        self.listing_cache = listing_cache or default_listing_cache
+        self.metrics_cache = metrics_cache or default_metrics_cache
 
     async def list_pending_models(self):
         try:
-            response = self.sm_client.list_model_packages(
-                ModelPackageGroupName=self.group_name,
-                ModelApprovalStatus='PendingManualApproval',
-                SortBy='CreationTime',
-                SortOrder='Descending'
-            )
-            pending_models = []
-
-            for m in response['ModelPackageSummaryList']:
-                arn = m['ModelPackageArn']
-                metrics = await self.get_model_metrics(arn)
-
-                pending_models.append({
+            response = await self.registry.list_model_packages(self.group_name, 'PendingManualApproval')
+            summaries = response['ModelPackageSummaryList']
+            slots = asyncio.Semaphore(METRICS_FANOUT_CONCURRENCY)
+
+            async def _metrics(arn):
+                async with slots:
+                    return await self.get_model_metrics(arn)
+
+            all_metrics = await asyncio.gather(*(_metrics(m['ModelPackageArn']) for m in summaries))
+
+            pending_models = [
+                {
                     "name": m['ModelPackageName'],
                     "version": m['ModelPackageVersion'],
-                    "arn": arn,
+                    "arn": m['ModelPackageArn'],
                     "creation_time": m['CreationTime'].strftime("%Y-%m-%d %H:%M:%S"),
                     "metrics": metrics
-                })
+                }
+                for m, metrics in zip(summaries, all_metrics)
+            ]
             return {"pending_models": pending_models}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
     async def list_approved_models(self):
         try:
-            response = self.sm_client.list_model_packages(
-                ModelPackageGroupName=self.group_name,
-                ModelApprovalStatus='Approved',
-                SortBy='CreationTime',
-                SortOrder='Descending'
-            )
+            response = await self.registry.list_model_packages(self.group_name, 'Approved')
 
             approved_models = [
                 {
@@ -55,13 +67,24 @@ class ModelService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
+    async def get_latest_approved_model(self):
+        """Newest Approved package with its model.tar.gz location, or None when nothing is approved."""
+        approved = (await self.list_approved_models())["approved_models"]
+        if not approved:
+            return None
+
+        # list_model_packages sorts by creation time, newest first.
+        latest = approved[0]
+        try:
+            package = await self.registry.describe_model_package(latest["arn"])
+            containers = package.get('InferenceSpecification', {}).get('Containers', [])
+            return {**latest, "model_data_url": containers[0].get('ModelDataUrl') if containers else None}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        
     async def update_model_status(self, model_arn: str, status: str, comment: str):
         try:
-            response = self.sm_client.update_model_package(
-                ModelPackageArn=model_arn,
-                ModelApprovalStatus=status,
-                ApprovalDescription=comment
-            )
+            response = await self.registry.update_model_package(model_arn, status, comment)
             return {
                 "status": "success",
                 "message": f"Model {status}",
@@ -72,10 +95,7 @@ class ModelService:
         
     async def get_pipeline_steps_status(self, execution_arn: str):
         try:
-            response = self.sm_client.list_pipeline_execution_steps(
-                PipelineExecutionArn=execution_arn,
-                SortOrder='Ascending'
-            )
+            response = await self.registry.list_pipeline_execution_steps(execution_arn)
 
             steps = []
             for step in response.get('PipelineExecutionSteps', []):
@@ -86,36 +106,41 @@ class ModelService:
                     "end_time": step['EndTime'].strftime("%Y-%m-%d %H:%M:%S") if 'EndTime' in step else None,
                 })
 
-            execution_info = self.sm_client.describe_pipeline_execution(
-                PipelineExecutionArn=execution_arn
-            )
+            execution_info = await self.registry.describe_pipeline_execution(execution_arn)
+            overall_status = execution_info['PipelineExecutionStatus']
+
+            if overall_status in TERMINAL_PIPELINE_STATUSES:
+                # The pipeline has written processed data, features and model artifacts.
+                for env_var_name in PIPELINE_OUTPUT_BUCKET_ENVS:
+                    if os.getenv(env_var_name):
+                        self.listing_cache.invalidate(os.getenv(env_var_name))
 
             return {
-                "overall_status": execution_info['PipelineExecutionStatus'],
+                "overall_status": overall_status,
                 "steps": steps
             }
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
     async def get_model_metrics(self, model_package_arn: str):
+        cached = self.metrics_cache.get(model_package_arn)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.sm_client.describe_model_package(
-                ModelPackageName=model_package_arn
-            )
+            response = await self.registry.describe_model_package(model_package_arn)
 
             metrics_s3_uri = response.get('ModelMetrics', {}).get('ModelStatistics', {}).get('S3Uri')
 
             if not metrics_s3_uri:
                 return {"message": "No metrics found for this model."}
             
-            path_parts = metrics_s3_uri.replace("s3://", "").split("/", 1)
-            bucket = path_parts[0]
-            key="/".join(path_parts[1:])
+            bucket, key = split_s3_uri(metrics_s3_uri)
+            content = await self.storage.get_object(bucket, key)
 
-            s3_client = boto3.client('s3')
-            s3_res = s3_client.get_object(Bucket=bucket, Key=key)
-            content = s3_res['Body'].read().decode('utf-8')
-
-            return json.loads(content)
+            metrics = json.loads(content.decode('utf-8'))
+            # evaluation.json is written once per package, so entries never need to expire.
+            self.metrics_cache.set(model_package_arn, metrics)
+            return metrics
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,281 @@
+import os
+import time
+import asyncio
+import collections
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from app.infrastructure.storage import ModelArtifactCache, split_s3_uri
+from app.infrastructure.aws_sagemaker.model_artifacts import load_model_dir
+
+ONLINE_MAX_BATCH_ROWS = int(os.getenv('ONLINE_MAX_BATCH_ROWS', '256'))
+ONLINE_MAX_WAIT_MS = float(os.getenv('ONLINE_MAX_WAIT_MS', '5'))
+# Latency percentiles and throughput are computed over the most recent requests.
+ONLINE_STATS_WINDOW = int(os.getenv('ONLINE_STATS_WINDOW', '10000'))
+# How long the "latest approved model" lookup, and a loaded model's approval, are trusted before
+# asking the registry again; a model rejected in the meantime stops being served after this.
+ONLINE_MODEL_REFRESH_SECONDS = float(os.getenv('ONLINE_MODEL_REFRESH_SECONDS', '60'))
+# Models kept loaded at once; the least recently used one is unloaded beyond this.
+ONLINE_MAX_MODELS = int(os.getenv('ONLINE_MAX_MODELS', '4'))
+
+class LatencyStats:
+    """Sliding window of request latencies, batch sizes and arrival times."""
+
+    def __init__(self, window=ONLINE_STATS_WINDOW):
+        self._requests = collections.deque(maxlen=window)
+        self._batches = collections.deque(maxlen=window)
+
+    def record_request(self, finished_at, latency, rows):
+        self._requests.append((finished_at, latency, rows))
+
+    def record_batch(self, rows):
+        self._batches.append(rows)
+
+    def snapshot(self):
+        if not self._requests:
+            return {"requests": 0}
+        finished, latencies, rows = (np.array(column) for column in zip(*self._requests))
+        elapsed = finished.max() - finished.min()
+        return {
+            "requests": int(len(latencies)),
+            "rows": int(rows.sum()),
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+            "mean_ms": float(latencies.mean() * 1000),
+            "requests_per_second": float(len(latencies) / elapsed) if elapsed > 0 else None,
+            "rows_per_second": float(rows.sum() / elapsed) if elapsed > 0 else None,
+            "mean_batch_rows": float(np.mean(self._batches)) if self._batches else None,
+        }
+
+class MicroBatcher:
+    """Coalesces concurrent predict calls into one model call.
+
+    A batch closes when the next request would take it past `max_batch_rows`
+    (that request starts the following batch) or `max_wait` seconds after its
+    first request, whichever comes first; a single request larger than the
+    limit runs on its own. One batch per model is predicted at a time.
+    """
+
+    def __init__(self, predict, executor, max_batch_rows=ONLINE_MAX_BATCH_ROWS, max_wait_ms=ONLINE_MAX_WAIT_MS, stats=None):
+        self.predict_fn = predict
+        self.executor = executor
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats
+        self._queue = asyncio.Queue()
+        self._pending = None
+        self._task = None
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def predict(self, frame):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._outstanding += 1
+        self._idle.clear()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((frame, future))
+            return await future
+        finally:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.set()
+
+    async def _collect(self):
+        if self._pending is not None:
+            first, self._pending = self._pending, None
+        else:
+            first = await self._queue.get()
+        batch = [first]
+        rows = len(first[0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while rows < self.max_batch_rows:
+            if self._queue.empty():
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            if rows + len(item[0]) > self.max_batch_rows:
+                self._pending = item
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            frames = [frame for frame, _ in batch]
+            try:
+                predictions = await self.executor.run(self.predict_fn, pd.concat(frames, ignore_index=True))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if self.stats is not None:
+                self.stats.record_batch(sum(len(frame) for frame in frames))
+            offset = 0
+            for frame, future in batch:
+                if not future.done():
+                    future.set_result(predictions[offset:offset + len(frame)])
+                offset += len(frame)
+
+    async def close(self):
+        """Stop the batching task once the requests already submitted have been answered."""
+        await self._idle.wait()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+class _LoadedModel:
+    def __init__(self, arn, model, batcher):
+        self.arn = arn
+        self.model = model
+        self.features = list(model.get_booster().feature_names or [])
+        self.batcher = batcher
+        self.approved_until = time.monotonic() + ONLINE_MODEL_REFRESH_SECONDS
+
+class OnlinePredictionService:
+    """Serves approved models in-process, micro-batching concurrent requests per model."""
+
+    def __init__(self, storage, registry, model_service, model_cache=None, max_batch_rows=ONLINE_MAX_BATCH_ROWS,
+                 max_wait_ms=ONLINE_MAX_WAIT_MS, max_models=ONLINE_MAX_MODELS):
+        self.storage = storage
+        self.registry = registry
+        self.model_service = model_service
+        self.executor = storage.executor
+        self.model_cache = model_cache or ModelArtifactCache(executor=self.executor)
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.max_models = max_models
+        self.stats = LatencyStats()
+        self._models = collections.OrderedDict()
+        self._load_locks = {}
+        self._retiring = set()
+        self._latest = (None, 0.0)
+
+    async def _latest_approved_arn(self):
+        arn, expires_at = self._latest
+        if arn is None or time.monotonic() >= expires_at:
+            latest = await self.model_service.get_latest_approved_model()
+            if latest is None:
+                raise HTTPException(status_code=404, detail="No approved model to serve")
+            arn = latest["arn"]
+            self._latest = (arn, time.monotonic() + ONLINE_MODEL_REFRESH_SECONDS)
+        return arn
+
+    async def _approved_package(self, model_arn):
+        try:
+            package = await self.registry.describe_model_package(model_arn)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ValidationException':
+                raise HTTPException(status_code=404, detail=f"Model package {model_arn} not found")
+            raise
+        if package.get('ModelApprovalStatus') != 'Approved':
+            raise HTTPException(
+                status_code=409,
+                detail=f"Model package {model_arn} is {package.get('ModelApprovalStatus', 'not approved')}"
+            )
+        return package
+
+    async def _download_artifact(self, model_arn, package):
+        containers = package.get('InferenceSpecification', {}).get('Containers', [])
+        if not containers or not containers[0].get('ModelDataUrl'):
+            raise HTTPException(status_code=404, detail=f"Model package {model_arn} has no model artifact")
+        bucket, key = split_s3_uri(containers[0]['ModelDataUrl'])
+        return await self.storage.get_object(bucket, key)
+
+    async def _fetch_model(self, model_arn):
+        # Checked on every load, including from the disk cache, so a rejected package is never served.
+        package = await self._approved_package(model_arn)
+        async with self.model_cache.open(model_arn, lambda: self._download_artifact(model_arn, package)) as directory:
+            return await self.executor.run(load_model_dir, directory)
+
+    async def _recheck_approval(self, loaded):
+        try:
+            await self._approved_package(loaded.arn)
+        except HTTPException:
+            # Rejected or deleted since it was loaded.
+            if self._models.get(loaded.arn) is loaded:
+                del self._models[loaded.arn]
+                self._retire([loaded])
+            if self._latest[0] == loaded.arn:
+                self._latest = (None, 0.0)
+            raise
+        loaded.approved_until = time.monotonic() + ONLINE_MODEL_REFRESH_SECONDS
+
+    async def get_model(self, model_arn):
+        loaded = self._models.get(model_arn)
+        if loaded is not None and time.monotonic() < loaded.approved_until:
+            self._models.move_to_end(model_arn)
+            return loaded
+
+        lock = self._load_locks.setdefault(model_arn, asyncio.Lock())
+        async with lock:
+            loaded = self._models.get(model_arn)
+            if loaded is not None and time.monotonic() >= loaded.approved_until:
+                await self._recheck_approval(loaded)
+            if loaded is None:
+                model = await self._fetch_model(model_arn)
+                batcher = MicroBatcher(model.predict, self.executor, self.max_batch_rows, self.max_wait_ms, self.stats)
+                loaded = self._models[model_arn] = _LoadedModel(model_arn, model, batcher)
+                evicted = []
+                while len(self._models) > self.max_models:
+                    evicted.append(self._models.popitem(last=False)[1])
+                self._retire(evicted)
+            else:
+                self._models.move_to_end(model_arn)
+        return loaded
+
+    def _retire(self, unloaded):
+        """Close the batchers of unloaded models in the background, once their queued requests are answered."""
+        for old in unloaded:
+            self._load_locks.pop(old.arn, None)
+            task = asyncio.create_task(old.batcher.close())
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+
+    def _frame(self, instances, features):
+        if not instances:
+            raise HTTPException(status_code=422, detail="No instances to predict")
+        try:
+            # Features missing from an instance are passed as NaN, which XGBoost treats as missing.
+            return pd.DataFrame.from_records(instances, columns=features).astype("float32")
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid feature values: {str(e)}")
+
+    async def predict(self, instances, model_arn=None):
+        started = time.perf_counter()
+        try:
+            loaded = await self.get_model(model_arn or await self._latest_approved_arn())
+            frame = self._frame(instances, loaded.features)
+            predictions = await loaded.batcher.predict(frame)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        finished = time.perf_counter()
+        self.stats.record_request(finished, finished - started, len(instances))
+        return {"model_arn": loaded.arn, "predictions": [float(value) for value in predictions]}
+
+    def get_stats(self):
+        return {
+            "max_batch_rows": self.max_batch_rows,
+            "max_wait_ms": self.max_wait_ms,
+            "models_loaded": list(self._models),
+            **self.stats.snapshot(),
+        }
+
+    async def close(self):
+        await asyncio.gather(*(loaded.batcher.close() for loaded in self._models.values()), *self._retiring)
@@ -0,0 +1,109 @@
+import os
+import csv
+import asyncio
+from contextlib import aclosing
+
+RESULT_FETCH_CONCURRENCY = int(os.getenv('RESULT_FETCH_CONCURRENCY', '4'))
+PREFETCH_CHUNKS = 4
+
+def parse_cursor(cursor):
+    """Cursors are "<part index>:<byte offset>" positions in the ordered output parts."""
+    if not cursor:
+        return 0, 0
+    part_index, offset = cursor.split(":", 1)
+    return int(part_index), int(offset)
+
+def _parse_line(line):
+    values = next(csv.reader([line.decode("utf-8")]))
+    converted = []
+    for value in values:
+        try:
+            converted.append(float(value))
+        except ValueError:
+            converted.append(value)
+    if len(converted) == 1:
+        return {"prediction": converted[0]}
+    return {f"prediction_{i}": value for i, value in enumerate(converted)}
+
+class PredictionResultsReader:
+    """Reads batch transform output parts (`*.out`) under an S3 prefix without loading them whole."""
+
+    def __init__(self, storage, bucket, prefix):
+        self.storage = storage
+        self.bucket = bucket
+        self.prefix = prefix
+        self._parts = None
+
+    async def parts(self):
+        if self._parts is None:
+            objects = await self.storage.list_objects(self.bucket, self.prefix)
+            self._parts = sorted((obj for obj in objects if obj["key"].endswith(".out")), key=lambda obj: obj["key"])
+        return self._parts
+
+    async def read_page(self, cursor=None, page_size=500):
+        parts = await self.parts()
+        part_index, offset = parse_cursor(cursor)
+        rows = []
+
+        while part_index < len(parts) and len(rows) < page_size:
+            part = parts[part_index]
+            if offset >= part["size"]:
+                part_index, offset = part_index + 1, 0
+                continue
+
+            buffer = b""
+            async with aclosing(self.storage.stream_object(self.bucket, part["key"], start=offset)) as chunks:
+                async for chunk in chunks:
+                    lines = (buffer + chunk).split(b"\n")
+                    buffer = lines.pop()
+                    for line in lines:
+                        offset += len(line) + 1
+                        if line.strip():
+                            rows.append(_parse_line(line))
+                        if len(rows) == page_size:
+                            break
+                    if len(rows) == page_size:
+                        break
+                else:
+                    # The part ended; its last line may lack a trailing newline.
+                    if buffer.strip():
+                        rows.append(_parse_line(buffer))
+                    part_index, offset = part_index + 1, 0
+
+        if part_index < len(parts) and offset >= parts[part_index]["size"]:
+            part_index, offset = part_index + 1, 0
+        next_cursor = f"{part_index}:{offset}" if part_index < len(parts) else None
+        return {"predictions": rows, "next_cursor": next_cursor}
+
+    async def stream_csv(self, concurrency=RESULT_FETCH_CONCURRENCY):
+        """Yield the concatenated parts in order while up to `concurrency` parts download ahead."""
+        parts = await self.parts()
+        queues = [asyncio.Queue(maxsize=PREFETCH_CHUNKS) for _ in parts]
+        slots = asyncio.Semaphore(concurrency)
+
+        async def _fetch(key, queue):
+            async with slots:
+                try:
+                    async for chunk in self.storage.stream_object(self.bucket, key):
+                        await queue.put(chunk)
+                except Exception as e:
+                    await queue.put(e)
+                    return
+            await queue.put(None)
+
+        tasks = [asyncio.create_task(_fetch(part["key"], queue)) for part, queue in zip(parts, queues)]
+        try:
+            for queue in queues:
+                last = b"\n"
+                while (chunk := await queue.get()) is not None:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    if chunk:
+                        last = chunk
+                        yield chunk
+                if not last.endswith(b"\n"):
+                    yield b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,66 @@
+PIPELINE_STATUS_EVENT = "SageMaker Model Building Pipeline Execution Status Change"
+PIPELINE_STEP_EVENT = "SageMaker Model Building Pipeline Execution Step Status Change"
+TRANSFORM_JOB_EVENT = "SageMaker Transform Job State Change"
+
+TERMINAL_TRANSFORM_STATUSES = ("Completed", "Failed", "Stopped")
+
+def transform_progress(status, done=None, total=None, failure_reason=None):
+    if status == "Completed":
+        return {"status": status, "message": "Predictions are ready.", "progress_percentage": 100}
+    if status in ("Failed", "Stopped"):
+        return {"status": status, "message": failure_reason or f"Transform job {status.lower()}.", "progress_percentage": 0}
+    if total:
+        # Output parts appear as each input object finishes; hold 100 for "Completed".
+        percentage = min(99, int(done / total * 100))
+        return {"status": status, "message": f"{done}/{total} input files processed", "progress_percentage": percentage}
+    return {"status": status, "message": "Transform job is running.", "progress_percentage": 0}
+
+def pipeline_key(execution_arn):
+    return f"pipeline:{execution_arn}"
+
+def transform_key(job_name):
+    return f"transform:{job_name}"
+
+def _format_time(value):
+    # EventBridge sends ISO-8601 timestamps; the polled status uses "%Y-%m-%d %H:%M:%S".
+    return value.replace("T", " ")[:19] if value else None
+
+def _pipeline_status_update(detail):
+    def update(state):
+        state = state or {"overall_status": None, "steps": []}
+        return {**state, "overall_status": detail["currentPipelineExecutionStatus"]}
+    return update
+
+def _pipeline_step_update(detail):
+    def update(state):
+        state = state or {"overall_status": "Executing", "steps": []}
+        step = {
+            "step_name": detail["stepName"],
+            "step_status": detail["currentStepStatus"],
+            "start_time": _format_time(detail.get("stepStartTime")),
+            "end_time": _format_time(detail.get("stepEndTime")),
+        }
+        steps = [s for s in state["steps"] if s["step_name"] != step["step_name"]] + [step]
+        return {**state, "steps": steps}
+    return update
+
+def _transform_update(detail):
+    def update(state):
+        status = detail["TransformJobStatus"]
+        if status == "InProgress" and state:
+            return {**state, "status": status}
+        return transform_progress(status, failure_reason=detail.get("FailureReason"))
+    return update
+
+def event_to_update(event):
+    """Translate an EventBridge-style status event into (hub key, update), or None if unhandled."""
+    detail_type = event.get("detail-type")
+    detail = event.get("detail", {})
+
+    if detail_type == PIPELINE_STATUS_EVENT:
+        return pipeline_key(detail["pipelineExecutionArn"]), _pipeline_status_update(detail)
+    if detail_type == PIPELINE_STEP_EVENT:
+        return pipeline_key(detail["pipelineExecutionArn"]), _pipeline_step_update(detail)
+    if detail_type == TRANSFORM_JOB_EVENT:
+        return transform_key(detail["TransformJobName"]), _transform_update(detail)
+    return None
@@ -0,0 +1,146 @@
+import os
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIN_POLL_INTERVAL = float(os.getenv('PROGRESS_MIN_POLL_SECONDS', '5'))
+MAX_POLL_INTERVAL = float(os.getenv('PROGRESS_MAX_POLL_SECONDS', '60'))
+POLL_BACKOFF = 1.5
+# Consecutive failed status fetches after which subscribers get the error and the stream ends.
+MAX_POLL_FAILURES = int(os.getenv('PROGRESS_MAX_POLL_FAILURES', '5'))
+
+class ProgressError(Exception):
+    """Raised to subscribers when the status of a tracked resource cannot be fetched."""
+
+    def __init__(self, detail, status_code=500):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+    def to_dict(self):
+        return {"error": self.detail, "status_code": self.status_code}
+
+class _Channel:
+    def __init__(self, fetch, is_terminal):
+        self.fetch = fetch
+        self.is_terminal = is_terminal
+        self.state = None
+        self.version = 0
+        self.terminal = False
+        self.error = None
+        self.pushed = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+class ProgressHub:
+    """Fans one status poller per tracked resource out to any number of SSE subscribers.
+
+    Subscribers only receive changed states. The poller backs off while nothing
+    changes, and once status events are pushed for a resource it only polls at
+    `max_interval` as a safety net.
+    """
+
+    def __init__(self, min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL, backoff=POLL_BACKOFF, max_failures=MAX_POLL_FAILURES):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_failures = max_failures
+        self._channels = {}
+
+    async def subscribe(self, key, fetch, is_terminal):
+        """Yield each new state of `key` until `is_terminal(state)`; `fetch` is an async status call.
+
+        Raises ProgressError once the status cannot be fetched: right away on a
+        4xx HTTPException, otherwise after `max_failures` consecutive failures.
+        """
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(fetch, is_terminal)
+            channel.task = asyncio.create_task(self._poll(key, channel))
+
+        channel.subscribers += 1
+        seen_version = 0
+        try:
+            while True:
+                async with channel.changed:
+                    await channel.changed.wait_for(lambda: channel.version != seen_version)
+                seen_version = channel.version
+                if channel.error is not None:
+                    raise ProgressError(channel.error.detail, channel.error.status_code)
+                yield channel.state
+                if channel.terminal:
+                    return
+        finally:
+            channel.subscribers -= 1
+            if channel.subscribers == 0:
+                channel.wakeup.set()
+
+    async def push(self, key, update):
+        """Apply a pushed status event; `update` maps the current state to the new one.
+
+        Returns False when nobody is watching `key`, since new subscribers fetch fresh state anyway.
+        """
+        channel = self._channels.get(key)
+        if channel is None:
+            return False
+        channel.pushed = True
+        await self._publish(channel, update(channel.state))
+        if channel.terminal:
+            channel.wakeup.set()
+        return True
+
+    async def close(self):
+        tasks = [channel.task for channel in self._channels.values() if channel.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _publish(self, channel, state):
+        if state == channel.state:
+            return False
+        async with channel.changed:
+            channel.state = state
+            channel.version += 1
+            channel.terminal = channel.is_terminal(state)
+            channel.changed.notify_all()
+        return True
+
+    async def _fail(self, channel, error):
+        async with channel.changed:
+            channel.error = error
+            channel.version += 1
+            channel.terminal = True
+            channel.changed.notify_all()
+
+    async def _poll(self, key, channel):
+        interval = self.min_interval
+        failures = 0
+        try:
+            while channel.subscribers > 0 and not channel.terminal:
+                try:
+                    changed = await self._publish(channel, await channel.fetch())
+                    interval = self.min_interval if changed else min(interval * self.backoff, self.max_interval)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    status_code = getattr(e, "status_code", 500)
+                    detail = getattr(e, "detail", None) or str(e)
+                    logger.warning(f"Polling {key} failed ({failures}/{self.max_failures}): {detail}")
+                    if 400 <= status_code < 500 or failures >= self.max_failures:
+                        await self._fail(channel, ProgressError(detail, status_code))
+                        break
+                    interval = min(interval * self.backoff, self.max_interval)
+
+                if channel.terminal:
+                    break
+                channel.wakeup.clear()
+                try:
+                    await asyncio.wait_for(channel.wakeup.wait(), self.max_interval if channel.pushed else interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._channels.get(key) is channel:
+                del self._channels[key]
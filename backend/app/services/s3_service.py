@@ -1,73 +1,165 @@
 import os
-import boto3
+import re
 from fastapi import HTTPException
 import base64
+from app.infrastructure.storage import create_storage, listing_cache as default_listing_cache
+from .tabular_preview import PREVIEW_EXTENSIONS, read_preview
+
+BUCKET_ENV_MAPPING = {
+    "raw": "S3_RAW_DATA_BUCKET",
+    "processed": "S3_PROCESSED_DATA_BUCKET",
+    "feature-store": "S3_FEATURE_STORE_DATA_BUCKET",
+    "artifacts": "S3_ARTIFACTS_BUCKET"
+}
+
+SORT_FIELDS = {
+    "name": "key",
+    "size": "size",
+    "last_modified": "last_modified"
+}
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range_header(range_header, size):
+    """Return the inclusive (start, end) of a single-range header, or None to serve the whole object."""
+    if not range_header:
+        return None
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multi-range and malformed headers may be ignored per RFC 9110.
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Range {range_header} not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def resolve_bucket(bucket_type: str):
+    env_var_name = BUCKET_ENV_MAPPING.get(bucket_type.lower(), f"S3_{bucket_type.upper().replace('-', '_')}_BUCKET")
+    bucket_name = os.getenv(env_var_name)
+
+    if not bucket_name:
+        raise HTTPException(status_code=500, detail=f"Environment variable {env_var_name} is not configured")
+    return bucket_name
 
 class S3Service:
-    def __init__(self):
-        self.s3_client = boto3.client('s3', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-
-    async def list_bucket_files(self, bucket_type: str):
-        env_mapping = {
-            "raw": "S3_RAW_DATA_BUCKET",
-            "processed": "S3_PROCESSED_DATA_BUCKET",
-            "feature-store": "S3_FEATURE_STORE_DATA_BUCKET",
-            "artifacts": "S3_ARTIFACTS_BUCKET"
-        }
-        
-        env_var_name = env_mapping.get(bucket_type.lower(), f"S3_{bucket_type.upper().replace('-', '_')}_BUCKET")
-        bucket_name = os.getenv(env_var_name)
+    def __init__(self, storage=None, listing_cache=None):
+        self.storage = storage or create_storage()
+        self.listing_cache = listing_cache or default_listing_cache
 
-        if not bucket_name:
-            raise HTTPException(status_code=500, detail=f"Environment variable {env_var_name} is not configured")
+    async def _listing(self, bucket_name, prefix="", delimiter=None, refresh=False):
+        listing = None if refresh else self.listing_cache.get(bucket_name, prefix, delimiter)
+        if listing is None:
+            listing = await self.storage.list_all(bucket_name, prefix, delimiter)
+            self.listing_cache.set(bucket_name, prefix, delimiter, listing)
+        return listing
+
+    async def list_bucket_files(self, bucket_type: str, prefix: str = "", delimiter: str = None, cursor: str = None,
+                                page_size: int = 100, sort_by: str = "name", descending: bool = False,
+                                refresh: bool = False):
+        bucket_name = resolve_bucket(bucket_type)
+        if sort_by not in SORT_FIELDS:
+            raise HTTPException(status_code=400, detail=f"sort_by must be one of {sorted(SORT_FIELDS)}")
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
 
         try:
-            response = self.s3_client.list_objects_v2(Bucket=bucket_name)
-            files = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    files.append({
-                        "filename": obj['Key'],
-                        "size": f"{obj['Size'] / 1024:.2f} KB",
-                        "last_modified": obj['LastModified'].strftime("%Y-%m-%d %H:%M:%S")
-                    })
-            return files
+            listing = await self._listing(bucket_name, prefix, delimiter, refresh)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+        # Cursors are offsets into the cached snapshot, which keeps sorting stable across pages.
+        objects = sorted(listing["objects"], key=lambda obj: obj[SORT_FIELDS[sort_by]], reverse=descending)
+        page = objects[offset:offset + page_size]
+        next_offset = offset + page_size
+        return {
+            "files": [
+                {
+                    "filename": obj['key'],
+                    "size": f"{obj['size'] / 1024:.2f} KB",
+                    "last_modified": obj['last_modified'].strftime("%Y-%m-%d %H:%M:%S")
+                }
+                for obj in page
+            ],
+            "folders": listing["prefixes"],
+            "next_cursor": str(next_offset) if next_offset < len(objects) else None,
+            "total": len(objects)
+        }
         
     async def list_s3_inputs(self):
-        env_var_name = "S3_FEATURE_STORE_DATA_BUCKET"
-        bucket_name = os.getenv(env_var_name)
-        
-        if not bucket_name:
-            raise HTTPException(status_code=500, detail=f"Environment variable {env_var_name} is not configured")
+        bucket_name = resolve_bucket("feature-store")
         
         try:
-            response = self.s3_client.list_objects_v2(Bucket=bucket_name, Prefix='/')
-            s3_inputs = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    s3_inputs.append(f"s3://{bucket_name}/{obj['Key']}")
-            return s3_inputs
+            # Top-level dataset folders (e.g. train/, test/) are valid S3Prefix transform inputs.
+            listing = await self._listing(bucket_name, delimiter='/')
+            return (
+                [f"s3://{bucket_name}/{prefix}" for prefix in listing["prefixes"]]
+                + [f"s3://{bucket_name}/{obj['key']}" for obj in listing["objects"]]
+            )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
         
     async def get_file_content(self, bucket_type: str, file_key: str):
-        env_mapping = {
-            "raw": "S3_RAW_DATA_BUCKET",
-            "processed": "S3_PROCESSED_DATA_BUCKET",
-            "feature-store": "S3_FEATURE_STORE_DATA_BUCKET",
-            "artifacts": "S3_ARTIFACTS_BUCKET"
-        }
-        
-        env_var_name = env_mapping.get(bucket_type.lower())
-        bucket_name = os.getenv(env_var_name)
-        if not bucket_name:
-            raise HTTPException(status_code=500, detail=f"Environment variable {env_var_name} is not configured")
+        bucket_name = resolve_bucket(bucket_type)
 
         try:
-            response = self.s3_client.get_object(Bucket=bucket_name, Key=file_key)
-            raw_data = response['Body'].read()
+            raw_data = await self.storage.get_object(bucket_name, file_key)
             return base64.b64encode(raw_data).decode('utf-8')
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def open_download(self, bucket_type: str, file_key: str, range_header: str = None):
+        bucket_name = resolve_bucket(bucket_type)
+
+        try:
+            meta = await self.storage.head_object(bucket_name, file_key)
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        size = meta["size"]
+        byte_range = parse_range_header(range_header, size)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f'attachment; filename="{os.path.basename(file_key)}"'
+        }
+
+        if byte_range is None:
+            start, end, status_code = None, None, 200
+            headers["Content-Length"] = str(size)
+        else:
+            (start, end), status_code = byte_range, 206
+            headers["Content-Length"] = str(end - start + 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        body = self.storage.stream_object(bucket_name, file_key, start, end)
+        return status_code, headers, meta["content_type"], body
+
+    async def get_file_preview(self, bucket_type: str, file_key: str, rows: int = 100, columns=None, row_groups=None):
+        bucket_name = resolve_bucket(bucket_type)
+        file_extension = os.path.splitext(file_key)[1].lower()
+        if file_extension not in PREVIEW_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"Preview supports {', '.join(PREVIEW_EXTENSIONS)} files")
+
+        def _preview():
+            with self.storage.open_seekable(bucket_name, file_key) as fileobj:
+                return read_preview(fileobj, file_extension, rows, columns, row_groups)
+
+        try:
+            preview = await self.storage.executor.run(_preview)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"file_key": file_key, **preview}
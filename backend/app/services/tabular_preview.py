@@ -0,0 +1,44 @@
+import json
+import pandas as pd
+import pyarrow.parquet as pq
+
+PREVIEW_EXTENSIONS = ('.parquet', '.csv', '.xlsx', '.xls')
+
+def read_preview(fileobj, file_extension, rows=100, columns=None, row_groups=None):
+    """Read at most `rows` rows of `columns` from a seekable file object.
+
+    Parquet previews only fetch the footer plus the column chunks of the requested
+    row groups; CSV and Excel previews stop parsing after `rows` rows.
+    """
+    total_rows, num_row_groups = None, None
+
+    if file_extension == '.parquet':
+        parquet_file = pq.ParquetFile(fileobj)
+        total_rows = parquet_file.metadata.num_rows
+        num_row_groups = parquet_file.num_row_groups
+        if row_groups:
+            invalid = [i for i in row_groups if not 0 <= i < num_row_groups]
+            if invalid:
+                raise ValueError(f"Row groups out of range (file has {num_row_groups}): {invalid}")
+            df = parquet_file.read_row_groups(row_groups, columns=columns).slice(0, rows).to_pandas()
+        else:
+            batch = next(parquet_file.iter_batches(batch_size=rows, columns=columns), None)
+            if batch is not None:
+                df = batch.to_pandas()
+            else:
+                schema = parquet_file.schema_arrow
+                df = schema.empty_table().select(columns or schema.names).to_pandas()
+    elif file_extension == '.csv':
+        df = pd.read_csv(fileobj, nrows=rows, usecols=columns)
+    elif file_extension in ('.xlsx', '.xls'):
+        df = pd.read_excel(fileobj, nrows=rows, usecols=columns)
+    else:
+        raise ValueError(f"Preview is not supported for {file_extension} files")
+
+    return {
+        "columns": [str(c) for c in df.columns],
+        "rows": json.loads(df.to_json(orient="values", date_format="iso")),
+        "preview_rows": len(df),
+        "total_rows": total_rows,
+        "num_row_groups": num_row_groups
+    }
@@ -0,0 +1,57 @@
+"""Cold-start import time per Lambda handler, checked against a per-handler budget.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_lambda_cold_start --runs 7
+
+Each run imports the handler module in a fresh interpreter, which is what a
+Lambda cold start pays before the first invocation. Exits non-zero when a
+handler's median import time exceeds its budget.
+"""
+import sys
+import argparse
+import statistics
+import subprocess
+
+HANDLER_IMPORT_BUDGETS_MS = {
+    "glue_trigger_handler": 400,
+    "s3_ingest_handler": 400,
+    "textract_collector_handler": 100,
+}
+
+_PROBE = (
+    "import time; started = time.perf_counter(); "
+    "import importlib; importlib.import_module('app.infrastructure.aws_lambda.{module}'); "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+def measure(module, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples), max(samples)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'handler':<30}{'median ms':>12}{'max ms':>10}{'budget ms':>12}")
+    for module, budget in HANDLER_IMPORT_BUDGETS_MS.items():
+        median, worst = measure(module, args.runs)
+        flag = "" if median <= budget else "  OVER BUDGET"
+        print(f"{module:<30}{median:>12.1f}{worst:>10.1f}{budget:>12}{flag}")
+        if median > budget:
+            over_budget.append(module)
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Cold vs warm model loads through ModelArtifactCache, and joblib vs native UBJSON.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_model_cache --n-estimators 200 1000
+
+The model.tar.gz holds model.joblib and model.ubj as train.py writes them and
+is served from a LocalStorage bucket, so "cold" excludes S3 transfer time; on
+S3 the cold path additionally pays the download. "uncached" is the previous
+path: fetch, untar in memory and unpickle on every load. "single-flight"
+starts `--concurrency` loads of a cold ARN at once and counts downloads.
+"""
+import io
+import os
+import json
+import time
+import asyncio
+import tarfile
+import argparse
+import tempfile
+import statistics
+import joblib
+import numpy as np
+import xgboost as xgb
+from app.infrastructure.storage import LocalStorage, ModelArtifactCache
+from app.infrastructure.aws_sagemaker.model_artifacts import JOBLIB_MODEL_FILE, NATIVE_MODEL_FILE, SKLEARN_PARAMS_ATTR, load_model_dir
+
+def model_archive(n_estimators, n_features=24, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((20000, n_features)).astype("float32")
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.standard_normal(len(X))
+    model = xgb.XGBRegressor(n_estimators=n_estimators, max_depth=8, tree_method="hist")
+    model.fit(X, y)
+    params = {name: value for name, value in model.get_params().items() if isinstance(value, (bool, int, float, str))}
+    model.get_booster().set_attr(**{SKLEARN_PARAMS_ATTR: json.dumps(params)})
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model.save_model(os.path.join(workdir, NATIVE_MODEL_FILE))
+        joblib.dump(model, os.path.join(workdir, JOBLIB_MODEL_FILE))
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+            for name in (NATIVE_MODEL_FILE, JOBLIB_MODEL_FILE):
+                tar.add(os.path.join(workdir, name), arcname=name)
+    return archive.getvalue()
+
+def _load_uncached(content):
+    with tarfile.open(fileobj=io.BytesIO(content)) as tar:
+        return joblib.load(io.BytesIO(tar.extractfile(JOBLIB_MODEL_FILE).read()))
+
+async def _timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-estimators', type=int, nargs="+", default=[200, 1000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'trees':>7}{'archive MB':>12}{'uncached ms':>13}{'cold ms':>10}{'warm joblib ms':>16}{'warm native ms':>16}{'downloads':>11}")
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(os.path.join(root, "storage"))
+        for n_estimators in args.n_estimators:
+            content = model_archive(n_estimators)
+            key = f"models/{n_estimators}/model.tar.gz"
+            await storage.put_object("artifacts", key, content)
+            arn = f"arn:aws:sagemaker:local:000000000000:model-package/salesforecastgroup/{n_estimators}"
+            fetch = lambda: storage.get_object("artifacts", key)
+
+            async def _uncached():
+                await storage.executor.run(_load_uncached, await fetch())
+
+            async def _cold():
+                cache = ModelArtifactCache(os.path.join(root, f"cold-{time.perf_counter_ns()}"), executor=storage.executor)
+                async with cache.open(arn, fetch) as directory:
+                    await storage.executor.run(load_model_dir, directory)
+
+            cache = ModelArtifactCache(os.path.join(root, "warm"), executor=storage.executor)
+            async with cache.open(arn, fetch):
+                pass
+
+            async def _warm_joblib():
+                async with cache.open(arn, fetch) as directory:
+                    await storage.executor.run(joblib.load, os.path.join(directory, JOBLIB_MODEL_FILE))
+
+            async def _warm_native():
+                async with cache.open(arn, fetch) as directory:
+                    await storage.executor.run(load_model_dir, directory)
+
+            timings = [await _timed(fn, args.repeats) for fn in (_uncached, _cold, _warm_joblib, _warm_native)]
+
+            flight = ModelArtifactCache(os.path.join(root, f"flight-{n_estimators}"), executor=storage.executor)
+
+            async def _open():
+                async with flight.open(arn, fetch) as directory:
+                    return directory
+
+            await asyncio.gather(*(_open() for _ in range(args.concurrency)))
+
+            print(
+                f"{n_estimators:>7}{len(content) / 1024 ** 2:>12.2f}{timings[0]:>13.1f}{timings[1]:>10.1f}"
+                f"{timings[2]:>16.1f}{timings[3]:>16.1f}{flight.downloads:>8}/{args.concurrency}"
+            )
+
+if __name__ == "__main__":
+    asyncio.run(main())
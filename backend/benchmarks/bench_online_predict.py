@@ -0,0 +1,99 @@
+"""p50/p99 latency and throughput of in-process online prediction under concurrent load.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_online_predict --clients 1 16 64 --max-batch-rows 1 64 256
+
+A synthetic model.tar.gz is stored in a LocalStorage bucket and served through
+OnlinePredictionService; a fixture registry answers describe_model_package
+with its location. Each client sends single-row requests back to back for
+`--seconds`. max-batch-rows 1 disables coalescing.
+"""
+import io
+import os
+import asyncio
+import tarfile
+import argparse
+import tempfile
+import joblib
+import numpy as np
+import xgboost as xgb
+from app.infrastructure.storage import LocalStorage, ModelArtifactCache
+from app.services.online_prediction import OnlinePredictionService
+
+MODEL_ARN = "arn:aws:sagemaker:local:000000000000:model-package/salesforecastgroup/1"
+
+class FixtureRegistry:
+    def __init__(self, model_data_url):
+        self.model_data_url = model_data_url
+
+    async def describe_model_package(self, model_package_arn):
+        return {
+            "ModelApprovalStatus": "Approved",
+            "InferenceSpecification": {"Containers": [{"ModelDataUrl": self.model_data_url}]},
+        }
+
+def model_archive(n_features=24, n_estimators=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((20000, n_features)).astype("float32")
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.standard_normal(len(X))
+    model = xgb.XGBRegressor(n_estimators=n_estimators, max_depth=6, tree_method="hist")
+    model.fit(X, y)
+    model.get_booster().feature_names = [f"f{i}" for i in range(n_features)]
+
+    payload = io.BytesIO()
+    joblib.dump(model, payload)
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+        info = tarfile.TarInfo("model.joblib")
+        info.size = payload.getbuffer().nbytes
+        payload.seek(0)
+        tar.addfile(info, payload)
+    return archive.getvalue(), model.get_booster().feature_names
+
+async def run_load(storage, registry, model_cache, features, clients, max_batch_rows, max_wait_ms, seconds):
+    service = OnlinePredictionService(
+        storage, registry, None, model_cache=model_cache, max_batch_rows=max_batch_rows, max_wait_ms=max_wait_ms
+    )
+    rng = np.random.default_rng(1)
+    await service.get_model(MODEL_ARN)
+    deadline = asyncio.get_running_loop().time() + seconds
+
+    async def _client():
+        while asyncio.get_running_loop().time() < deadline:
+            instance = dict(zip(features, rng.standard_normal(len(features)).tolist()))
+            await service.predict([instance], MODEL_ARN)
+
+    await asyncio.gather(*(_client() for _ in range(clients)))
+    stats = service.get_stats()
+    await service.close()
+    return stats
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument('--max-batch-rows', type=int, nargs="+", default=[1, 64, 256])
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(root)
+        content, features = model_archive()
+        await storage.put_object("artifacts", "models/model.tar.gz", content)
+        registry = FixtureRegistry("s3://artifacts/models/model.tar.gz")
+        model_cache = ModelArtifactCache(os.path.join(root, "model-cache"), executor=storage.executor)
+
+        print(f"{'clients':>8}{'max batch':>10}{'mean batch':>12}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>10}")
+        for clients in args.clients:
+            for max_batch_rows in args.max_batch_rows:
+                stats = await run_load(
+                    storage, registry, model_cache, features, clients, max_batch_rows, args.max_wait_ms, args.seconds
+                )
+                print(
+                    f"{clients:>8}{max_batch_rows:>10}{stats['mean_batch_rows']:>12.1f}{stats['p50_ms']:>9.2f}"
+                    f"{stats['p99_ms']:>9.2f}{stats['requests_per_second']:>10.0f}"
+                )
+
+if __name__ == "__main__":
+    asyncio.run(main())
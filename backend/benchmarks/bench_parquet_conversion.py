@@ -0,0 +1,74 @@
+"""Throughput and peak RSS of CSV -> parquet conversion against file size.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_parquet_conversion --sizes-mb 16 64 256
+
+Each conversion runs in a fresh interpreter so peak RSS is measured per
+conversion. "streaming" is the chunked row-group writer used by the ingest
+Lambda; "in-memory" reads the whole CSV into one table first.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+
+_CONVERT = """
+import json, resource, sys, time
+mode, source, target = sys.argv[1:4]
+started = time.perf_counter()
+if mode == "streaming":
+    from app.infrastructure.aws_lambda.parquet_conversion import csv_to_parquet
+    with open(source, "rb") as f:
+        csv_to_parquet(f, target)
+else:
+    import pyarrow.csv as pa_csv, pyarrow.parquet as pq
+    pq.write_table(pa_csv.read_csv(source), target)
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+def write_sales_csv(path, size_mb):
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    with open(path, "w") as f:
+        f.write("date,store_id,region,category,price,promotion,sales\n")
+        while f.tell() < target:
+            lines = [
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d},{rng.randint(1, 500)},"
+                f"region-{rng.randint(1, 8)},cat-{rng.randint(1, 40)},{rng.uniform(1, 200):.2f},"
+                f"{rng.randint(0, 1)},{rng.randint(0, 300)}\n"
+                for _ in range(10000)
+            ]
+            f.writelines(lines)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes-mb', type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8}{'mode':>12}{'MB/s':>10}{'peak RSS MB':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes_mb:
+            source = os.path.join(workdir, f"sales_{size_mb}.csv")
+            write_sales_csv(source, size_mb)
+            actual_mb = os.path.getsize(source) / (1024 * 1024)
+            for mode in ("streaming", "in-memory"):
+                target = os.path.join(workdir, f"sales_{size_mb}_{mode}.parquet")
+                output = subprocess.run(
+                    [sys.executable, "-c", _CONVERT, mode, source, target],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{actual_mb:>8.0f}{mode:>12}{actual_mb / result['seconds']:>10.1f}"
+                    f"{result['peak_rss_kb'] / 1024:>14.1f}"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Wall time and throughput of the sales feature library against the number of series.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_sales_features --series 1000 10000 --days 1095
+
+Each size builds a synthetic daily panel (store x category series with price,
+promotion and sales) and times build_features on it; the panel for 10k series
+x 3 years is ~11M rows and needs several GB of RAM.
+"""
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, "app/infrastructure/aws_glue")
+from sales_features import build_features
+
+def make_panel(n_series, n_days, seed=42):
+    rng = np.random.default_rng(seed)
+    series = np.arange(n_series)
+    dates = pd.date_range("2022-01-01", periods=n_days, freq="D")
+    n_rows = n_series * n_days
+    price = np.repeat(rng.uniform(1, 200, n_series), n_days) * rng.choice([1.0, 0.9, 1.1], n_rows, p=[0.9, 0.05, 0.05])
+    return pd.DataFrame({
+        "date": np.tile(dates.values, n_series),
+        "store_id": np.repeat((series // 40).astype(str), n_days),
+        "category": np.repeat(np.char.add("cat-", (series % 40).astype(str)), n_days),
+        "region": np.repeat(np.char.add("region-", (series % 8).astype(str)), n_days),
+        "price": price,
+        "promotion": (rng.random(n_rows) < 0.1).astype("float64"),
+        "sales": rng.poisson(50, n_rows).astype("float64"),
+    })
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--series', type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument('--days', type=int, default=3 * 365)
+    args = parser.parse_args()
+
+    print(f"{'series':>8}{'rows':>12}{'seconds':>10}{'rows/s':>14}{'features':>10}")
+    for n_series in args.series:
+        panel = make_panel(n_series, args.days)
+        started = time.perf_counter()
+        features = build_features(panel)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{n_series:>8}{len(panel):>12}{elapsed:>10.2f}{len(panel) / elapsed:>14,.0f}"
+            f"{len(features.columns) - len(panel.columns):>10}"
+        )
+        del panel, features
+
+if __name__ == "__main__":
+    main()
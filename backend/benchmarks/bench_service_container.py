@@ -0,0 +1,108 @@
+"""Per-request latency of a ForecastService route: services built per request vs shared.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_service_container --requests 400
+
+Requests go through the real FastAPI app to POST /upload-raw-data, which
+resolves get_forecast_service; the uploaded file is stored during warm-up, so
+every measured request takes the same content-hash dedup path. "per-request"
+builds a ForecastService with its own storage executor and the SageMaker
+clients the API used to create eagerly (a boto3 sagemaker client per
+predictor/orchestrator, plus a PipelineSession when the SDK is installed), and
+shuts the executor down after the response. "shared" reuses one service. Each
+variant has its own listing cache, both are warmed up, and the measured rounds
+alternate which variant goes first.
+"""
+import os
+import time
+import argparse
+import tempfile
+import statistics
+import importlib.util
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.dependencies import get_forecast_service
+from app.infrastructure.storage import ListingCache
+from app.infrastructure.aws_sagemaker.batch_predict import BatchPredictor
+from app.services import ForecastService
+
+PATH = "/api/v1/forecast/upload-raw-data"
+PAYLOAD = b"date,store_id,sales\n2024-01-01,1,10\n"
+
+def _eager_clients(region):
+    clients = [BatchPredictor(region), BatchPredictor(region)]
+    if importlib.util.find_spec("sagemaker") is not None:
+        from sagemaker.workflow.pipeline_context import PipelineSession
+
+        clients.append(PipelineSession())
+    return clients
+
+def per_request_service():
+    service = ForecastService(listing_cache=ListingCache())
+    service._clients = _eager_clients(service.region)
+    try:
+        yield service
+    finally:
+        service.executor.shutdown(wait=False)
+
+def _measure(client, requests):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.post(PATH, files={"files": ("sales.csv", PAYLOAD, "text/csv")})
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return latencies
+
+def _summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "mean_ms": statistics.fmean(latencies),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--rounds', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault('STORAGE_BACKEND', 'local')
+    os.environ.setdefault('LOCAL_STORAGE_ROOT', tempfile.mkdtemp())
+    os.environ.setdefault('S3_RAW_DATA_BUCKET', 'raw')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    shared = ForecastService(listing_cache=ListingCache())
+    variants = {
+        "per-request services": per_request_service,
+        "shared service": lambda: shared,
+    }
+    latencies = {name: [] for name in variants}
+
+    with TestClient(app) as client:
+        try:
+            for name, dependency in variants.items():
+                app.dependency_overrides[get_forecast_service] = dependency
+                _measure(client, args.warmup)
+
+            per_round = max(1, args.requests // args.rounds)
+            for round_index in range(args.rounds):
+                order = list(variants) if round_index % 2 == 0 else list(reversed(list(variants)))
+                for name in order:
+                    app.dependency_overrides[get_forecast_service] = variants[name]
+                    latencies[name].extend(_measure(client, per_round))
+        finally:
+            app.dependency_overrides.clear()
+            shared.executor.shutdown(wait=False)
+
+    before, after = _summary(latencies["per-request services"]), _summary(latencies["shared service"])
+    print(f"{'case':<22}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, result in (("per-request services", before), ("shared service", after)):
+        print(f"{name:<22}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['mean_ms']:>10.2f}")
+    print(f"mean speedup: {before['mean_ms'] / after['mean_ms']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Pandas vs Spark feature engineering: wall time and a column-by-column parity check.
+
+Run from `backend/` (needs pyspark and a JVM):
+
+    python -m benchmarks.bench_spark_features --series 100 1000 --days 1095
+
+Spark runs on a local[*] session, so the speed-up is bounded by this machine's
+cores; on Glue the same window functions spread over the workers.
+"""
+import sys
+import time
+import argparse
+from pyspark.sql import SparkSession
+
+sys.path.insert(0, "app/infrastructure/aws_glue")
+from sales_features import build_features
+from spark_features import build_features as build_spark_features
+from benchmarks.bench_sales_features import make_panel
+from benchmarks.check_spark_parity import assert_same_features
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--series', type=int, nargs="+", default=[100, 1000])
+    parser.add_argument('--days', type=int, default=3 * 365)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder.master("local[*]").appName("bench-spark-features").getOrCreate()
+    print(f"{'series':>8}{'rows':>12}{'pandas s':>10}{'spark s':>10}")
+    for n_series in args.series:
+        panel = make_panel(n_series, args.days)
+
+        started = time.perf_counter()
+        expected = build_features(panel)
+        pandas_seconds = time.perf_counter() - started
+
+        sdf = spark.createDataFrame(panel)
+        started = time.perf_counter()
+        actual = build_spark_features(sdf).toPandas()
+        spark_seconds = time.perf_counter() - started
+
+        assert_same_features(expected, actual)
+        print(f"{n_series:>8}{len(panel):>12}{pandas_seconds:>10.2f}{spark_seconds:>10.2f}")
+    spark.stop()
+
+if __name__ == "__main__":
+    main()
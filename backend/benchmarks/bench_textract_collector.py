@@ -0,0 +1,68 @@
+"""Wall time and peak RSS of Textract table collection against document size, offline.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_textract_collector --pages 50 200 800
+
+Responses come from benchmarks.textract_fixtures. "streaming" is the
+collector's page-wise path; "in-memory" holds every block of the document
+before building tables and writes them as one table, as the earlier
+awswrangler-based collector did. Each run is a fresh interpreter.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.textract_fixtures import write_fixture
+
+_COLLECT = """
+import json, resource, sys, time
+import pyarrow as pa
+from benchmarks.textract_fixtures import FixtureTextractClient
+from app.infrastructure.aws_lambda import textract_tables as tt
+from app.infrastructure.aws_lambda.parquet_conversion import write_partitioned
+from app.infrastructure.aws_lambda.textract_collector_handler import collect_tables
+
+mode, fixtures, job_id, target = sys.argv[1:5]
+client = FixtureTextractClient(fixtures)
+started = time.perf_counter()
+if mode == "streaming":
+    stats = collect_tables(client, job_id, target)
+else:
+    responses = list(tt.iter_analysis_responses(client, job_id))
+    tables = list(tt.sales_tables(tt.iter_tables(responses)))
+    stats = write_partitioned(tt.SALES_SCHEMA, [pa.concat_tables(tables)], target, job_id)
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "rows": stats["rows"], "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument('--rows-per-page', type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'pages':>8}{'mode':>12}{'rows':>10}{'seconds':>10}{'peak RSS MB':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for pages in args.pages:
+            job_id = f"job-{pages}"
+            write_fixture(workdir, job_id, pages, args.rows_per_page)
+            for mode in ("streaming", "in-memory"):
+                target = os.path.join(workdir, f"out-{pages}-{mode}")
+                output = subprocess.run(
+                    [sys.executable, "-c", _COLLECT, mode, workdir, job_id, target],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{pages:>8}{mode:>12}{result['rows']:>10}{result['seconds']:>10.2f}"
+                    f"{result['peak_rss_kb'] / 1024:>14.1f}"
+                )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Wall time and peak RSS of train.py's streaming and in-memory modes against train-channel size.
+
+Run from `backend/`:
+
+    python -m benchmarks.bench_train_out_of_core --rows 500000 2000000
+
+The train channel is synthetic: hive-partitioned by ingest_date with string
+identifiers, a date column and numeric features, as the Glue job writes it.
+Each run is a fresh interpreter running train.py itself.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+TRAIN_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "app", "infrastructure", "aws_sagemaker", "train.py")
+
+_TRAIN = """
+import json, os, resource, runpy, sys, time
+started = time.perf_counter()
+sys.argv = ["train.py"] + sys.argv[2:]
+runpy.run_path(os.environ["TRAIN_SCRIPT"], run_name="__main__")
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+def write_channel(directory, rows, n_features=24, partitions=8, seed=0):
+    rng = np.random.default_rng(seed)
+    per_partition = rows // partitions
+    for p in range(partitions):
+        frame = pd.DataFrame(
+            rng.standard_normal((per_partition, n_features)).astype("float64"),
+            columns=[f"f{i}" for i in range(n_features)],
+        )
+        frame["sales"] = frame["f0"] * 3 + frame["f1"] ** 2 + rng.standard_normal(per_partition)
+        frame["store_id"] = rng.integers(0, 500, per_partition).astype(str)
+        frame["category"] = rng.integers(0, 40, per_partition).astype(str)
+        frame["date"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, per_partition), unit="D")
+        target = os.path.join(directory, f"ingest_date=2024-01-{p + 1:02d}")
+        os.makedirs(target, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), os.path.join(target, "part-0.parquet"))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs="+", default=[500000, 2000000])
+    parser.add_argument('--n-estimators', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'mode':>12}{'seconds':>10}{'peak RSS MB':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            channel = os.path.join(workdir, f"train-{rows}")
+            write_channel(channel, rows)
+            for mode in ("streaming", "in-memory"):
+                model_dir = os.path.join(workdir, f"model-{rows}-{mode}")
+                os.makedirs(model_dir)
+                output = subprocess.run(
+                    [
+                        sys.executable, "-c", _TRAIN, "--",
+                        "--train", channel, "--model-dir", model_dir,
+                        "--n-estimators", str(args.n_estimators), "--data-mode", mode,
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                    env={**os.environ, "TRAIN_SCRIPT": os.path.abspath(TRAIN_SCRIPT)},
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>10}{mode:>12}{result['seconds']:>10.2f}{result['peak_rss_kb'] / 1024:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Parity check of spark_features against sales_features on a local[*] session.
+
+Run from `backend/` (needs pyspark and a JVM); exits non-zero on the first mismatch:
+
+    python -m benchmarks.check_spark_parity
+
+The fixture is small and built to hit the edge cases rather than for volume:
+duplicate rows for a day (the last one wins, within a file and across
+files read in path order), rows without a date or target,
+gaps in a series, a series shorter than the longest lag, zero and missing
+prices, promotions starting and ending, and dates given as strings. Spark
+reads the fixture from parquet, as the Glue job does, so missing values are
+nulls rather than NaN. Besides values, the column order and dtypes must match,
+and both engines must agree on the incremental path the Glue job takes:
+history_tail of the old rows, then features over tail + new rows.
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from pyspark.sql import SparkSession, functions as F
+
+sys.path.insert(0, "app/infrastructure/aws_glue")
+import sales_features
+import spark_features
+from sales_features import SERIES_KEYS, DATE_COLUMN, TARGET_COLUMN
+from benchmarks.bench_sales_features import make_panel
+
+def _dtype_kind(dtype):
+    # toPandas gives object strings and datetime64[ns]; pandas may use its string dtype or another unit.
+    if pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+        return "string"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return str(dtype)
+
+def assert_same_features(expected, actual, check_dtypes=True):
+    keys = [key for key in SERIES_KEYS if key in expected.columns] + [DATE_COLUMN]
+    assert list(expected.columns) == list(actual.columns), (list(expected.columns), list(actual.columns))
+    assert len(expected) == len(actual), (len(expected), len(actual))
+    expected = expected.sort_values(keys, ignore_index=True)
+    actual = actual.sort_values(keys, ignore_index=True)
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if check_dtypes:
+            assert _dtype_kind(left.dtype) == _dtype_kind(right.dtype), (column, left.dtype, right.dtype)
+        if pd.api.types.is_float_dtype(left):
+            assert np.allclose(left, right.astype("float64"), rtol=1e-9, atol=1e-9, equal_nan=True), column
+        elif pd.api.types.is_datetime64_any_dtype(left):
+            assert (pd.to_datetime(left) == pd.to_datetime(right)).all(), column
+        else:
+            assert (left.astype(str) == right.astype(str)).all(), column
+
+def edge_case_frame():
+    panel = make_panel(6, 90)
+    panel["date"] = panel["date"].dt.strftime("%Y-%m-%d")
+    series = panel["store_id"] + "/" + panel["category"]
+    first, second, third = series.unique()[:3]
+
+    # Gaps: drop every third day of one series, and all but the last 10 days of another.
+    gaps = (series == first) & (panel.index % 3 == 0)
+    short = (series == second) & (panel.groupby(series).cumcount() < 80)
+    panel = panel[~(gaps | short)].copy()
+
+    panel.loc[panel.sample(frac=0.05, random_state=1).index, "price"] = np.nan
+    panel.loc[panel.sample(frac=0.02, random_state=2).index, "price"] = 0.0
+    panel.loc[panel.sample(frac=0.02, random_state=3).index, "promotion"] = np.nan
+
+    # Same series and day twice: the later row must win in both engines.
+    duplicates = panel[(panel["store_id"] + "/" + panel["category"]) == third].head(5).copy()
+    duplicates["sales"] = duplicates["sales"] + 1000
+    invalid = panel.head(4).copy()
+    invalid.loc[invalid.index[:2], "date"] = None
+    invalid.loc[invalid.index[2:], "sales"] = np.nan
+    return pd.concat([panel, duplicates, invalid], ignore_index=True)
+
+class Fixtures:
+    """Writes each frame to parquet once so Spark reads it the way the Glue job does."""
+
+    def __init__(self, spark, root):
+        self.spark = spark
+        self.root = root
+        self.count = 0
+
+    def spark_frame(self, frame):
+        return self.spark_files([frame])
+
+    def spark_files(self, frames):
+        """One parquet file per frame, read together the way run_spark reads processed files."""
+        self.count += 1
+        paths = []
+        for i, frame in enumerate(frames):
+            paths.append(os.path.join(self.root, f"fixture-{self.count}", f"part-{i}.parquet"))
+            os.makedirs(os.path.dirname(paths[-1]), exist_ok=True)
+            frame.to_parquet(paths[-1], index=False)
+        return self.spark.read.parquet(*paths)
+
+def multi_file_frames():
+    """Two uploads with the same series and days, the later path holding the larger file.
+
+    pandas concatenates the files in path order, so the second file's rows win.
+    Spark packs splits largest first, so input order within a partition is not
+    path order.
+    """
+    panel = make_panel(4, 60)
+    panel["date"] = panel["date"].dt.strftime("%Y-%m-%d")
+    earlier = panel.sample(frac=0.2, random_state=4).assign(sales=lambda frame: frame["sales"] + 1000)
+    return [earlier, panel]
+
+def check_build_features(fixtures, frame):
+    expected = sales_features.build_features(frame)
+    actual = spark_features.build_features(fixtures.spark_frame(frame)).toPandas()
+    assert_same_features(expected, actual)
+    return expected
+
+def check_multi_file(fixtures, frames):
+    expected = sales_features.build_features(pd.concat(frames, ignore_index=True))
+    actual = spark_features.build_features(fixtures.spark_files(frames)).toPandas()
+    assert_same_features(expected, actual)
+
+def check_history_tail(fixtures, frame):
+    expected = sales_features.history_tail(sales_features.clean(frame))
+    actual = spark_features.history_tail(spark_features.clean(fixtures.spark_frame(frame))).toPandas()
+    assert_same_features(expected, actual, check_dtypes=False)
+
+def check_incremental(fixtures, frame):
+    dates = pd.to_datetime(frame[DATE_COLUMN], errors="coerce")
+    cutoff = dates.max() - pd.Timedelta(days=20)
+    old, new = frame[dates <= cutoff], frame[dates > cutoff]
+
+    pandas_tail = sales_features.history_tail(sales_features.clean(old))
+    pandas_tail = pandas_tail.assign(**{DATE_COLUMN: pandas_tail[DATE_COLUMN].dt.strftime("%Y-%m-%d")})
+    expected = sales_features.build_features(pd.concat([pandas_tail, new], ignore_index=True))
+    expected = expected[expected[DATE_COLUMN] > cutoff]
+
+    spark_tail = spark_features.history_tail(spark_features.clean(fixtures.spark_frame(old)))
+    spark_tail = spark_tail.withColumn(DATE_COLUMN, F.date_format(DATE_COLUMN, "yyyy-MM-dd"))
+    # Tagged as featurize_spark does: the tail has been through a shuffle, so input_file_name() is empty there.
+    spark_tail = spark_features.with_input_order(spark_tail.select(*new.columns), source=0)
+    combined = spark_tail.unionByName(spark_features.with_input_order(fixtures.spark_frame(new), source=1))
+    actual = spark_features.build_features(combined).toPandas()
+    actual = actual[pd.to_datetime(actual[DATE_COLUMN]) > cutoff]
+    assert_same_features(expected, actual)
+
+def main():
+    spark = (
+        SparkSession.builder.master("local[*]").appName("check-spark-parity")
+        .config("spark.sql.session.timeZone", "UTC")
+        .getOrCreate()
+    )
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            fixtures = Fixtures(spark, root)
+            frame = edge_case_frame()
+            full = check_build_features(fixtures, frame)
+            print(f"build_features: {len(full)} rows x {len(full.columns)} columns match")
+            check_multi_file(fixtures, multi_file_frames())
+            print("duplicates across files: the later path wins in both engines")
+            check_history_tail(fixtures, frame)
+            print("history_tail: rows match")
+            check_incremental(fixtures, frame)
+            print("tail + new rows: match")
+            no_keys = frame.drop(columns=SERIES_KEYS)
+            no_keys = no_keys[no_keys[TARGET_COLUMN].notna()].drop_duplicates(subset=[DATE_COLUMN], keep="last")
+            check_build_features(fixtures, no_keys)
+            print("build_features without series keys: match")
+    finally:
+        spark.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Offline stand-in for Textract document analysis.
+
+write_fixture() generates GetDocumentAnalysis responses for a synthetic
+multi-page sales invoice and stores them as one JSON file per NextToken page;
+FixtureTextractClient replays them through the same get_document_analysis
+call the collector makes against boto3.
+"""
+import os
+import json
+import random
+import itertools
+
+class FixtureTextractClient:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, job_id, index):
+        return os.path.join(self.directory, job_id, f"{index:05d}.json")
+
+    def get_document_analysis(self, JobId, MaxResults=None, NextToken=None):
+        index = int(NextToken or 0)
+        with open(self._path(JobId, index)) as f:
+            response = json.load(f)
+        if os.path.exists(self._path(JobId, index + 1)):
+            response["NextToken"] = str(index + 1)
+        return response
+
+def _word(ids, page, text):
+    block_id = f"w{next(ids)}"
+    return block_id, {"BlockType": "WORD", "Id": block_id, "Page": page, "Text": text}
+
+def _table(ids, page, rows):
+    blocks, cell_ids = [], []
+    for r, row in enumerate(rows, start=1):
+        for c, text in enumerate(row, start=1):
+            word_ids = []
+            for token in str(text).split():
+                word_id, word = _word(ids, page, token)
+                word_ids.append(word_id)
+                blocks.append(word)
+            cell_id = f"c{next(ids)}"
+            cell_ids.append(cell_id)
+            blocks.append({
+                "BlockType": "CELL", "Id": cell_id, "Page": page, "RowIndex": r, "ColumnIndex": c,
+                "Relationships": [{"Type": "CHILD", "Ids": word_ids}] if word_ids else [],
+            })
+    table_id = f"t{next(ids)}"
+    # Textract lists the TABLE block before its cells.
+    return [{
+        "BlockType": "TABLE", "Id": table_id, "Page": page,
+        "Relationships": [{"Type": "CHILD", "Ids": cell_ids}],
+    }] + blocks
+
+SALES_HEADER = ["Order Date", "Store No", "Region", "Product Category", "Unit Price", "Promo", "Qty"]
+
+def _page_blocks(ids, page, rows_per_page, rng, repeat_header):
+    blocks = [{"BlockType": "PAGE", "Id": f"p{next(ids)}", "Page": page}]
+    blocks += [{"BlockType": "LINE", "Id": f"l{next(ids)}", "Page": page, "Text": f"Invoice page {page}"}]
+    # An invoice metadata table that is not sales data and must be skipped.
+    blocks += _table(ids, page, [["Invoice No", f"INV-{page:05d}"], ["Customer", "ACME Retail"]])
+    rows = [SALES_HEADER] if page == 1 or repeat_header else []
+    for _ in range(rows_per_page):
+        rows.append([
+            f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+            str(rng.randint(1, 500)),
+            f"region-{rng.randint(1, 8)}",
+            f"cat-{rng.randint(1, 40)}",
+            f"${rng.uniform(1, 2000):,.2f}",
+            rng.choice(["0", "1"]),
+            f"{rng.randint(0, 3000):,}",
+        ])
+    return blocks + _table(ids, page, rows)
+
+def write_fixture(directory, job_id, pages, rows_per_page=40, max_results=1000, repeat_header=False, seed=42):
+    """Write a `pages`-page analysis of sales invoices; returns the number of response files.
+
+    Without `repeat_header` only page 1 has the column header, so later pages
+    exercise continuation of a table across pages.
+    """
+    rng = random.Random(seed)
+    ids = itertools.count()
+    os.makedirs(os.path.join(directory, job_id), exist_ok=True)
+
+    def _blocks():
+        for page in range(1, pages + 1):
+            yield from _page_blocks(ids, page, rows_per_page, rng, repeat_header)
+
+    n_files = 0
+    blocks = _blocks()
+    metadata = {"Pages": pages}
+    while chunk := list(itertools.islice(blocks, max_results)):
+        with open(os.path.join(directory, job_id, f"{n_files:05d}.json"), "w") as f:
+            json.dump({"JobStatus": "SUCCEEDED", "DocumentMetadata": metadata, "Blocks": chunk}, f)
+        n_files += 1
+    return n_files
@@ -16,6 +16,6 @@ class APIClient:
         url = self.model_url if is_model else self.forecast_url
         return requests.post(f"{url}{endpoint}", json=json_data)
     
-    def get_json(self, endpoint, is_model=False):
+    def get_json(self, endpoint, is_model=False, params=None):
         url = self.model_url if is_model else self.forecast_url
-        return requests.get(f"{url}{endpoint}")
\ No newline at end of file
+        return requests.get(f"{url}{endpoint}", params=params)
\ No newline at end of file
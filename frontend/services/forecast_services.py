@@ -19,9 +19,9 @@ class ForecastService:
             print(f"Error uploading data: {e}")
             return None
     
-    def trigger_train(self):
+    def trigger_train(self, full_retrain=False):
         try:
-            response = self.client.post_json("/train", json_data={})
+            response = self.client.post_json("/train", json_data={"full_retrain": full_retrain})
             return response.json() if response.status_code == 200 else None
         except Exception as e:
             print(f"Error triggering train: {e}")
@@ -55,10 +55,17 @@ class ForecastService:
             print(f"Error streaming prediction progress: {e}")
             return None
     
-    def get_prediction_results(self, job_name):
+    def get_prediction_results(self, job_name, cursor=None, page_size=500):
+        params = {"page_size": page_size}
+        if cursor:
+            params["cursor"] = cursor
         try:
-            response = self.client.get_json(f"/prediction-results/{job_name}")
+            response = self.client.get_json(f"/prediction-results/{job_name}", params=params)
             return response.json() if response.status_code == 200 else None
         except Exception as e:
             print(f"Error getting prediction results: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def prediction_results_csv_url(self, job_name):
+        # The backend streams the CSV, so the browser fetches it straight from there on click.
+        return f"{self.client.forecast_url}/prediction-results/{job_name}?format=csv"
@@ -4,13 +4,17 @@ class S3Service:
     def __init__(self):
         self.client = APIClient()
 
-    def get_bucket_files(self, bucket_type):
+    def get_bucket_files(self, bucket_type, prefix="", cursor=None, sort_by="name", descending=False):
+        empty = {"files": [], "folders": [], "next_cursor": None, "total": 0}
+        params = {"prefix": prefix, "delimiter": "/", "sort_by": sort_by, "descending": descending}
+        if cursor:
+            params["cursor"] = cursor
         try:
-            response = self.client.get_json(f"/list-files/{bucket_type}")
-            return response.json().get("files", []) if response.status_code == 200 else []
+            response = self.client.get_json(f"/list-files/{bucket_type}", params=params)
+            return response.json() if response.status_code == 200 else empty
         except Exception as e:
             print(f"Error: {e}")
-            return []
+            return empty
     
     def get_s3_inputs(self):
         try:
@@ -22,8 +26,17 @@ class S3Service:
         
     def get_file_content(self, bucket_type, file_key):
         try:
-            response = self.client.get_json(f"/file-content?bucket_type={bucket_type}&file_key={file_key}")
+            response = self.client.get_json("/file-content", params={"bucket_type": bucket_type, "file_key": file_key})
             return response.json().get("content") if response.status_code == 200 else None
         except Exception as e:
             print(f"Error getting file content: {e}")
+            return None
+
+    def get_file_preview(self, bucket_type, file_key, rows=100):
+        try:
+            params = {"bucket_type": bucket_type, "file_key": file_key, "rows": rows}
+            response = self.client.get_json("/file-preview", params=params)
+            return response.json() if response.status_code == 200 else None
+        except Exception as e:
+            print(f"Error getting file preview: {e}")
             return None
\ No newline at end of file
@@ -4,8 +4,29 @@ import io
 import base64
 import binascii
 
+PREVIEW_EXTENSIONS = ('parquet', 'csv', 'xlsx', 'xls')
+
+def _show_preview(bucket_type, file_key, s3_service):
+    preview = s3_service.get_file_preview(bucket_type, file_key)
+    if not preview:
+        st.error("Failed to retrieve file preview.")
+        return
+
+    df = pd.DataFrame(preview["rows"], columns=preview["columns"])
+    total_rows = preview.get("total_rows")
+    if total_rows is not None:
+        st.caption(f"Showing first {len(df)} of {total_rows} rows")
+    else:
+        st.caption(f"Showing first {len(df)} rows")
+    st.dataframe(df, use_container_width=True)
+
 @st.dialog("File Content", width="large")
 def show_file_content_modal(bucket_type, file_key, s3_service):
+    if file_key.split('.')[-1].lower() in PREVIEW_EXTENSIONS:
+        with st.spinner("Getting preview..."):
+            _show_preview(bucket_type, file_key, s3_service)
+        return
+
     with st.spinner("Getting content..."):
         content_res = s3_service.get_file_content(bucket_type, file_key)
         if not content_res:
@@ -88,7 +109,12 @@ def render_data_tab(forecast_service, s3_service):
             if res:
                 st.success(res["message"])
                 for item in res["data"]:
-                    st.write(f"{item['filename']} -> `{item['s3_uri']}`")
+                    if item.get('deduplicated'):
+                        st.write(f"{item['filename']} -> unchanged, already stored as `{item['s3_uri']}`")
+                        continue
+                    throughput = item.get('throughput_mbps')
+                    rate = f" ({throughput} MB/s)" if throughput is not None else ""
+                    st.write(f"{item['filename']} -> `{item['s3_uri']}`{rate}")
             else:
                 st.error("Failed to upload files.")
 
@@ -107,7 +133,34 @@ def render_data_tab(forecast_service, s3_service):
     bucket_display = st.selectbox("Choose your bucket:", list(bucket_options.keys()))
     bucket_option = bucket_options[bucket_display]
 
-    files = s3_service.get_bucket_files(bucket_option)
+    prefix_key, cursors_key = f"prefix_{bucket_option}", f"cursors_{bucket_option}"
+    prefix = st.session_state.get(prefix_key, "")
+    cursors = st.session_state.setdefault(cursors_key, [None])
+
+    def _open_prefix(new_prefix):
+        st.session_state[prefix_key] = new_prefix
+        st.session_state[cursors_key] = [None]
+
+    col_path, col_sort, col_order = st.columns([0.6, 0.25, 0.15])
+    with col_path:
+        st.caption(f"Location: /{prefix}")
+        if prefix and st.button("Up one level"):
+            parent = prefix.rstrip("/").rpartition("/")[0]
+            _open_prefix(f"{parent}/" if parent else "")
+            st.rerun()
+    with col_sort:
+        sort_by = st.selectbox("Sort by", ["name", "last_modified", "size"], key=f"sort_{bucket_option}")
+    with col_order:
+        descending = st.toggle("Descending", key=f"desc_{bucket_option}")
+
+    listing = s3_service.get_bucket_files(bucket_option, prefix, cursors[-1], sort_by, descending)
+
+    for folder in listing.get("folders", []):
+        if st.button(f"📁 {folder[len(prefix):]}", key=f"folder_{bucket_option}_{folder}"):
+            _open_prefix(folder)
+            st.rerun()
+
+    files = listing.get("files", [])
     if files:
         df = pd.DataFrame(files)
         event = st.dataframe(
@@ -118,9 +171,18 @@ def render_data_tab(forecast_service, s3_service):
             on_select="rerun" 
         )
 
+        col_prev, col_page, col_next = st.columns([0.15, 0.7, 0.15])
+        col_page.caption(f"Page {len(cursors)} · {listing.get('total', len(files))} files")
+        if len(cursors) > 1 and col_prev.button("Previous"):
+            cursors.pop()
+            st.rerun()
+        if listing.get("next_cursor") and col_next.button("Next"):
+            cursors.append(listing["next_cursor"])
+            st.rerun()
+
         if event.selection.rows:
             selected_idx = event.selection.rows[0]
             file_name = df.iloc[selected_idx]['filename']
             show_file_content_modal(bucket_option, file_name, s3_service)
-    else:
+    elif not listing.get("folders"):
         st.info("No files found in this bucket.")
\ No newline at end of file
@@ -52,6 +52,10 @@ def _run_prediction_stream(forecast_service, details):
                 data = json.loads(decoded[5:].strip())
             except json.JSONDecodeError:
                 continue
+            if data.get('error'):
+                msg_box.write(data['error'])
+                status.update(label="Could not track the prediction job!", state="error")
+                break
             prog = data.get('progress_percentage', 0)
             progress_bar.progress(prog / 100)
             msg_box.write(f"**{data.get('status')}**: {data.get('message')}")
@@ -60,11 +64,16 @@ def _run_prediction_stream(forecast_service, details):
                 status.update(label="Completed!", state="complete")
                 _show_results(forecast_service, job_name)
                 break
+            if data.get('status') in ('Failed', 'Stopped'):
+                status.update(label=f"Prediction {data.get('status').lower()}!", state="error")
+                break
 
 def _show_results(forecast_service, job_name):
     results = forecast_service.get_prediction_results(job_name)
     if results:
         st.subheader("Results")
         df = pd.DataFrame(results['predictions'])
+        if results.get('next_cursor'):
+            st.caption(f"Showing the first {len(df)} predictions")
         st.dataframe(df, use_container_width=True)
-        st.download_button("Download CSV", df.to_csv(index=False), f"{job_name}.csv", "text/csv")
\ No newline at end of file
+        st.link_button("Download CSV", forecast_service.prediction_results_csv_url(job_name))
\ No newline at end of file
@@ -18,6 +18,21 @@ def render_admin_tab(model_service):
                 c2.metric("MAE", f"{to_float(met.get('mae', {}).get('value')):.2f}")
                 c3.metric("R²", f"{to_float(met.get('r2', {}).get('value')):.4f}")
                 c4.metric("MAPE", f"{to_float(met.get('mape', {}).get('value')):.1f}%")
+
+                backtest = m["metrics"].get("backtest") or {}
+                summary = backtest.get("summary", {})
+                if summary:
+                    mae, mape = summary.get("mae", {}), summary.get("mape", {})
+                    st.caption(
+                        f"Backtest over {len(backtest.get('folds', []))} folds: "
+                        f"MAE {to_float(mae.get('mean')):.2f} ± {to_float(mae.get('std')):.2f}, "
+                        f"MAPE {to_float(mape.get('mean')):.1f}% ± {to_float(mape.get('std')):.1f}%"
+                    )
+
+                segments = (m["metrics"].get("segment_metrics") or {}).get("store_id_category") or {}
+                if segments.get("worst"):
+                    st.caption(f"Worst store/category segments by MAE, of {segments.get('segments')}")
+                    st.dataframe(segments["worst"][:10], hide_index=True)
             
             comment = st.text_area("Comments", key=f"cmt_{m['version']}")
             b1, b2, _ = st.columns([1, 1, 6])
@@ -6,14 +6,20 @@ from utils import to_float
 def render_training_tab(forecast_service, model_service):
     st.header("ML Pipeline Orchestration")
     
+    full_retrain = st.checkbox(
+        "Full retrain",
+        help="Train from scratch instead of continuing the latest approved model on new data."
+    )
     if st.button("Run Training Pipeline", type="primary"):
-        res = forecast_service.trigger_train() 
+        res = forecast_service.trigger_train(full_retrain)
         if not res:
             st.error("Failed to trigger pipeline.")
             return
 
         execution_arn = res.get('execution_arn')
         st.info(f"Pipeline Execution Started: {execution_arn}")
+        if res.get('base_model_arn'):
+            st.caption(f"Warm-starting from {res['base_model_arn']}")
         
         with st.status("Running Pipeline...", expanded=True) as status:
             response = forecast_service.stream_train_progress(execution_arn)
@@ -30,6 +36,10 @@ def render_training_tab(forecast_service, model_service):
                     data = json.loads(line.decode('utf-8')[6:])
                 except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
+                if data.get('error'):
+                    st.error(data['error'])
+                    status.update(label="Could not track the pipeline!", state="error")
+                    break
                     
                 steps = data.get('steps', [])
                 overall = data.get('overall_status')